@@ -0,0 +1,100 @@
+"""
+Throughput of the bulk task API (add_tasks, move_tasks, delete_tasks) compared
+with the one-at-a-time add_task / modify_task / delete_task calls.
+
+Usage: python benchmarks/bench_bulk.py [--sizes 1000 10000 100000] [--single-limit 10000]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+)
+
+from database import Database  # noqa: E402
+
+
+def timed(operation):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        operation()
+    return time.perf_counter() - start
+
+
+def fresh_database(tmp, name):
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = Database(os.path.join(tmp, name))
+        db.initialize_database()
+    return db, db.get_current_kanban()
+
+
+def bench_single(tmp, size):
+    db, kanban_id = fresh_database(tmp, f"single-{size}.db")
+    titles = [f"Task {i}" for i in range(size)]
+    ids = []
+    results = {
+        "add": timed(
+            lambda: ids.extend(db.add_task(t, "To Do", kanban_id) for t in titles)
+        ),
+        "move": timed(lambda: [db.modify_task(i, new_column_name="Done") for i in ids]),
+        "delete": timed(lambda: [db.delete_task(t) for t in titles]),
+    }
+    db.close()
+    return results
+
+
+def bench_bulk(tmp, size):
+    db, kanban_id = fresh_database(tmp, f"bulk-{size}.db")
+    titles = [f"Task {i}" for i in range(size)]
+    ids = []
+    results = {
+        "add": timed(lambda: ids.extend(db.add_tasks(titles, "To Do", kanban_id))),
+        "move": timed(lambda: db.move_tasks(ids, "Done", kanban_id)),
+        "delete": timed(lambda: db.delete_tasks(ids)),
+    }
+    db.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+    )
+    parser.add_argument(
+        "--single-limit",
+        type=int,
+        default=10_000,
+        help="skip the one-at-a-time run above this many tasks",
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'tasks':>8} {'operation':<8}{'single tasks/s':>16}{'bulk tasks/s':>16}{'speed-up':>10}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            single = bench_single(tmp, size) if size <= args.single_limit else None
+            bulk = bench_bulk(tmp, size)
+            for operation, seconds in bulk.items():
+                bulk_rate = size / seconds
+                if single:
+                    single_rate = size / single[operation]
+                    print(
+                        f"{size:>8} {operation:<8}{single_rate:>16,.0f}{bulk_rate:>16,.0f}"
+                        f"{bulk_rate / single_rate:>9.1f}x"
+                    )
+                else:
+                    print(
+                        f"{size:>8} {operation:<8}{'-':>16}{bulk_rate:>16,.0f}{'-':>10}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Per-operation latency of Database with a fresh sqlite3 connection per call
+(the previous behaviour) versus the persistent per-thread connection.
+
+Usage: python benchmarks/bench_connection.py [--tasks 10000] [--columns 20] [--repeat 200]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+)
+
+from database import CONNECTION_PRAGMAS, Database  # noqa: E402
+
+
+class PerCallDatabase(Database):
+    """Reproduces the old behaviour: every call connects and discards the handle."""
+
+    def get_connection(self):
+        conn = sqlite3.connect(self.DATABASE_PATH)
+        conn.execute(f"PRAGMA busy_timeout = {CONNECTION_PRAGMAS['busy_timeout']}")
+        return conn
+
+
+def populate(path, n_tasks, n_columns):
+    with contextlib.redirect_stdout(io.StringIO()), Database(path) as db:
+        db.create_database()
+        kanban_id = db.create_kanban("Benchmark")
+        column_ids = [
+            db.create_column(f"Column {i}", kanban_id) for i in range(n_columns)
+        ]
+        conn = db.get_connection()
+        for i in range(n_tasks):
+            cursor = conn.execute(
+                "INSERT INTO Task (title, created_at) VALUES (?, '2024-01-01')",
+                (f"Task {i}",),
+            )
+            conn.execute(
+                "INSERT INTO TaskColumnLink (task_id, column_id) VALUES (?, ?)",
+                (cursor.lastrowid, column_ids[i % n_columns]),
+            )
+        conn.commit()
+    return kanban_id, column_ids
+
+
+def measure(db, name, operation, repeat):
+    timings = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(repeat):
+            start = time.perf_counter()
+            operation(i)
+            timings.append((time.perf_counter() - start) * 1000)
+    return (
+        name,
+        statistics.median(timings),
+        sorted(timings)[int(len(timings) * 0.95) - 1],
+    )
+
+
+def run(db, kanban_id, column_ids, n_tasks, repeat):
+    operations = [
+        ("get_columns", lambda i: db.get_columns(kanban_id)),
+        ("get_tasks", lambda i: db.get_tasks(column_ids[i % len(column_ids)])),
+        ("get_task_by_id", lambda i: db.get_task_by_id(i % n_tasks + 1)),
+        ("get_kanban_name", lambda i: db.get_kanban_name(kanban_id)),
+        ("modify_task", lambda i: db.modify_task(i % n_tasks + 1, new_title=f"T{i}")),
+        ("update_current_kanban", lambda i: db.update_current_kanban(kanban_id)),
+    ]
+    return [measure(db, name, operation, repeat) for name, operation in operations]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--columns", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        kanban_id, column_ids = populate(path, args.tasks, args.columns)
+
+        results = {}
+        for label, cls in (("per-call", PerCallDatabase), ("persistent", Database)):
+            with contextlib.redirect_stdout(io.StringIO()):
+                db = cls(path)
+            results[label] = run(db, kanban_id, column_ids, args.tasks, args.repeat)
+            db.close()
+
+    print(
+        f"{args.tasks} tasks, {args.columns} columns, {args.repeat} calls per operation"
+    )
+    print(f"{'operation':<24}{'per-call p50/p95 ms':>22}{'persistent p50/p95 ms':>24}")
+    for old, new in zip(results["per-call"], results["persistent"]):
+        print(
+            f"{old[0]:<24}{old[1]:>11.3f} / {old[2]:<8.3f}{new[1]:>13.3f} / {new[2]:.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
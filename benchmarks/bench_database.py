@@ -0,0 +1,373 @@
+"""
+Latency percentiles and throughput of every public Database method at scale.
+
+For each size a synthetic database is generated (see datagen.py), then every method
+is called repeatedly and each call is timed on its own. Results can be written as
+JSON and compared with a previous run to flag regressions.
+
+Usage: python benchmarks/bench_database.py [--sizes 1000 10000 100000 1000000]
+           [--repeat 200] [--output results.json] [--baseline baseline.json]
+           [--threshold 0.25]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import Database  # noqa: E402
+from datagen import generate  # noqa: E402
+
+SCAN_REPEAT = 5  # Calls reading whole tables are slow at 1M rows, time only a few
+BULK = 100  # Tasks per call for the add_tasks / move_tasks / delete_tasks cases
+MIN_REGRESSION_MS = 0.02  # Smaller slow-downs are noise, whatever the ratio
+
+
+class Case:
+    """
+    One benchmarked call.
+
+    :argument prepare: prepare(i) returns the arguments of call number i, it is not
+        timed. Defaults to no arguments.
+    :argument repeat: The maximum number of calls, lower than --repeat for slow or
+        destructive cases.
+    """
+
+    def __init__(self, name, function, prepare=None, repeat=None):
+        self.name = name
+        self.function = function
+        self.prepare = prepare or (lambda i: ())
+        self.repeat = repeat
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of sorted values, q in [0, 100]."""
+    index = max(0, min(len(values) - 1, round(q / 100 * len(values)) - 1))
+    return values[index]
+
+
+def measure(case, repeat):
+    count = repeat if case.repeat is None else min(repeat, case.repeat)
+    timings = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(count):
+            args = case.prepare(i)
+            start = time.perf_counter()
+            case.function(*args)
+            timings.append(time.perf_counter() - start)
+    if not timings:
+        return None
+    timings.sort()
+    total = sum(timings)
+    return {
+        "calls": len(timings),
+        "mean_ms": total / len(timings) * 1000,
+        "p50_ms": percentile(timings, 50) * 1000,
+        "p90_ms": percentile(timings, 90) * 1000,
+        "p99_ms": percentile(timings, 99) * 1000,
+        "max_ms": timings[-1] * 1000,
+        "ops_per_s": len(timings) / total if total else float("inf"),
+    }
+
+
+def build_cases(db, dataset, seed):
+    """Every public Database method, reads first, then writes, then deletions."""
+    rng = random.Random(seed)
+    kanban_id = dataset.kanban_ids[0]
+    columns = dataset.column_ids[kanban_id]
+    all_columns = [c for ids in dataset.column_ids.values() for c in ids]
+    task_ids = list(dataset.task_ids)
+    note_ids = list(dataset.note_ids)
+
+    # Deleted tasks are never reused, titles kept for delete_task are excluded.
+    victims = task_ids[len(dataset.titles) :]
+    rng.shuffle(victims)
+    half = len(victims) // 2
+    victims = iter(victims)
+    notes = list(note_ids)
+    rng.shuffle(notes)
+    notes = iter(notes)
+    created_columns = []
+
+    # Whole words, prefixes, several words and a word found nowhere.
+    queries = ["fix", "review deploy", "rep", "login page report", "b", "zzz"]
+
+    def some_task(i):
+        return (rng.choice(task_ids),)
+
+    # datagen numbers the tasks of each column 1, 2, 3...
+    positions = max(1, len(task_ids) // len(all_columns))
+
+    def page(i):
+        column = rng.choice(columns)
+        return (column, (float(rng.randint(1, positions)), 0), 50)
+
+    def new_column(i):
+        return (f"Bench column {i}", kanban_id)
+
+    def create_column(name, kanban):
+        created_columns.append(db.create_column(name, kanban))
+
+    # datagen spreads creation dates over a year, about half the tasks are older.
+    archive_before = date.today() - timedelta(days=180)
+
+    def archived_task(i):
+        cursor = db.get_connection().cursor()
+        cursor.execute("SELECT id FROM ArchivedTask ORDER BY id LIMIT 1 OFFSET ?", (i,))
+        return cursor.fetchone() or (None,)
+
+    return [
+        Case("get_current_kanban", db.get_current_kanban),
+        Case("get_kanbans", db.get_kanbans),
+        Case("get_kanban_name", db.get_kanban_name, lambda i: (kanban_id,)),
+        Case("get_columns", db.get_columns, lambda i: (kanban_id,)),
+        Case(
+            "get_tasks(column)",
+            db.get_tasks,
+            lambda i: (rng.choice(columns),),
+            SCAN_REPEAT * 4,
+        ),
+        Case("get_tasks(all)", db.get_tasks, repeat=SCAN_REPEAT),
+        Case("get_task_by_id", db.get_task_by_id, some_task),
+        Case("get_tasks_page", db.get_tasks_page, page),
+        Case("load_board", db.load_board, lambda i: (kanban_id,), SCAN_REPEAT * 4),
+        Case("load_board(paged)", db.load_board, lambda i: (kanban_id, 50)),
+        Case("get_all_notes", db.get_all_notes, repeat=SCAN_REPEAT),
+        Case("get_note_titles", db.get_note_titles, repeat=SCAN_REPEAT),
+        Case("search", db.search, lambda i: (rng.choice(queries),)),
+        Case("get_task_index", db.get_task_index, some_task),
+        Case("get_note", db.get_note, lambda i: (rng.choice(note_ids),)),
+        Case(
+            "update_current_kanban",
+            db.update_current_kanban,
+            lambda i: (kanban_id,),
+        ),
+        Case("create_kanban", db.create_kanban, lambda i: (f"Bench board {i}",)),
+        Case(
+            "modify_kanban",
+            db.modify_kanban,
+            lambda i: (kanban_id, f"Board renamed {i}"),
+        ),
+        Case("create_column", create_column, new_column),
+        Case(
+            "add_task",
+            db.add_task,
+            lambda i: (f"Bench task {i}", "Column 0", kanban_id),
+        ),
+        Case(
+            "add_tasks",
+            db.add_tasks,
+            lambda i: (
+                [f"Bench bulk {i}-{n}" for n in range(BULK)],
+                "Column 1",
+                kanban_id,
+            ),
+        ),
+        Case(
+            "modify_task(title)",
+            db.modify_task,
+            lambda i: (rng.choice(task_ids), f"Renamed {i}"),
+        ),
+        Case(
+            "modify_task(column)",
+            db.modify_task,
+            lambda i: (rng.choice(task_ids), None, "Column 2"),
+        ),
+        Case(
+            "move_task",
+            db.move_task,
+            lambda i: (rng.choice(task_ids), rng.choice(all_columns)),
+        ),
+        Case(
+            "move_task(position)",
+            db.move_task,
+            lambda i: (
+                rng.choice(task_ids),
+                rng.choice(all_columns),
+                rng.uniform(1, positions),
+            ),
+        ),
+        Case(
+            "rebalance_column",
+            db.rebalance_column,
+            lambda i: (rng.choice(columns),),
+            SCAN_REPEAT,
+        ),
+        Case(
+            "move_tasks",
+            db.move_tasks,
+            lambda i: (rng.sample(task_ids, BULK), "Column 3", kanban_id),
+        ),
+        Case(
+            "archive_tasks",
+            db.archive_tasks,
+            lambda i: ("Column 2", archive_before, BULK),
+            SCAN_REPEAT,
+        ),
+        Case("get_archived_tasks", db.get_archived_tasks, lambda i: (kanban_id,)),
+        Case("restore_task", db.restore_task, archived_task, SCAN_REPEAT * 4),
+        Case("add_note", db.add_note, lambda i: (f"Bench note {i}", "Content " * 50)),
+        Case(
+            "update_note",
+            db.update_note,
+            lambda i: (rng.choice(note_ids), f"Updated {i}", "Updated " * 50),
+        ),
+        Case(
+            "delete_task",
+            db.delete_task,
+            lambda i: (dataset.titles[i],),
+            len(dataset.titles),
+        ),
+        Case(
+            "delete_task_by_id",
+            db.delete_task_by_id,
+            lambda i: (next(victims),),
+            half,
+        ),
+        Case(
+            "delete_tasks",
+            db.delete_tasks,
+            lambda i: ([next(victims) for _ in range(BULK)],),
+            half // BULK,
+        ),
+        Case("delete_note", db.delete_note, lambda i: (next(notes),), len(note_ids)),
+        # As many calls as create_column made, both use --repeat.
+        Case("delete_column", db.delete_column, lambda i: (created_columns[i],)),
+        Case(
+            "delete_kanban",
+            db.delete_kanban,
+            lambda i: (dataset.kanban_ids[i + 1],),
+            len(dataset.kanban_ids) - 1,
+        ),
+    ]
+
+
+def run_size(tmp, size, args):
+    path = os.path.join(tmp, f"bench-{size}.db")
+    start = time.perf_counter()
+    dataset = generate(
+        path,
+        boards=args.boards,
+        columns=args.columns,
+        tasks=size,
+        notes=max(1, int(size * args.notes_ratio)),
+        title_length=tuple(args.title_length),
+        seed=args.seed,
+    )
+    print(f"\n{size:,} tasks, generated in {time.perf_counter() - start:.1f}s")
+    print(
+        f"{'method':<24}{'calls':>7}{'p50 ms':>10}{'p90 ms':>10}"
+        f"{'p99 ms':>10}{'max ms':>10}{'ops/s':>12}"
+    )
+
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = Database(path)
+        db.create_database()
+    try:
+        for case in build_cases(db, dataset, args.seed):
+            if case.repeat is not None and case.repeat <= 0:
+                continue
+            result = measure(case, args.repeat)
+            if result is None:
+                continue
+            results[case.name] = result
+            print(
+                f"{case.name:<24}{result['calls']:>7}{result['p50_ms']:>10.3f}"
+                f"{result['p90_ms']:>10.3f}{result['p99_ms']:>10.3f}"
+                f"{result['max_ms']:>10.3f}{result['ops_per_s']:>12,.0f}"
+            )
+    finally:
+        db.close()
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return (size, method, statistic, baseline_ms, new_ms) for each regression."""
+    regressions = []
+    for size, methods in results.items():
+        for method, result in methods.items():
+            base = baseline.get(size, {}).get(method)
+            if base is None:
+                continue
+            for statistic in ("p50_ms", "p99_ms"):
+                old, new = base[statistic], result[statistic]
+                if new > old * (1 + threshold) and new - old > MIN_REGRESSION_MS:
+                    regressions.append((size, method, statistic, old, new))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--boards", type=int, default=10)
+    parser.add_argument("--columns", type=int, default=5)
+    parser.add_argument("--notes-ratio", type=float, default=0.1, help="notes per task")
+    parser.add_argument("--title-length", type=int, nargs=2, default=[8, 60])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="a previous --output file to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="flag methods slower than the baseline by more than this ratio",
+    )
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            # JSON object keys are strings, use the same keys in memory.
+            results[str(size)] = run_size(tmp, size, args)
+
+    report = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if not regressions:
+            print(f"\nNo regression against {args.baseline}")
+            return 0
+        print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+        for size, method, statistic, old, new in regressions:
+            print(
+                f"  {size:>8} {method:<24}{statistic:<8}"
+                f"{old:>10.3f} -> {new:.3f} ms ({new / old - 1:+.0%})"
+            )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""
+Memory and latency of the note API with and without compressed contents.
+
+The same notes are stored twice, once as plain text and once with contents over
+--threshold bytes compressed (see database.pack_note). For each run the file size,
+the insert rate, the time and Python memory needed to list the notes with
+get_note_titles and get_all_notes, and the get_note / update_note latencies are
+reported.
+
+Usage: python benchmarks/bench_notes.py [--notes 10000] [--size 50000]
+           [--threshold 4096] [--repeat 200] [--seed 0]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import Database  # noqa: E402
+from datagen import text  # noqa: E402
+
+POOL_SIZE = 1_000_000  # Characters of random words the note contents are cut from
+
+
+def contents(rng, notes, size):
+    """Yield notes random slices of size characters, without building each word."""
+    pool = text(rng, POOL_SIZE)
+    pool += pool[:size]
+    for _ in range(notes):
+        start = rng.randrange(POOL_SIZE)
+        yield pool[start : start + size]
+
+
+def measure(function):
+    """
+    Return (seconds, peak Python memory in bytes) of function, from two calls since
+    tracemalloc slows down every allocation.
+    """
+    start = time.perf_counter()
+    function()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    result = function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return seconds, peak
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run(tmp, name, threshold, args):
+    path = os.path.join(tmp, f"{name}.db")
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = Database(path)
+        db.create_database()
+    db.note_compress_bytes = threshold
+
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    with db.transaction():
+        for i, content in enumerate(contents(rng, args.notes, args.size)):
+            db.add_note(f"Note {i}", content)
+    insert = time.perf_counter() - start
+    db.get_connection().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    note_ids = [note_id for note_id, _ in db.get_note_titles()]
+    titles_time, titles_memory = measure(db.get_note_titles)
+    all_time, all_memory = measure(db.get_all_notes)
+    reads = []
+    for _ in range(args.repeat):
+        note_id = rng.choice(note_ids)
+        start = time.perf_counter()
+        db.get_note(note_id)
+        reads.append(time.perf_counter() - start)
+    writes = []
+    new_contents = contents(rng, args.repeat, args.size)
+    for i in range(args.repeat):
+        note_id = rng.choice(note_ids)
+        content = next(new_contents)
+        start = time.perf_counter()
+        db.update_note(note_id, f"Edited {i}", content)
+        writes.append(time.perf_counter() - start)
+    db.close()
+
+    return {
+        "file MB": os.path.getsize(path) / 1e6,
+        "insert notes/s": args.notes / insert,
+        "titles ms": titles_time * 1000,
+        "titles MB": titles_memory / 1e6,
+        "all notes ms": all_time * 1000,
+        "all notes MB": all_memory / 1e6,
+        "get_note p50 ms": percentile(reads, 0.5) * 1000,
+        "get_note p99 ms": percentile(reads, 0.99) * 1000,
+        "update p50 ms": percentile(writes, 0.5) * 1000,
+        "update p99 ms": percentile(writes, 0.99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--notes", type=int, default=10_000)
+    parser.add_argument("--size", type=int, default=50_000, help="characters per note")
+    parser.add_argument("--threshold", type=int, default=4096)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{args.notes:,} notes of {args.size:,} characters")
+    with tempfile.TemporaryDirectory() as tmp:
+        plain = run(tmp, "plain", 0, args)
+        compressed = run(tmp, "compressed", args.threshold, args)
+
+    print(f"{'':<18}{'plain':>12}{'compressed':>12}")
+    for key in plain:
+        print(f"{key:<18}{plain[key]:>12,.2f}{compressed[key]:>12,.2f}")
+
+
+if __name__ == "__main__":
+    main()
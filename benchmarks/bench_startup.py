@@ -0,0 +1,104 @@
+"""
+Startup time of the application: imports, database open, board skeleton and
+time-to-first-interactive, on a seeded database so runs are comparable.
+
+Every run starts a fresh Python process, so module caches do not hide import time.
+A display is needed, under Linux run it with xvfb-run.
+
+Usage: python benchmarks/bench_startup.py [--runs 5] [--tasks 1000] [--columns 3]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+
+from database import Database  # noqa: E402
+
+MARKER = "STARTUP "
+
+# Runs in the child process: argv[1] is the database, argv[2:] the import paths.
+DRIVER = f"""
+import json, sys, time
+start = time.perf_counter()
+sys.path[:0] = sys.argv[2:]
+import main
+imported = time.perf_counter()
+
+def ready():
+    times = app.startup_times
+    print({MARKER!r} + json.dumps({{
+        "import": imported - start,
+        "database": times["database"] - times["start"],
+        "skeleton": times["skeleton"] - start,
+        "interactive": times["interactive"] - start,
+    }}), flush=True)
+    app.on_closing()
+
+app = main.App(database_path=sys.argv[1], on_ready=ready)
+app.mainloop()
+"""
+
+STEPS = ("import", "database", "skeleton", "interactive")
+
+
+def seed(path, tasks, columns):
+    with contextlib.redirect_stdout(io.StringIO()):
+        with Database(path) as db:
+            db.initialize_database()
+            kanban_id = db.get_current_kanban()
+            names = [name for _, name in db.get_columns(kanban_id)]
+            for i in range(3, columns):
+                names.append(f"Column {i}")
+                db.create_column(names[-1], kanban_id)
+            for i, name in enumerate(names[:columns]):
+                count = tasks // columns + (1 if i < tasks % columns else 0)
+                db.add_tasks([f"Task {i}-{n}" for n in range(count)], name, kanban_id)
+
+
+def run_once(path):
+    result = subprocess.run(
+        [sys.executable, "-c", DRIVER, path, ROOT, SRC],
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    for line in result.stdout.splitlines():
+        if line.startswith(MARKER):
+            return json.loads(line[len(MARKER) :])
+    raise RuntimeError(f"The application did not start:\n{result.stderr}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--tasks", type=int, default=1_000)
+    parser.add_argument("--columns", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "startup.db")
+        seed(path, args.tasks, args.columns)
+        runs = [run_once(path) for _ in range(args.runs)]
+
+    print(f"{args.tasks} tasks in {args.columns} columns, {args.runs} runs")
+    print(f"{'step':<12}{'median ms':>12}{'min ms':>12}{'max ms':>12}")
+    for step in STEPS:
+        values = [run[step] * 1000 for run in runs]
+        print(
+            f"{step:<12}{statistics.median(values):>12.1f}"
+            f"{min(values):>12.1f}{max(values):>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Build time, memory and query latency of the quick switcher index at scale.
+
+A synthetic database is generated (see datagen.py) and indexed with QuickIndex.load,
+timing the build and the peak Python memory it takes. Queries then replay typing: every
+prefix of sampled task titles, with and without a typo, is searched like on each key
+press. Finally tasks are added, renamed and deleted through the Database, timing how
+long the change events take to reach the index.
+
+Usage: python benchmarks/bench_switcher.py [--boards 100] [--tasks 100000]
+           [--queries 200] [--changes 1000] [--seed 0]
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import Database  # noqa: E402
+from datagen import generate  # noqa: E402
+from quick_index import QuickIndex  # noqa: E402
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def typo(rng, text):
+    """Swap two neighbouring letters of text."""
+    if len(text) < 3:
+        return text
+    i = rng.randrange(1, len(text) - 1)
+    return text[:i] + text[i + 1] + text[i] + text[i + 2 :]
+
+
+def keystrokes(rng, titles, queries):
+    """Every prefix of queries sampled titles, half of them with a typo."""
+    for _ in range(queries):
+        # Titles start with "#<number>", search for the words after it.
+        title = rng.choice(titles).split(" ", 1)[-1][:20]
+        if rng.random() < 0.5:
+            title = typo(rng, title)
+        for end in range(1, len(title) + 1):
+            yield title[:end]
+
+
+def report(name, times):
+    print(
+        f"{name:<24}{percentile(times, 0.5) * 1000:>10.2f}"
+        f"{percentile(times, 0.99) * 1000:>10.2f}{max(times) * 1000:>10.2f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--boards", type=int, default=100)
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--changes", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "switcher.db")
+        dataset = generate(path, boards=args.boards, tasks=args.tasks, notes=0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            db = Database(path)
+
+        index = QuickIndex()
+        index.watch(db)
+        start = time.perf_counter()
+        index.load(db)
+        build = time.perf_counter() - start
+        # tracemalloc slows down every allocation, the memory is taken from a
+        # second build.
+        gc.collect()
+        tracemalloc.start()
+        QuickIndex().load(db)
+        memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{len(index):,} entries indexed in {build:.2f} s, {memory / 1e6:.1f} MB")
+
+        print(f"{'':<24}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        times = []
+        for query in keystrokes(rng, dataset.titles, args.queries):
+            start = time.perf_counter()
+            index.search(query)
+            times.append(time.perf_counter() - start)
+        report(f"search ({len(times)} keys)", times)
+
+        kanban_id = dataset.kanban_ids[0]
+        with contextlib.redirect_stdout(io.StringIO()):
+            column_name = db.get_columns(kanban_id)[0][1]
+            timings = {"add_task": [], "modify_task": [], "delete_task_by_id": []}
+            task_ids = []
+            for i in range(args.changes):
+                start = time.perf_counter()
+                task_ids.append(db.add_task(f"Switcher {i}", column_name, kanban_id))
+                timings["add_task"].append(time.perf_counter() - start)
+            for task_id in task_ids:
+                start = time.perf_counter()
+                db.modify_task(task_id, new_title=f"Renamed {task_id}")
+                timings["modify_task"].append(time.perf_counter() - start)
+            for task_id in task_ids:
+                start = time.perf_counter()
+                db.delete_task_by_id(task_id)
+                timings["delete_task_by_id"].append(time.perf_counter() - start)
+        for name, values in timings.items():
+            report(f"{name} + index", values)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Scripted UI session with the event-loop profiler on, for CI.
+
+The app is started on a generated database, then boards are switched, tasks added,
+dropped on another column, deleted and scrolled, each step from an after() callback
+like a user would. The profiler report is printed and its Chrome trace written to
+--trace. The app needs a display, on a Linux machine or CI runner without one run
+it under a virtual X server (package xvfb on Debian and Ubuntu), from the repository
+root after installing the dependencies of pyproject.toml:
+
+    sudo apt-get install xvfb
+    xvfb-run -a python benchmarks/bench_ui.py --tasks 10000 --budget-ms 200
+
+Exits with status 1 if a frame stalled longer than --budget-ms, 2 if no display
+could be opened.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import tkinter
+from types import SimpleNamespace
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path[:0] = [os.path.join(ROOT, "src"), ROOT, os.path.dirname(__file__)]
+
+from datagen import generate  # noqa: E402
+
+
+def session(app, rounds):
+    """The steps of the scripted session, each one is run from its own callback."""
+    steps = []
+    for i in range(rounds):
+        kanban_ids = [kanban_id for kanban_id, _ in app.store.get_kanbans()]
+        board = kanban_ids[i % len(kanban_ids)]
+        steps.append(lambda board=board: app.switch_kanban(board))
+        steps.append(lambda i=i: app.columns[0].create_task(f"UI task {i}"))
+        steps.append(lambda: drop(app))
+        steps.append(lambda: delete(app))
+        steps.append(lambda: scroll(app))
+    return steps
+
+
+def drop(app):
+    """Drop the first card of the first column on the second column."""
+    source, target = app.columns[0], app.columns[1]
+    if not source.task_frame.cards:
+        return
+    x_root = target.winfo_rootx() + target.winfo_width() // 2
+    event = SimpleNamespace(x_root=x_root, y_root=target.winfo_rooty() + 40)
+    app.handle_drop(source.task_frame.cards[0], event)
+
+
+def delete(app):
+    cards = app.columns[-1].task_frame.cards
+    if cards and cards[0].winfo_ismapped():
+        cards[0].delete()
+
+
+def scroll(app):
+    with app.profiler.operation("scroll"):
+        for column in app.columns:
+            column.task_frame.scroll_pixels(column.task_frame.row_height * 20)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--boards", type=int, default=5)
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--step-ms", type=int, default=50)
+    parser.add_argument("--trace", default="ui-trace.json")
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ui.db")
+        generate(path, boards=args.boards, columns=3, tasks=args.tasks, notes=0)
+
+        import main as application
+
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                app = application.App(database_path=path, trace_path=args.trace)
+        except tkinter.TclError as e:
+            print(f"Error: {e}, run it under xvfb-run, see {__file__}.")
+            return 2
+
+        def run(steps):
+            if not steps:
+                app.on_closing()
+                return
+            with contextlib.redirect_stdout(io.StringIO()):
+                steps.pop(0)()
+            app.after(args.step_ms, run, steps)
+
+        app.on_ready = lambda: run(session(app, args.rounds))
+        app.mainloop()
+
+    stalls = [lag * 1000 for _, lag, _ in app.profiler.long_frames]
+    if args.budget_ms is not None and stalls and max(stalls) > args.budget_ms:
+        print(f"Longest stall {max(stalls):.1f} ms is over {args.budget_ms:g} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""
+Synthetic PyKanBan databases for the benchmarks.
+
+Rows are written straight with executemany in one transaction, so a million tasks
+take seconds. The same seed always produces the same database.
+
+Usage: python benchmarks/datagen.py out.db [--boards 10] [--columns 5] [--tasks 100000]
+           [--notes 10000] [--title-length 8 60] [--note-length 50 2000] [--seed 0]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+)
+
+from database import Database  # noqa: E402
+
+WORDS = (
+    "fix update review write test deploy refactor design plan release check "
+    "bug feature docs api login page report cache query index board column "
+    "task note user admin mobile server client sync export import backup"
+).split()
+
+BATCH = 50_000  # Rows per executemany call, bounds the memory used for 1M rows
+
+
+class Dataset:
+    """IDs of what generate() created, for the benchmarks to pick targets from."""
+
+    def __init__(self, path, kanban_ids, column_ids, task_ids, note_ids, titles):
+        self.path = path
+        self.kanban_ids = kanban_ids
+        self.column_ids = column_ids  # {kanban_id: [column_id, ...]}
+        self.task_ids = task_ids  # range of task IDs
+        self.note_ids = note_ids  # range of note IDs
+        self.titles = titles  # A sample of task titles, for lookups by title
+
+
+def text(rng, length):
+    """Random words, roughly length characters long."""
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)[:length]
+
+
+def generate(
+    path,
+    boards=10,
+    columns=5,
+    tasks=100_000,
+    notes=10_000,
+    title_length=(8, 60),
+    note_length=(50, 2_000),
+    seed=0,
+    sample=1_000,
+):
+    """
+    Create a database at path and fill it with synthetic boards, tasks and notes.
+
+    Tasks are spread round-robin over every column of every board, so all boards
+    have about the same size.
+
+    :argument title_length: (min, max) length of task and note titles.
+    :argument note_length: (min, max) length of note contents.
+    :argument sample: How many task titles to keep in Dataset.titles.
+
+    :return: A Dataset.
+    """
+    rng = random.Random(seed)
+    sample = min(sample, tasks // 4)
+    today = date.today()
+    with contextlib.redirect_stdout(io.StringIO()), Database(path) as db:
+        db.create_database()
+        with db.transaction() as cursor:
+            kanban_ids = []
+            column_ids = {}
+            all_columns = []
+            for b in range(boards):
+                cursor.execute("INSERT INTO Kanban (name) VALUES (?)", (f"Board {b}",))
+                kanban_id = cursor.lastrowid
+                kanban_ids.append(kanban_id)
+                column_ids[kanban_id] = []
+                for c in range(columns):
+                    cursor.execute(
+                        "INSERT INTO KanbanColumn (name, kanban_id) VALUES (?, ?)",
+                        (f"Column {c}", kanban_id),
+                    )
+                    column_ids[kanban_id].append(cursor.lastrowid)
+                    all_columns.append(cursor.lastrowid)
+            cursor.execute(
+                "UPDATE last_kanban SET kanban_id = ? WHERE id = 1", (kanban_ids[0],)
+            )
+
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM Task")
+            first_task = cursor.fetchone()[0] + 1
+            titles = []
+            for start in range(0, tasks, BATCH):
+                rows = []
+                for i in range(start, min(start + BATCH, tasks)):
+                    title = f"#{i} " + text(rng, rng.randint(*title_length))
+                    created_at = today - timedelta(days=rng.randint(0, 365))
+                    rows.append((first_task + i, title, str(created_at)))
+                    if len(titles) < sample:
+                        titles.append(title)
+                cursor.executemany(
+                    "INSERT INTO Task (id, title, created_at) VALUES (?, ?, ?)", rows
+                )
+                cursor.executemany(
+                    "INSERT INTO TaskColumnLink (task_id, column_id, position) "
+                    "VALUES (?, ?, ?)",
+                    (
+                        (
+                            task_id,
+                            all_columns[(task_id - first_task) % len(all_columns)],
+                            (task_id - first_task) // len(all_columns) + 1,
+                        )
+                        for task_id, _, _ in rows
+                    ),
+                )
+
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM Note")
+            first_note = cursor.fetchone()[0] + 1
+            for start in range(0, notes, BATCH):
+                rows = [
+                    (
+                        first_note + i,
+                        text(rng, rng.randint(*title_length)),
+                        text(rng, rng.randint(*note_length)),
+                    )
+                    for i in range(start, min(start + BATCH, notes))
+                ]
+                cursor.executemany(
+                    "INSERT INTO Note (id, title, content) VALUES (?, ?, ?)", rows
+                )
+                # Tasks are indexed by triggers, notes by Database.add_note.
+                cursor.executemany(
+                    "INSERT INTO NoteSearch (rowid, title, content) VALUES (?, ?, ?)",
+                    rows,
+                )
+        # Fresh statistics, like a database that has been in use for a while.
+        db.get_connection().execute("ANALYZE")
+
+    return Dataset(
+        path,
+        kanban_ids,
+        column_ids,
+        range(first_task, first_task + tasks),
+        range(first_note, first_note + notes),
+        titles,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path")
+    parser.add_argument("--boards", type=int, default=10)
+    parser.add_argument("--columns", type=int, default=5)
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--notes", type=int, default=10_000)
+    parser.add_argument("--title-length", type=int, nargs=2, default=[8, 60])
+    parser.add_argument("--note-length", type=int, nargs=2, default=[50, 2_000])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if os.path.exists(args.path):
+        parser.error(f"{args.path} already exists")
+    dataset = generate(
+        args.path,
+        boards=args.boards,
+        columns=args.columns,
+        tasks=args.tasks,
+        notes=args.notes,
+        title_length=tuple(args.title_length),
+        note_length=tuple(args.note_length),
+        seed=args.seed,
+    )
+    print(
+        f"{args.path}: {len(dataset.kanban_ids)} boards, "
+        f"{sum(len(c) for c in dataset.column_ids.values())} columns, "
+        f"{len(dataset.task_ids)} tasks, {len(dataset.note_ids)} notes"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,58 +1,161 @@
 import time
 
-import pywinstyles
+DEFAULT_FPS = 100
+DEFAULT_FRAME_BUDGET_MS = 8
+
+
+class AnimationScheduler:
+    """
+    Run every active fade from a single after() tick instead of blocking loops.
+
+    Each tick advances all fades by one step, so 300 cards fade in together in the
+    time one used to take. Work stops for the frame once frame_budget_ms is spent,
+    the remaining fades carry on at the next tick. Fades of destroyed widgets are
+    dropped, and when enabled is False fades jump straight to their final opacity.
+    """
+
+    def __init__(
+        self,
+        root,
+        fps: int = DEFAULT_FPS,
+        frame_budget_ms: float = DEFAULT_FRAME_BUDGET_MS,
+        enabled: bool = True,
+    ):
+        self.root = root
+        self.interval = max(1, round(1000 / fps))
+        self.frame_budget = frame_budget_ms / 1000
+        self.enabled = enabled
+        self._fades = {}
+        self._after_id = None
+
+    def fade(self, widget, from_: int, to: int, step: int, on_done=None):
+        """
+        Fade a widget from one opacity to another.
+
+        :argument widget: The widget to fade.
+        :argument from_: The starting opacity value (0-100).
+        :argument to: The ending opacity value (0-100).
+        :argument step: The step size to fade by each frame.
+        :argument on_done: Called without arguments once the fade finished.
+        """
+        if type(from_) is not int:
+            raise TypeError("You must provide the from_ as an integer")
+        if type(to) is not int:
+            raise TypeError("You must provide the to as an integer")
+        if type(step) is not int:
+            raise TypeError("You must provide the step as an integer")
+
+        self.cancel(widget)
+        if not self.enabled or step == 0 or (to - from_) * step <= 0:
+            self._set_opacity(widget, to)
+            if on_done is not None:
+                on_done()
+            return
+
+        self._fades[widget] = [from_, to, step, on_done]
+        self._set_opacity(widget, from_)
+        if self._after_id is None:
+            self._after_id = self.root.after(self.interval, self._tick)
+
+    def cancel(self, widget):
+        """Stop fading a widget, leaving it at its current opacity."""
+        self._fades.pop(widget, None)
+
+    def cancel_all(self):
+        self._fades.clear()
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def active(self):
+        return len(self._fades)
+
+    @staticmethod
+    def _set_opacity(widget, value):
+        set_opacity(widget, value / 100)
+
+    def _tick(self):
+        self._after_id = None
+        start = time.perf_counter()
+        for widget in list(self._fades):
+            fade = self._fades.pop(widget)
+            try:
+                exists = widget.winfo_exists()
+            except Exception:
+                exists = False
+            if not exists:
+                continue
+
+            value, to, step, on_done = fade
+            value = min(value + step, to) if step > 0 else max(value + step, to)
+            self._set_opacity(widget, value)
+            if value == to:
+                if on_done is not None:
+                    on_done()
+            else:
+                # Re-inserting keeps the fades that did not run this frame in front.
+                fade[0] = value
+                self._fades[widget] = fade
+
+            if time.perf_counter() - start > self.frame_budget:
+                break
+
+        if self._fades and self._after_id is None:
+            self._after_id = self.root.after(self.interval, self._tick)
+
+
+def set_opacity(widget, opacity: float):
+    """
+    Set the opacity (0.0-1.0) of a widget.
+
+    pywinstyles only works on Windows, elsewhere (e.g. under a virtual X server)
+    widgets simply stay opaque.
+    """
+    try:
+        # Imported on first use rather than at startup.
+        import pywinstyles
+
+        if widget.winfo_exists():
+            pywinstyles.set_opacity(widget.winfo_id(), value=opacity)
+    except Exception:
+        # No Windows, or the widget was destroyed while its fade was pending.
+        pass
+
+
+def get_scheduler(widget_parent):
+    """Return the AnimationScheduler of the application owning widget_parent."""
+    root = widget_parent._root()
+    scheduler = getattr(root, "animations", None)
+    if scheduler is None:
+        scheduler = root.animations = AnimationScheduler(root)
+    return scheduler
 
 
 def fade_out(
-    widget_parent, widget_id: int, from_: int = 100, to: int = 0, step: int = -10
+    widget_parent, widget, from_: int = 100, to: int = 0, step: int = -10, on_done=None
 ):
     """
-    Fade a widget out from x% to y% over a specified time period.
+    Fade a widget out from x% to y% without blocking the main loop.
 
     :param widget_parent: in general self.
-    :argument widget_id: The widget to fade.
+    :argument widget: The widget to fade.
     :argument from_: The starting opacity value (0-100).
     :argument to: The ending opacity value (0-100).
     :argument step: The step size to fade by.
+    :argument on_done: Called once the widget is fully faded, e.g. widget.destroy.
     """
-    if type(widget_id) is not int:
-        raise TypeError("You must provide the widget_id as an integer")
-    if type(from_) is not int:
-        raise TypeError("You must provide the from_ as an integer")
-    if type(to) is not int:
-        raise TypeError("You must provide the to as an integer")
-    if type(step) is not int:
-        raise TypeError("You must provide the step as an integer")
-
-    for i in range(from_, to, step):
-        if not widget_parent.winfo_exists():
-            break
-        pywinstyles.set_opacity(widget_id, value=i / 100)
-        widget_parent.update()
-        time.sleep(1 / 100)
+    get_scheduler(widget_parent).fade(widget, from_, to, step, on_done)
 
 
-def fade_in(widget_parent, widget_id: int, from_=0, to=100, step: int = 10):
+def fade_in(widget_parent, widget, from_=0, to=100, step: int = 10, on_done=None):
     """
-    Fade a widget in from x% to y% over a specified time period.
+    Fade a widget in from x% to y% without blocking the main loop.
 
     :argument widget_parent: in general self.
-    :argument widget_id: The widget to fade.
+    :argument widget: The widget to fade.
     :argument from_: The starting opacity value (0-100).
     :argument to: The ending opacity value (0-100).
     :argument step: The step size to fade by.
+    :argument on_done: Called once the widget is fully visible.
     """
-    if type(widget_id) is not int:
-        raise TypeError("You must provide the widget_id as an integer")
-    if type(from_) is not int:
-        raise TypeError("You must provide the from_ as an integer")
-    if type(to) is not int:
-        raise TypeError("You must provide the to as an integer")
-    if type(step) is not int:
-        raise TypeError("You must provide the step as an integer")
-    for i in range(from_, to, step):
-        if not widget_parent.winfo_exists():
-            break
-        pywinstyles.set_opacity(widget_id, value=i / 100)
-        widget_parent.update()
-        time.sleep(1 / 100)
+    get_scheduler(widget_parent).fade(widget, from_, to, step, on_done)
@@ -0,0 +1,76 @@
+import queue
+from collections import Counter
+from datetime import date, timedelta
+
+DEFAULT_BATCH = 500
+
+
+class Archiver:
+    """
+    Moves the tasks left too long in a column to the archive, in the background.
+
+    A run archives batch tasks per DatabaseWriter job (see Database.archive_tasks),
+    so the writes of the UI are committed in between, and goes on until a batch
+    comes back short. poll() is called from the UI thread, it starts the next batch
+    and returns the boards that lost tasks so their cached copy can be dropped.
+    """
+
+    def __init__(
+        self, db, writer, column_name, days, batch=DEFAULT_BATCH, kanban_id=None
+    ):
+        """
+        :argument column_name: Tasks are archived from the columns with this name, an
+            empty name turns the archiver off.
+        :argument days: How long a task stays in the column before being archived.
+        :argument kanban_id: The board to archive, None for every board.
+        """
+        self.db = db
+        self.writer = writer
+        self.column_name = column_name
+        self.days = days
+        self.batch = batch
+        self.kanban_id = kanban_id
+        self.running = False
+        self.archived = 0
+        self._done = queue.Queue()
+
+    def start(self):
+        """Start a run, unless one is going on. Returns True if it started."""
+        if self.running or not self.column_name:
+            return False
+        self.running = True
+        self._submit()
+        return True
+
+    def _submit(self):
+        older_than = date.today() - timedelta(days=self.days)
+        self.writer.submit(
+            ("archive",),
+            self.db.archive_tasks,
+            self.column_name,
+            older_than,
+            self.batch,
+            self.kanban_id,
+            on_done=self._archived,
+        )
+
+    def _archived(self, counts, error):
+        # On the writer thread, once the batch is committed. A failed batch ends the
+        # run, the writer reports it.
+        self._done.put(Counter() if error is not None else counts)
+
+    def poll(self):
+        """Return the set of kanban_ids that lost tasks since the last call."""
+        kanban_ids = set()
+        while True:
+            try:
+                counts = self._done.get_nowait()
+            except queue.Empty:
+                return kanban_ids
+            kanban_ids.update(counts)
+            archived = sum(counts.values())
+            self.archived += archived
+            if archived >= self.batch:
+                self._submit()
+            else:
+                self.running = False
@@ -0,0 +1,384 @@
+from collections import OrderedDict
+from datetime import date
+
+from database import POSITION_STEP, position_between
+
+# Rough per-object costs used to keep the cache under its memory budget. They do not
+# have to be exact, only proportional to what a board really holds in memory.
+BOARD_OVERHEAD = 256
+COLUMN_OVERHEAD = 192
+TASK_OVERHEAD = 160
+
+DEFAULT_MEMORY_BUDGET = 8 * 1024 * 1024  # 8 MB
+DEFAULT_PAGE_SIZE = 50
+DEFAULT_COLUMNS = ("To Do", "In Progress", "Done")
+
+
+class Column:
+    """
+    A cached column, its tasks are (task_id, title, created_at, position) tuples in
+    position order.
+
+    Only a prefix of the tasks may be loaded, total is the real number of tasks.
+    """
+
+    __slots__ = ("id", "name", "tasks", "total")
+
+    def __init__(self, column_id, name, tasks, total=None):
+        self.id = column_id
+        self.name = name
+        self.tasks = tasks
+        self.total = len(tasks) if total is None else total
+
+    @property
+    def complete(self):
+        return len(self.tasks) >= self.total
+
+    def index_of(self, task_id):
+        for i, task in enumerate(self.tasks):
+            if task[0] == task_id:
+                return i
+        return None
+
+
+class Board:
+    """A cached Kanban board with its columns in display order."""
+
+    __slots__ = ("id", "name", "columns", "size")
+
+    def __init__(self, kanban_id, name, columns):
+        self.id = kanban_id
+        self.name = name
+        self.columns = columns
+        self.size = 0
+
+    def column(self, column_id):
+        for column in self.columns:
+            if column.id == column_id:
+                return column
+        return None
+
+    def find_task(self, task_id):
+        """Return (column, index) of a task, or (None, None) if it is not on the board."""
+        for column in self.columns:
+            index = column.index_of(task_id)
+            if index is not None:
+                return column, index
+        return None, None
+
+    def estimate_size(self):
+        size = BOARD_OVERHEAD + len(self.name)
+        for column in self.columns:
+            size += COLUMN_OVERHEAD + len(column.name)
+            for task in column.tasks:
+                size += TASK_OVERHEAD + len(task[1])
+        return size
+
+
+class BoardStore:
+    """
+    In-memory model of the Kanban boards sitting between the UI and the Database.
+
+    Reads are served from memory once a board has been loaded, writes go to the
+    database first and are then applied to the cached copy. Boards are kept in
+    least-recently-used order and evicted once their estimated size exceeds the
+    memory budget; the most recently used board is always kept.
+
+    When a DatabaseWriter is given, task moves, renames, deletions and the current
+    board are written in the background and the cache is updated right away.
+    """
+
+    def __init__(
+        self,
+        db,
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+        writer=None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ):
+        self.db = db
+        self.writer = writer
+        self.memory_budget = memory_budget
+        self.page_size = page_size
+        self._boards = OrderedDict()
+        self._kanbans = None
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        """Return the cache counters as a dictionary."""
+        return {
+            "boards": len(self._boards),
+            "size": self.size,
+            "memory_budget": self.memory_budget,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def invalidate(self, kanban_id=None):
+        """Drop one board, or everything when kanban_id is None, from the cache."""
+        if kanban_id is None:
+            self._boards.clear()
+            self._kanbans = None
+            self.size = 0
+            return
+        board = self._boards.pop(kanban_id, None)
+        if board is not None:
+            self.size -= board.size
+
+    def _resize(self, board, delta=None):
+        """Update the size of a board, by delta bytes or by re-estimating it."""
+        if delta is None:
+            delta = board.estimate_size() - board.size
+        board.size += delta
+        self.size += delta
+
+    def _write(self, key, function, *args):
+        """Run a row write in the background if a writer is set, else right away."""
+        if self.writer is None:
+            return function(*args)
+        self.writer.submit(key, function, *args)
+        return True
+
+    def flush(self):
+        """Wait for the background writes, so the database matches the cache."""
+        if self.writer is not None:
+            self.writer.flush()
+
+    def _evict(self):
+        while self.size > self.memory_budget and len(self._boards) > 1:
+            _, board = self._boards.popitem(last=False)
+            self.size -= board.size
+            self.evictions += 1
+
+    # Boards
+
+    def get_kanbans(self):
+        """Return the (id, name) list of every Kanban board."""
+        if self._kanbans is None:
+            self.misses += 1
+            self.flush()
+            self._kanbans = self.db.get_kanbans()
+        else:
+            self.hits += 1
+        return list(self._kanbans)
+
+    def get_board(self, kanban_id):
+        """Return the cached Board for kanban_id, loading it on a miss."""
+        board = self._boards.get(kanban_id)
+        if board is not None:
+            self.hits += 1
+            self._boards.move_to_end(kanban_id)
+            return board
+
+        self.misses += 1
+        self.flush()
+        name, columns = self.db.load_board(kanban_id, page_size=self.page_size)
+        board = Board(kanban_id, name, [Column(*column) for column in columns])
+        self._boards[kanban_id] = board
+        self._resize(board)
+        self._evict()
+        return board
+
+    def get_tasks(self, kanban_id, column_id, start, limit):
+        """
+        Return tasks start to start + limit of a column, loading pages as needed.
+
+        Missing tasks are fetched with one keyset query starting after the last
+        cached task, so scrolling a long column never re-reads earlier pages.
+        Tasks are (task_id, title, created_at, position) tuples.
+        """
+        board = self.get_board(kanban_id)
+        column = board.column(column_id)
+        if column is None:
+            return []
+        end = min(start + limit, column.total)
+        if len(column.tasks) < end:
+            self.misses += 1
+            self.flush()
+            last = column.tasks[-1] if column.tasks else None
+            after = (last[3], last[0]) if last else None
+            wanted = max(self.page_size, end - len(column.tasks))
+            page = self.db.get_tasks_page(column_id, after, wanted)
+            column.tasks.extend(page)
+            if len(page) < wanted and len(column.tasks) < column.total:
+                # The column shrank behind our back, trust what the database says.
+                column.total = len(column.tasks)
+            self._resize(board, sum(TASK_OVERHEAD + len(task[1]) for task in page))
+            self._evict()
+        else:
+            self.hits += 1
+        return column.tasks[start:end]
+
+    def get_kanban_name(self, kanban_id):
+        return self.get_board(kanban_id).name
+
+    def set_current_kanban(self, kanban_id):
+        """Remember kanban_id as the board to open on the next launch."""
+        self._write(("last_kanban",), self.db.update_current_kanban, kanban_id)
+
+    def create_kanban(self, name, columns=DEFAULT_COLUMNS):
+        """Create a board with its default columns in one transaction."""
+        with self.db.transaction():
+            kanban_id = self.db.create_kanban(name)
+            if kanban_id is None:
+                return None
+            for column_name in columns:
+                self.db.create_column(column_name, kanban_id)
+        self._kanbans = None
+        return kanban_id
+
+    def rename_kanban(self, kanban_id, new_name):
+        if not self.db.modify_kanban(kanban_id, new_name):
+            return False
+        self._kanbans = None
+        board = self._boards.get(kanban_id)
+        if board is not None:
+            self._resize(board, len(new_name) - len(board.name))
+            board.name = new_name
+        return True
+
+    def delete_kanban(self, kanban_id):
+        self.flush()
+        deleted = self.db.delete_kanban(kanban_id)
+        self._kanbans = None
+        self.invalidate(kanban_id)
+        return deleted
+
+    # Tasks
+
+    def add_task(self, kanban_id, column_id, title):
+        """Add a task to a column and return its ID, or None on failure."""
+        board = self.get_board(kanban_id)
+        column = board.column(column_id)
+        if column is None:
+            return None
+        # The cache knows the last position of a fully loaded column even when moves
+        # into it are still waiting in the writer, the database would not.
+        position = None
+        if column.complete:
+            position, _ = position_between(
+                column.tasks[-1][3] if column.tasks else None
+            )
+        task_id = self.db.add_task(
+            title=title, column_name=column.name, kanban_id=kanban_id, position=position
+        )
+        if task_id:
+            if column.complete:
+                column.tasks.append((task_id, title, str(date.today()), position))
+                self._resize(board, TASK_OVERHEAD + len(title))
+                self._evict()
+            column.total += 1
+        return task_id
+
+    def move_task(self, kanban_id, task_id, column_id, index=None):
+        """
+        Move a task to a column, at index among its tasks or after the last one.
+
+        The new position is the midpoint of the positions of the two tasks around
+        index, so only the moved task is written. When they are too close to split,
+        the column is rebalanced in the background.
+        """
+        position = None
+        crowded = False
+        stale = False
+        board = self._boards.get(kanban_id)
+        target = board.column(column_id) if board is not None else None
+        if target is None:
+            stale = board is not None
+        else:
+            if index is not None:
+                # Load the tasks around the drop spot, they give its position.
+                self.get_tasks(kanban_id, column_id, 0, index + 1)
+            source, old_index = board.find_task(task_id)
+            task = None
+            if source is None:
+                # Past the loaded prefix of its column, which is reloaded afterwards.
+                stale = True
+            else:
+                task = source.tasks.pop(old_index)
+                source.total -= 1
+                target.total += 1
+                if index is not None and source is target and old_index < index:
+                    index -= 1
+            if index is None and target.complete:
+                index = len(target.tasks)
+            if index is not None and index <= len(target.tasks):
+                before = target.tasks[index - 1][3] if index > 0 else None
+                after = target.tasks[index][3] if index < len(target.tasks) else None
+                position, crowded = position_between(before, after)
+                if task is not None:
+                    target.tasks.insert(index, task[:3] + (position,))
+            elif task is not None:
+                # Goes after tasks that are not loaded, the database places it.
+                self._resize(board, -(TASK_OVERHEAD + len(task[1])))
+
+        if not self._write(
+            ("task", task_id, "column"),
+            self.db.move_task,
+            task_id,
+            column_id,
+            position,
+        ):
+            self.invalidate(kanban_id)
+            return False
+        if crowded:
+            self.rebalance_column(kanban_id, column_id)
+        if stale:
+            self.invalidate(kanban_id)
+        return True
+
+    def rebalance_column(self, kanban_id, column_id):
+        """Space the positions of a column evenly, in the cache and the database."""
+        board = self._boards.get(kanban_id)
+        column = board.column(column_id) if board is not None else None
+        if column is not None:
+            # Same numbering as Database.rebalance_column, the cache holds the first
+            # tasks of the column in the same order.
+            for i, task in enumerate(column.tasks):
+                column.tasks[i] = task[:3] + ((i + 1) * POSITION_STEP,)
+        self._write(
+            ("column", column_id, "rebalance"), self.db.rebalance_column, column_id
+        )
+
+    def rename_task(self, kanban_id, task_id, title):
+        if not self._write(
+            ("task", task_id, "title"), self.db.modify_task, task_id, title
+        ):
+            return False
+        board = self._boards.get(kanban_id)
+        if board is not None:
+            column, index = board.find_task(task_id)
+            if column is not None:
+                old_title = column.tasks[index][1]
+                column.tasks[index] = (task_id, title) + column.tasks[index][2:]
+                self._resize(board, len(title) - len(old_title))
+        return True
+
+    def restore_task(self, kanban_id, task_id):
+        """Put an archived task back on its board, see Database.restore_task."""
+        self.flush()
+        if self.db.restore_task(task_id) is None:
+            return False
+        self.invalidate(kanban_id)
+        return True
+
+    def delete_task(self, kanban_id, task_id):
+        if self.writer is not None:
+            # The task is going away, earlier writes to it are pointless.
+            self.writer.cancel(("task", task_id, "column"))
+            self.writer.cancel(("task", task_id, "title"))
+        if not self._write(("task", task_id), self.db.delete_task_by_id, task_id):
+            return False
+        board = self._boards.get(kanban_id)
+        if board is not None:
+            column, index = board.find_task(task_id)
+            if column is None:
+                self.invalidate(kanban_id)
+            else:
+                title = column.tasks.pop(index)[1]
+                column.total -= 1
+                self._resize(board, -(TASK_OVERHEAD + len(title)))
+        return True
@@ -0,0 +1,202 @@
+import configparser
+import os
+import tempfile
+import threading
+import time
+
+SECTION = "DEFAULT"
+
+# Every tunable of the application with its default value. settings.ini only needs
+# the keys that differ, anything missing falls back to these.
+DEFAULTS = {
+    # Folder holding PyKanBan.db, defaults to the "database" folder next to the app.
+    "database_path": "",
+    # SQLite pragmas applied to every connection, see Database.get_connection.
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "cache_size": -8000,  # Negative values are KiB, so roughly 8 MB of page cache
+    "temp_store": "MEMORY",
+    # Query profiling, see query_profiler.py. Prints a summary when the app exits.
+    "profile_queries": False,
+    "slow_query_ms": 50,  # Statements taking longer are logged with their query plan
+    # Note contents larger than this many bytes are stored zlib-compressed, 0 never
+    "note_compress_bytes": 4096,
+    # Archiving, see archiver.py. Tasks left archive_after_days days in a column
+    # called archive_column are moved to the archive, in batches of archive_batch
+    # tasks, every archive_interval_s seconds. The column name is matched on every
+    # board. An empty name turns it off.
+    "archive_column": "Done",
+    "archive_after_days": 30,
+    "archive_batch": 500,
+    "archive_interval_s": 3600,
+    # Interface
+    "animations": True,
+    "animation_max_tasks": 150,  # Boards with more tasks are shown without fading
+    "page_size": 50,  # Tasks loaded per column and per page
+    # Approximate bytes of boards kept in memory, the least recently shown are dropped
+    "board_cache_bytes": 8 * 1024 * 1024,
+    "writer_poll_ms": 200,  # How often the UI checks for failed background writes
+    "drag_fps": 60,  # Maximum rate at which a dragged task follows the mouse
+    "drag_stats": False,  # Print event and timing counters after every drag
+    "note_autosave_ms": 1000,  # Sticky notes are saved once typing stops this long
+    # Event-loop profiling, see ui/ctk_profiler.py. The trace is written on exit.
+    "profile_ui": False,
+    "ui_trace_path": "pykanban-trace.json",
+    "ui_heartbeat_ms": 16,
+    "long_frame_ms": 50,  # Heartbeats later than this are reported as long frames
+}
+
+DEFAULT_SAVE_DELAY = 0.5  # Seconds to wait for more changes before writing the file
+DEFAULT_CHECK_INTERVAL = 1.0  # Seconds between two checks for external edits
+
+_configs = {}
+_configs_lock = threading.Lock()
+
+
+class Config:
+    """
+    settings.ini loaded once and served from memory.
+
+    Values are read with typed getters and fall back to DEFAULTS. The file's mtime is
+    checked at most every check_interval seconds, so edits made by hand while the
+    application runs are picked up without re-parsing on every read. Changes are
+    written after save_delay seconds without further changes, to a temporary file
+    renamed over settings.ini so a crash never leaves it half written.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        save_delay: float = DEFAULT_SAVE_DELAY,
+        check_interval: float = DEFAULT_CHECK_INTERVAL,
+    ):
+        self.path = path
+        self.save_delay = save_delay
+        self.check_interval = check_interval
+        self.loads = 0
+        self.saves = 0
+        self._values = {}
+        self._changes = {}
+        self._mtime = None
+        self._checked = 0.0
+        self._timer = None
+        self._lock = threading.RLock()
+        self.reload()
+
+    def reload(self):
+        """Read settings.ini again, keeping the changes not saved yet."""
+        with self._lock:
+            parser = configparser.ConfigParser(interpolation=None)
+            try:
+                self._mtime = os.stat(self.path).st_mtime_ns
+                parser.read(self.path)
+            except OSError:
+                self._mtime = None
+            self._values = dict(parser[SECTION])
+            self._values.update(self._changes)
+            self._checked = time.monotonic()
+            self.loads += 1
+
+    def _check(self):
+        if time.monotonic() - self._checked < self.check_interval:
+            return
+        self._checked = time.monotonic()
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime != self._mtime:
+            self.reload()
+
+    def get(self, key: str, fallback=None):
+        """
+        Return a value as a string.
+
+        :argument fallback: Returned when the key is neither in the file nor in
+            DEFAULTS.
+        """
+        with self._lock:
+            self._check()
+            if key in self._values:
+                return self._values[key]
+        if key in DEFAULTS:
+            return str(DEFAULTS[key])
+        return fallback
+
+    def get_int(self, key: str, fallback: int = None) -> int:
+        value = self.get(key)
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return DEFAULTS.get(key, fallback)
+
+    def get_float(self, key: str, fallback: float = None) -> float:
+        value = self.get(key)
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return DEFAULTS.get(key, fallback)
+
+    def get_bool(self, key: str, fallback: bool = None) -> bool:
+        value = self.get(key)
+        if value is None:
+            return fallback
+        state = configparser.ConfigParser.BOOLEAN_STATES.get(value.lower())
+        return DEFAULTS.get(key, fallback) if state is None else state
+
+    def set(self, key: str, value):
+        """Change a value, settings.ini is written once changes stop for save_delay."""
+        if isinstance(value, bool):
+            value = "true" if value else "false"
+        with self._lock:
+            self._values[key] = self._changes[key] = str(value)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.save_delay, self.save)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def save(self):
+        """Write the values to settings.ini now."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            parser = configparser.ConfigParser(interpolation=None)
+            parser[SECTION] = self._values
+            directory = os.path.dirname(os.path.abspath(self.path))
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as configfile:
+                    parser.write(configfile)
+                    configfile.flush()
+                    os.fsync(configfile.fileno())
+                os.replace(temp_path, self.path)
+            except OSError as e:
+                print(f"Error: Could not save {self.path}: {e}")
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+                return False
+            self._changes.clear()
+            self._mtime = os.stat(self.path).st_mtime_ns
+            self.saves += 1
+            return True
+
+    def flush(self):
+        """Write pending changes right away, call it before exiting."""
+        with self._lock:
+            if self._changes:
+                self.save()
+
+
+def get_config(path: str) -> Config:
+    """Return the Config of a file, shared by everything reading that file."""
+    path = os.path.abspath(path)
+    with _configs_lock:
+        config = _configs.get(path)
+        if config is None:
+            config = _configs[path] = Config(path)
+        return config
@@ -1,131 +1,633 @@
 import sqlite3
+import threading
+import zlib
+from collections import Counter
 from datetime import date
 import sys
 import os
-import configparser
+import math
+import re
+import unicodedata
+from contextlib import contextmanager
+
+from config import DEFAULTS, get_config
+from query_profiler import ProfilingConnection, QueryProfiler
+
+
+# Applied once to every connection opened by Database.get_connection(), the values
+# can be overridden in settings.ini.
+CONNECTION_PRAGMAS = {
+    pragma: DEFAULTS[pragma]
+    for pragma in (
+        "journal_mode",
+        "synchronous",
+        "busy_timeout",
+        "cache_size",
+        "temp_store",
+    )
+}
+
+
+def _compress_notes(database, cursor):
+    """Migration 5, note contents over the configured threshold are compressed."""
+    cursor.execute("ALTER TABLE Note ADD COLUMN compressed INTEGER NOT NULL DEFAULT 0")
+    # Covers get_note_titles, which then never reads the pages holding the contents.
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_Note_title ON Note (title)")
+    threshold = database.note_compress_bytes
+    if not threshold:
+        return
+    cursor.execute(
+        "SELECT id FROM Note WHERE length(CAST(content AS BLOB)) > ?", (threshold,)
+    )
+    # One note at a time, so a database full of large notes fits in memory.
+    for (note_id,) in cursor.fetchall():
+        cursor.execute("SELECT content FROM Note WHERE id = ?", (note_id,))
+        content, compressed = pack_note(cursor.fetchone()[0], threshold)
+        if compressed:
+            cursor.execute(
+                "UPDATE Note SET content = ?, compressed = 1 WHERE id = ?",
+                (content, note_id),
+            )
+
+
+def _create_search_index(database, cursor):
+    """Migration 6, full-text search over task titles and notes, see Database.search."""
+    cursor.execute(
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS TaskSearch USING fts5
+                      (title, content='Task', content_rowid='id', {SEARCH_OPTIONS})"""
+    )
+    # Note contents may be compressed, Database indexes them itself, see _index_note.
+    # The index is contentless so the text is not stored a second time.
+    cursor.execute(
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS NoteSearch USING fts5
+                      (title, content, content='', {SEARCH_OPTIONS})"""
+    )
+    cursor.execute(
+        """CREATE TRIGGER IF NOT EXISTS Task_search_insert AFTER INSERT ON Task
+           BEGIN
+               INSERT INTO TaskSearch (rowid, title) VALUES (new.id, new.title);
+           END"""
+    )
+    cursor.execute(
+        """CREATE TRIGGER IF NOT EXISTS Task_search_delete AFTER DELETE ON Task
+           BEGIN
+               INSERT INTO TaskSearch (TaskSearch, rowid, title)
+               VALUES ('delete', old.id, old.title);
+           END"""
+    )
+    cursor.execute(
+        """CREATE TRIGGER IF NOT EXISTS Task_search_update AFTER UPDATE OF title ON Task
+           BEGIN
+               INSERT INTO TaskSearch (TaskSearch, rowid, title)
+               VALUES ('delete', old.id, old.title);
+               INSERT INTO TaskSearch (rowid, title) VALUES (new.id, new.title);
+           END"""
+    )
+    _rebuild_search_index(cursor)
+
+
+def _rebuild_search_index(cursor):
+    cursor.execute("INSERT INTO TaskSearch (TaskSearch) VALUES ('rebuild')")
+    cursor.execute("INSERT INTO NoteSearch (NoteSearch) VALUES ('delete-all')")
+    cursor.execute("SELECT id FROM Note")
+    for (note_id,) in cursor.fetchall():
+        cursor.execute(
+            "SELECT title, content, compressed FROM Note WHERE id = ?", (note_id,)
+        )
+        title, content, compressed = cursor.fetchone()
+        cursor.execute(
+            "INSERT INTO NoteSearch (rowid, title, content) VALUES (?, ?, ?)",
+            (note_id, title, unpack_note(content, compressed)),
+        )
+
+
+# Schema migrations, applied in order by Database.migrate(). Entry N upgrades a
+# database from user_version N to N + 1 and is either a tuple of SQL statements or
+# a callable receiving the Database and a cursor. Never edit a shipped entry, append
+# a new one.
+MIGRATIONS = [
+    # 1: Initial schema, databases created before versioning already have it.
+    (
+        """CREATE TABLE IF NOT EXISTS Task
+                      (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                       title TEXT NOT NULL,
+                       created_at TEXT NOT NULL)""",
+        """CREATE TABLE IF NOT EXISTS Note
+                      (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                       title TEXT NOT NULL,
+                       content TEXT NOT NULL)""",
+        """CREATE TABLE IF NOT EXISTS Kanban
+                      (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                       name TEXT UNIQUE NOT NULL)""",
+        """CREATE TABLE IF NOT EXISTS KanbanColumn
+                      (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                       name TEXT NOT NULL,
+                       kanban_id INTEGER NOT NULL,
+                       FOREIGN KEY (kanban_id) REFERENCES Kanban (id),
+                       UNIQUE (name, kanban_id))""",
+        """CREATE TABLE IF NOT EXISTS TaskColumnLink
+                      (task_id INTEGER NOT NULL,
+                       column_id INTEGER NOT NULL,
+                       FOREIGN KEY (task_id) REFERENCES Task (id),
+                       FOREIGN KEY (column_id) REFERENCES KanbanColumn (id),
+                       PRIMARY KEY (task_id, column_id))""",
+        """CREATE TABLE IF NOT EXISTS last_kanban
+                      (id INTEGER PRIMARY KEY CHECK (id = 1),
+                       kanban_id INTEGER,
+                       FOREIGN KEY (kanban_id) REFERENCES Kanban (id))""",
+        "INSERT OR IGNORE INTO last_kanban (id, kanban_id) VALUES (1, 1)",
+    ),
+    # 2: Indexes for the hot lookup paths.
+    (
+        # Covers the column -> tasks join without touching the table.
+        """CREATE INDEX IF NOT EXISTS idx_TaskColumnLink_column
+                      ON TaskColumnLink (column_id, task_id)""",
+        # Covers get_columns / load_board, ordered by board then name.
+        """CREATE INDEX IF NOT EXISTS idx_KanbanColumn_kanban
+                      ON KanbanColumn (kanban_id, name)""",
+        # Used by delete_task, which looks tasks up by title.
+        "CREATE INDEX IF NOT EXISTS idx_Task_title ON Task (title)",
+    ),
+    # 3: Manual ordering of the tasks inside a column. Positions are fractional, a
+    # task dropped between two others gets the midpoint, see Database.move_task.
+    (
+        "ALTER TABLE TaskColumnLink ADD COLUMN position REAL NOT NULL DEFAULT 0",
+        # Keep the order the tasks were shown in so far.
+        "UPDATE TaskColumnLink SET position = task_id",
+        # Reads go through (column_id, position), ties are broken by task_id.
+        """CREATE INDEX IF NOT EXISTS idx_TaskColumnLink_position
+                      ON TaskColumnLink (column_id, position, task_id)""",
+        "DROP INDEX IF EXISTS idx_TaskColumnLink_column",
+    ),
+    # 4: Sticky note windows, open notes are shown again on the next launch.
+    (
+        "ALTER TABLE Note ADD COLUMN geometry TEXT",
+        "ALTER TABLE Note ADD COLUMN pinned INTEGER NOT NULL DEFAULT 0",
+        "ALTER TABLE Note ADD COLUMN is_open INTEGER NOT NULL DEFAULT 0",
+        "CREATE INDEX IF NOT EXISTS idx_Note_open ON Note (is_open) WHERE is_open = 1",
+    ),
+    # 5: Large note contents are stored zlib-compressed, see pack_note.
+    _compress_notes,
+    # 6: Full-text search.
+    _create_search_index,
+    # 7: Archive of the tasks left in a column for too long, see archive_tasks.
+    (
+        # The day a task entered its column, see migration 8 for the tasks before.
+        "ALTER TABLE TaskColumnLink ADD COLUMN moved_at TEXT",
+        # Archived tasks keep their ID, AUTOINCREMENT never hands it out again.
+        """CREATE TABLE IF NOT EXISTS ArchivedTask
+                      (id INTEGER PRIMARY KEY,
+                       title TEXT NOT NULL,
+                       created_at TEXT NOT NULL,
+                       archived_at TEXT NOT NULL,
+                       kanban_id INTEGER NOT NULL,
+                       column_id INTEGER NOT NULL,
+                       column_name TEXT NOT NULL)""",
+        # Browsing the archive of a board, newest tasks first.
+        """CREATE INDEX IF NOT EXISTS idx_ArchivedTask_kanban
+                      ON ArchivedTask (kanban_id, id)""",
+    ),
+    # 8: Tasks placed before migration 7 count as entering their column on the day
+    # of the upgrade. Aging them by creation date archived old cards moved to Done
+    # the day before, on the first launch after upgrading.
+    (
+        """UPDATE TaskColumnLink SET moved_at = date('now', 'localtime')
+                      WHERE moved_at IS NULL""",
+    ),
+]
+
+# Moves a task link to (column_id, position, column_id, today). moved_at only changes
+# when the task changes column, reordering a column does not make its tasks younger.
+MOVE_LINK = """column_id = ?, position = ?,
+    moved_at = CASE WHEN column_id = ? THEN moved_at ELSE ? END"""
+
+# Space between two positions after Database.rebalance_column. Repeatedly dropping
+# tasks between the same two cards halves the gap each time, once it falls under
+# MIN_POSITION_GAP times the positions the column is rebalanced. The gap is relative
+# as floats lose absolute precision as they grow, e.g. positions migrated from task
+# IDs or pushed up by tasks added at the bottom.
+POSITION_STEP = 1.0
+MIN_POSITION_GAP = 1e-9
+
+# zlib level of compressed notes. Level 1 packs typical text about 4x, at a fifth of
+# the time of the default level 6, see benchmarks/bench_notes.py.
+NOTE_COMPRESS_LEVEL = 1
+
+
+def position_between(before=None, after=None):
+    """
+    Return a position for a task placed between two others.
+
+    :argument before: The position of the task above, None at the top of a column.
+    :argument after: The position of the task below, None at the bottom.
+
+    :return: A tuple (position, crowded), crowded is True when the two positions
+        were too close and the column should be rebalanced.
+    """
+    if before is None and after is None:
+        return POSITION_STEP, False
+    if before is None:
+        return after - POSITION_STEP, False
+    if after is None:
+        return before + POSITION_STEP, False
+    position = (before + after) / 2
+    scale = max(1.0, abs(before), abs(after))
+    crowded = after - before < MIN_POSITION_GAP * scale or position in (before, after)
+    return position, crowded
+
+
+def pack_note(content, threshold):
+    """
+    Return the value to store for a note content and whether it is compressed.
+
+    :argument threshold: Contents longer than this many bytes (UTF-8) are stored as
+        a zlib BLOB, unless that does not make them smaller. 0 disables compression.
+    """
+    data = content.encode()
+    if threshold and len(data) > threshold:
+        packed = zlib.compress(data, NOTE_COMPRESS_LEVEL)
+        if len(packed) < len(data):
+            return packed, True
+    return content, False
+
+
+def unpack_note(value, compressed):
+    """Return the content of a note stored by pack_note."""
+    return zlib.decompress(value).decode() if compressed else value
+
+
+# Options of the full-text indexes. FTS5 builds the list of rows matching a prefix
+# on every query unless the prefix length is indexed, so search-as-you-type, where
+# the last word is a prefix, needs most lengths indexed to stay fast.
+SEARCH_OPTIONS = "tokenize='unicode61 remove_diacritics 2', prefix='2 3 4 5 6 7 8'"
+# Only the most recent matches of a query are ranked, so a word found in half of a
+# million tasks costs the same as a rare one.
+SEARCH_RANK_WINDOW = 100
+SNIPPET_WORDS = 12
+HIGHLIGHT = ("[", "]")
+
+
+def search_query(text):
+    """
+    Turn what the user typed into an FTS5 query.
+
+    Every word must match, the last one as a prefix unless it is a single letter.
+    FTS5 operators and quotes are treated as plain text, so no input is a syntax
+    error.
+
+    :return: The query, or None if text has no word.
+    """
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    if len(words[-1]) > 1:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+def fold(text):
+    """Lower case and strip the accents of text, like the search tokenizer."""
+    if text.isascii():
+        return text.lower()
+    text = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def rank_titles(titles, text, k1=1.2, b=0.75):
+    """
+    Return the bm25 score of each title for the words of text, higher is better.
+
+    The statistics come from titles alone, not from the whole index: FTS5's bm25
+    reads every row matching a word to weight it, far too slow for common words.
+    """
+    terms = re.findall(r"\w+", fold(text))
+    documents = [Counter(re.findall(r"\w+", fold(title))) for title in titles]
+    if not terms or not documents:
+        return [0.0] * len(titles)
+    lengths = [sum(words.values()) for words in documents]
+    average = sum(lengths) / len(documents) or 1
+    # Like search_query, only the last word is a prefix.
+    prefix = terms.pop() if len(terms[-1]) > 1 else None
+
+    frequencies = []
+    for words in documents:
+        counts = [words.get(term, 0) for term in terms]
+        if prefix is not None:
+            counts.append(
+                sum(count for word, count in words.items() if word.startswith(prefix))
+            )
+        frequencies.append(counts)
+    if prefix is not None:
+        terms.append(prefix)
+    weights = []
+    for i in range(len(terms)):
+        found = sum(1 for counts in frequencies if counts[i])
+        weights.append(math.log((len(documents) - found + 0.5) / (found + 0.5) + 1))
+    scores = []
+    for length, counts in zip(lengths, frequencies):
+        norm = k1 * (1 - b + b * length / average)
+        scores.append(
+            sum(
+                weight * count * (k1 + 1) / (count + norm)
+                for weight, count in zip(weights, counts)
+            )
+        )
+    return scores
+
+
+def _words_pattern(text):
+    """A regex matching the words starting with one of the words of text."""
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    return re.compile(
+        r"\b(" + "|".join(re.escape(word) for word in words) + r")\w*", re.IGNORECASE
+    )
+
+
+def highlight(content, text):
+    """Return content with the words matching text between HIGHLIGHT marks."""
+    pattern = _words_pattern(text)
+    if pattern is None:
+        return content
+    return pattern.sub(lambda m: HIGHLIGHT[0] + m.group(0) + HIGHLIGHT[1], content)
+
+
+def note_snippet(content, text, words=SNIPPET_WORDS):
+    """
+    Return about words words of content around the first word of text found in it,
+    highlighted like FTS5's snippet().
+    """
+    pattern = _words_pattern(text)
+    match = pattern.search(content) if pattern is not None else None
+    head = 0
+    if match is not None:
+        # Start a few words before the match.
+        window = max(0, match.start() - 200)
+        before = list(re.finditer(r"\S+", content[window : match.start()]))
+        head = match.start()
+        if before:
+            head = window + before[max(0, len(before) - words // 3)].start()
+    tokens = content[head:].split(None, words)
+    snippet = highlight(" ".join(tokens[:words]), text)
+    if head > 0:
+        snippet = "..." + snippet
+    if len(tokens) > words:
+        snippet += "..."
+    return snippet
 
 
 class Database:
-    def __init__(self):
+    def __init__(self, database_path=None):
         self.DIR_PATH = os.path.dirname(sys.argv[0])
         self.CONFIG_FILE_NAME = "settings.ini"
         self.CONFIG_FILE_PATH = os.path.join(self.DIR_PATH, self.CONFIG_FILE_NAME)
         self.FILE_PATH = os.path.join(self.DIR_PATH, "database")
         print(self.FILE_PATH)
         self.NAME = "PyKanBan.db"
-        self.DATABASE_PATH = os.path.join(self.DIR_PATH, self.FILE_PATH, self.NAME)
+        self.DATABASE_PATH = database_path or os.path.join(
+            self.DIR_PATH, self.FILE_PATH, self.NAME
+        )
+        self.fixed_path = database_path is not None
+        self.config = get_config(self.CONFIG_FILE_PATH)
+        # Note contents over this many bytes are compressed, see pack_note.
+        self.note_compress_bytes = self.config.get_int("note_compress_bytes")
+
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._subscribers = []
+
+        self.profiler = None
+        if self.config.get_bool("profile_queries"):
+            self.enable_profiling().print_summary_at_exit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get_connection(self):
+        """
+        Return the connection owned by the calling thread, opening it on first use.
+
+        Each thread keeps one long-lived connection so the schema and pragmas are
+        only processed once instead of on every call.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.path == self.DATABASE_PATH:
+            return conn
+        if conn is not None:
+            # The database was moved (see create_database), drop the stale handle.
+            self._release(conn)
+
+        if self.profiler is None:
+            conn = sqlite3.connect(self.DATABASE_PATH, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(
+                self.DATABASE_PATH,
+                check_same_thread=False,
+                factory=ProfilingConnection,
+            )
+            conn.profiler = self.profiler
+            conn.set_trace_callback(self.profiler.trace)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(f"PRAGMA {pragma} = {self.config.get(pragma)}")
+
+        self._local.conn = conn
+        self._local.path = self.DATABASE_PATH
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    def _release(self, conn):
+        with self._connections_lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        conn.close()
+        self._local.conn = None
+
+    def enable_profiling(self, profiler=None):
+        """
+        Time every SQL statement from now on, see query_profiler.QueryProfiler.
+
+        Open connections are closed so they come back profiled, call it before
+        other threads (e.g. a DatabaseWriter) start using the database.
+
+        :argument profiler: Defaults to a QueryProfiler using slow_query_ms.
+        :return: The profiler, print(profiler.summary()) shows the results.
+        """
+        if profiler is None:
+            profiler = QueryProfiler(slow_ms=self.config.get_float("slow_query_ms"))
+        profiler.watch(
+            Database, exclude=("get_connection", "transaction", "enable_profiling")
+        )
+        self.profiler = profiler
+        self.close()
+        return profiler
+
+    def close(self):
+        """Close every connection opened by this Database, on all threads."""
+        self.config.flush()
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group several operations into one atomic commit.
+
+        The outermost block opens the transaction and commits it once on exit, nested
+        blocks (including the ones used by every write method) become savepoints that
+        only roll back their own work when they raise.
+
+        Usage:
+            with db.transaction():
+                kanban_id = db.create_kanban("Sprint")
+                db.create_column("To Do", kanban_id)
+
+        :return: A cursor on the calling thread's connection.
+        """
+        conn = self.get_connection()
+        depth = getattr(self._local, "depth", 0)
+        savepoint = f"sp_{depth}"
+        if depth == 0:
+            conn.execute("BEGIN IMMEDIATE")
+            self._local.events = []
+        else:
+            conn.execute(f"SAVEPOINT {savepoint}")
+        events = len(self._local.events)
+        self._local.depth = depth + 1
+
+        try:
+            yield conn.cursor()
+        except BaseException:
+            # The changes rolled back are not announced.
+            del self._local.events[events:]
+            if depth == 0:
+                conn.rollback()
+            else:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+            raise
+        else:
+            if depth == 0:
+                conn.commit()
+            else:
+                conn.execute(f"RELEASE {savepoint}")
+        finally:
+            self._local.depth = depth
+        if depth == 0:
+            events, self._local.events = self._local.events, []
+            self._publish(events)
+
+    def subscribe(self, callback):
+        """
+        Call callback(action, kind, item_id, name, kanban_id) for every committed
+        change to a board, column or task name.
+
+        action is "add", "rename" or "delete" and kind is "board", "column" or
+        "task". name is None for deletes and kanban_id, the board of the item, is
+        only given for adds. Deleting a board also stands for its columns and tasks.
+
+        The changes made in a transaction are sent in order once it commits, on the
+        committing thread (e.g. the DatabaseWriter's), and never if it rolls back.
+        """
+        self._subscribers.append(callback)
+
+    def _emit(self, action, kind, item_id, name=None, kanban_id=None):
+        """Queue a change for the subscribers, call it inside transaction()."""
+        if self._subscribers:
+            self._local.events.append((action, kind, item_id, name, kanban_id))
+
+    def _publish(self, events):
+        for event in events:
+            for callback in self._subscribers:
+                try:
+                    callback(*event)
+                except Exception as e:
+                    print(f"Error in change subscriber {callback}: {e}")
 
     def create_config_file(self):
-        config = configparser.ConfigParser()
-        config["DEFAULT"] = {
-            "database_path": self.DATABASE_PATH,
-        }
-        with open(self.CONFIG_FILE_PATH, "w") as configfile:
-            config.write(configfile)
+        self.config.set("database_path", self.DATABASE_PATH)
+        self.config.save()
 
     def read_config_file(self):
-        config = configparser.ConfigParser()
-        config.read(self.CONFIG_FILE_PATH)
-        path = config["DEFAULT"]["database_path"]
-        return path
+        """Return the folder holding the database, see config.Config."""
+        return self.config.get("database_path") or self.FILE_PATH
 
     def modify_config_file(self, key, value):
-        config = configparser.ConfigParser()
-        config.read(self.CONFIG_FILE_PATH)
-        config["DEFAULT"][key] = value
-        with open(self.CONFIG_FILE_PATH, "w") as configfile:
-            config.write(configfile)
+        self.config.set(key, value)
 
     def initialize_database(self):
         """Initialize the database, creating tables if they don't exist."""
         self.create_database()
         if not self.get_kanbans():
-            id = self.create_kanban("Default")
-            self.create_column("To Do", id)
-            self.create_column("In Progress", id)
-            self.create_column("Done", id)
+            with self.transaction():
+                id = self.create_kanban("Default")
+                self.create_column("To Do", id)
+                self.create_column("In Progress", id)
+                self.create_column("Done", id)
 
     def create_database(self):
-        if not os.path.exists(self.read_config_file()):
-            os.makedirs(self.FILE_PATH)
+        if not self.fixed_path:
+            directory = self.read_config_file()
+            if not os.path.exists(directory):
+                os.makedirs(directory)
 
-        self.DATABASE_PATH = os.path.join(self.read_config_file(), self.NAME)
+            self.DATABASE_PATH = os.path.join(directory, self.NAME)
         print("DATABASE_PATH", self.DATABASE_PATH)
 
-        conn = sqlite3.connect(self.DATABASE_PATH)
-        cursor = conn.cursor()
-
-        # Create tables for tasks, columns, and Kanban boards
-        cursor.execute(
-            """CREATE TABLE IF NOT EXISTS Task
-                          (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                           title TEXT NOT NULL,
-                           created_at TEXT NOT NULL)"""
-        )
-
-        cursor.execute(
-            """CREATE TABLE IF NOT EXISTS Note
-                          (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                           title TEXT NOT NULL,
-                           content TEXT NOT NULL)"""
-        )
-
-        cursor.execute(
-            """CREATE TABLE IF NOT EXISTS Kanban
-                          (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                           name TEXT UNIQUE NOT NULL)"""
-        )
-
-        cursor.execute(
-            """CREATE TABLE IF NOT EXISTS KanbanColumn
-                          (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                           name TEXT NOT NULL,
-                           kanban_id INTEGER NOT NULL,
-                           FOREIGN KEY (kanban_id) REFERENCES Kanban (id),
-                           UNIQUE (name, kanban_id))"""
-        )
-
-        cursor.execute(
-            """CREATE TABLE IF NOT EXISTS TaskColumnLink
-                          (task_id INTEGER NOT NULL,
-                           column_id INTEGER NOT NULL,
-                           FOREIGN KEY (task_id) REFERENCES Task (id),
-                           FOREIGN KEY (column_id) REFERENCES KanbanColumn (id),
-                           PRIMARY KEY (task_id, column_id))"""
-        )
+        self.migrate()
 
-        # Create last_kanban table
-        cursor.execute(
-            """CREATE TABLE IF NOT EXISTS last_kanban
-                              (id INTEGER PRIMARY KEY CHECK (id = 1),
-                               kanban_id INTEGER,
-                               FOREIGN KEY (kanban_id) REFERENCES Kanban (id))"""
-        )
+    def migrate(self):
+        """
+        Bring the database schema up to date.
 
-        cursor.execute(
-            "INSERT OR IGNORE INTO last_kanban (id, kanban_id) VALUES (1, 1)"
-        )
+        The schema version is stored in PRAGMA user_version. Every pending migration
+        runs inside one transaction, so an interrupted upgrade leaves the file untouched.
 
-        conn.commit()
-        conn.close()
+        :return: The schema version after the upgrade.
+        """
+        conn = self.get_connection()
+
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= len(MIGRATIONS):
+            return version
+
+        with self.transaction() as cursor:
+            for version, migration in enumerate(
+                MIGRATIONS[version:], start=version + 1
+            ):
+                if callable(migration):
+                    migration(self, cursor)
+                else:
+                    for statement in migration:
+                        cursor.execute(statement)
+                cursor.execute(f"PRAGMA user_version = {version}")
+        print(f"Database migrated to schema version {version}.")
+        return version
 
     def update_current_kanban(self, kanban_id: int):
         """
         Update the last kanban ID in the database.
-        """
-        conn = sqlite3.connect(self.DATABASE_PATH)
-        cursor = conn.cursor()
 
+        :return: True if it was saved, False on error.
+        """
         try:
-            cursor.execute(
-                "UPDATE last_kanban SET kanban_id = ? WHERE id = 1", (kanban_id,)
-            )
-            conn.commit()
-
+            with self.transaction() as cursor:
+                cursor.execute(
+                    "UPDATE last_kanban SET kanban_id = ? WHERE id = 1", (kanban_id,)
+                )
+            return True
         except sqlite3.Error as e:
             print(f"Error updating last kanban ID: {e}")
-        finally:
-            conn.close()
+            return False
 
     def get_current_kanban(self):
         """
@@ -133,7 +635,7 @@ class Database:
 
         :return: The ID of the last kanban used, or None if no kanban has been used yet
         """
-        conn = sqlite3.connect(self.DATABASE_PATH)
+        conn = self.get_connection()
         cursor = conn.cursor()
 
         try:
@@ -147,8 +649,6 @@ class Database:
         except sqlite3.Error as e:
             print(f"Error retrieving last kanban ID: {e}")
             return None
-        finally:
-            conn.close()
 
     def create_kanban(self, name):
         """
@@ -158,19 +658,15 @@ class Database:
 
         :return: The ID of the new Kanban board.
         """
-        conn = sqlite3.connect(self.DATABASE_PATH)
-        cursor = conn.cursor()
-
         try:
-            cursor.execute("INSERT INTO Kanban (name) VALUES (?)", (name,))
-            conn.commit()
+            with self.transaction() as cursor:
+                cursor.execute("INSERT INTO Kanban (name) VALUES (?)", (name,))
+                self._emit("add", "board", cursor.lastrowid, name, cursor.lastrowid)
             print(f"Kanban board '{name}' created successfully.")
             return cursor.lastrowid
         except sqlite3.IntegrityError:
             print(f"Error: Kanban board '{name}' already exists.")
             return None
-        finally:
-            conn.close()
 
     def get_kanbans(self):
         """
@@ -178,24 +674,22 @@ class Database:
 
         return: A list of tuples, where each tuple contains the ID and name of a Kanban board.
         """
-        conn = sqlite3.connect(self.DATABASE_PATH)
+        conn = self.get_connection()
         cursor = conn.cursor()
 
         cursor.execute("SELECT id, name FROM Kanban")
         kanbans = cursor.fetchall()
-        conn.close()
         return kanbans
 
     def modify_kanban(self, kanban_id, new_name):
         """Modify a Kanban board's name in the database."""
-        conn = sqlite3.connect(self.DATABASE_PATH)
-        cursor = conn.cursor()
-
         try:
-            cursor.execute(
-                "UPDATE Kanban SET name = ? WHERE id = ?", (new_name, kanban_id)
-            )
-            conn.commit()
+            with self.transaction() as cursor:
+                cursor.execute(
+                    "UPDATE Kanban SET name = ? WHERE id = ?", (new_name, kanban_id)
+                )
+                if cursor.rowcount > 0:
+                    self._emit("rename", "board", kanban_id, new_name)
             if cursor.rowcount > 0:
                 print(f"Kanban board with ID {kanban_id} renamed to '{new_name}'.")
                 return True
@@ -205,15 +699,21 @@ class Database:
         except sqlite3.IntegrityError:
             print(f"Error: Kanban board name '{new_name}' already exists.")
             return False
-        finally:
-            conn.close()
 
     def delete_kanban(self, kanban_id):
         """Delete a Kanban board and all associated columns and tasks."""
-        conn = sqlite3.connect(self.DATABASE_PATH)
-        cursor = conn.cursor()
+        with self.transaction() as cursor:
+            # Delete the tasks first, their search index entries go with them
+            cursor.execute(
+                """
+                DELETE FROM Task WHERE id IN (
+                    SELECT task_id FROM TaskColumnLink
+                    WHERE column_id IN (SELECT id FROM KanbanColumn WHERE kanban_id = ?)
+                )
+            """,
+                (kanban_id,),
+            )
 
-        try:
             # Delete associated task-column links
             cursor.execute(
                 """
@@ -225,59 +725,68 @@ class Database:
 
             # Delete associated columns
             cursor.execute("DELETE FROM KanbanColumn WHERE kanban_id = ?", (kanban_id,))
+            cursor.execute("DELETE FROM ArchivedTask WHERE kanban_id = ?", (kanban_id,))
 
             # Delete the Kanban board
             cursor.execute("DELETE FROM Kanban WHERE id = ?", (kanban_id,))
-
-            conn.commit()
             if cursor.rowcount > 0:
-                print(
-                    f"Kanban board with ID {kanban_id} and all associated data deleted."
-                )
-                return True
-            else:
-                print(f"Error: Kanban board with ID {kanban_id} not found.")
-                return False
-        finally:
-            conn.close()
+                self._emit("delete", "board", kanban_id)
+
+        if cursor.rowcount > 0:
+            print(f"Kanban board with ID {kanban_id} and all associated data deleted.")
+            return True
+        else:
+            print(f"Error: Kanban board with ID {kanban_id} not found.")
+            return False
 
     def create_column(self, name, kanban_id):
         """Create a new Kanban column with the specified name in the given Kanban board."""
-        conn = sqlite3.connect(self.DATABASE_PATH)
-        cursor = conn.cursor()
-
         try:
-            cursor.execute(
-                "INSERT INTO KanbanColumn (name, kanban_id) VALUES (?, ?)",
-                (name, kanban_id),
-            )
-            conn.commit()
+            with self.transaction() as cursor:
+                cursor.execute(
+                    "INSERT INTO KanbanColumn (name, kanban_id) VALUES (?, ?)",
+                    (name, kanban_id),
+                )
+                self._emit("add", "column", cursor.lastrowid, name, kanban_id)
             print(f"Column '{name}' created successfully in Kanban board {kanban_id}.")
             return cursor.lastrowid
         except sqlite3.IntegrityError:
             print(f"Error: Column '{name}' already exists in Kanban board {kanban_id}.")
             return None
-        finally:
-            conn.close()
 
     def get_columns(self, kanban_id):
         """Retrieve all Kanban columns for a specific Kanban board from the database."""
-        conn = sqlite3.connect(self.DATABASE_PATH)
+        conn = self.get_connection()
         cursor = conn.cursor()
 
         cursor.execute(
-            "SELECT id, name FROM KanbanColumn WHERE kanban_id = ?", (kanban_id,)
+            "SELECT id, name FROM KanbanColumn WHERE kanban_id = ? ORDER BY id",
+            (kanban_id,),
         )
         columns = cursor.fetchall()
-        conn.close()
         return columns
 
     def delete_column(self, column_id):
         """Delete a Kanban column with the specified ID."""
-        conn = sqlite3.connect(self.DATABASE_PATH)
-        cursor = conn.cursor()
+        with self.transaction() as cursor:
+            if self._subscribers:
+                cursor.execute(
+                    "SELECT task_id FROM TaskColumnLink WHERE column_id = ?",
+                    (column_id,),
+                )
+                for (task_id,) in cursor.fetchall():
+                    self._emit("delete", "task", task_id)
+
+            # Delete the tasks first, their search index entries go with them
+            cursor.execute(
+                """
+                DELETE FROM Task WHERE id IN (
+                    SELECT task_id FROM TaskColumnLink WHERE column_id = ?
+                )
+            """,
+                (column_id,),
+            )
 
-        try:
             # Delete associated task-column links
             cursor.execute(
                 "DELETE FROM TaskColumnLink WHERE column_id = ?", (column_id,)
@@ -285,56 +794,176 @@ class Database:
 
             # Delete the column
             cursor.execute("DELETE FROM KanbanColumn WHERE id = ?", (column_id,))
-
-            conn.commit()
             if cursor.rowcount > 0:
-                print(f"Column with ID {column_id} and all associated links deleted.")
-                return True
-            else:
-                print(f"Error: Column with ID {column_id} not found.")
-                return False
-        finally:
-            conn.close()
+                self._emit("delete", "column", column_id)
 
-    def add_task(self, title: str, column_name: str, kanban_id: int):
-        """Add a new task to the database, associating it with the specified column."""
-        conn = sqlite3.connect(self.DATABASE_PATH)
-        cursor = conn.cursor()
+        if cursor.rowcount > 0:
+            print(f"Column with ID {column_id} and all associated links deleted.")
+            return True
+        else:
+            print(f"Error: Column with ID {column_id} not found.")
+            return False
 
-        # Get the column ID based on the name
-        cursor.execute(
-            "SELECT id FROM KanbanColumn WHERE name = ? AND kanban_id = ?",
-            (column_name, kanban_id),
-        )
-        column_id = cursor.fetchone()
+    def add_task(
+        self, title: str, column_name: str, kanban_id: int, position: float = None
+    ):
+        """
+        Add a new task to the database, associating it with the specified column.
 
-        if not column_id:
-            print(f"Error: Kanban column '{column_name}' not found.")
-            return None
-        print(date.today())
-        # Insert the task into the Task table
-        cursor.execute(
-            "INSERT INTO Task (title, created_at) VALUES (?, ?)",
-            (title, date.today()),
-        )
-        task_id = cursor.lastrowid
+        :argument position: The position of the task in the column, by default it
+            goes after the last one.
+        """
+        with self.transaction() as cursor:
+            # Get the column ID based on the name
+            cursor.execute(
+                "SELECT id FROM KanbanColumn WHERE name = ? AND kanban_id = ?",
+                (column_name, kanban_id),
+            )
+            column_id = cursor.fetchone()
 
-        # Link the task to the column in the TaskColumnLink table
-        cursor.execute(
-            "INSERT INTO TaskColumnLink (task_id, column_id) VALUES (?, ?)",
-            (task_id, column_id[0]),
-        )
+            if not column_id:
+                print(f"Error: Kanban column '{column_name}' not found.")
+                return None
+            print(date.today())
+            # Insert the task into the Task table
+            cursor.execute(
+                "INSERT INTO Task (title, created_at) VALUES (?, ?)",
+                (title, date.today()),
+            )
+            task_id = cursor.lastrowid
+
+            if position is None:
+                position = self._end_position(cursor, column_id[0])
+
+            # Link the task to the column in the TaskColumnLink table
+            cursor.execute(
+                "INSERT INTO TaskColumnLink (task_id, column_id, position, moved_at) "
+                "VALUES (?, ?, ?, ?)",
+                (task_id, column_id[0], position, str(date.today())),
+            )
+            self._emit("add", "task", task_id, title, kanban_id)
 
-        conn.commit()
-        conn.close()
         return task_id
 
+    def add_tasks(self, titles, column_name: str, kanban_id: int):
+        """
+        Add many tasks to one column in a single transaction.
+
+        :argument titles: An iterable of task titles.
+        :argument column_name: The name of the column receiving the tasks.
+        :argument kanban_id: The ID of the Kanban board owning the column.
+
+        :return: The list of new task IDs in the order of titles, or None if the
+            column does not exist.
+        """
+        titles = list(titles)
+        created_at = str(date.today())
+        with self.transaction() as cursor:
+            cursor.execute(
+                "SELECT id FROM KanbanColumn WHERE name = ? AND kanban_id = ?",
+                (column_name, kanban_id),
+            )
+            column_id = cursor.fetchone()
+
+            if not column_id:
+                print(f"Error: Kanban column '{column_name}' not found.")
+                return None
+
+            position = self._end_position(cursor, column_id[0])
+
+            task_ids = []
+            for title in titles:
+                cursor.execute(
+                    "INSERT INTO Task (title, created_at) VALUES (?, ?)",
+                    (title, created_at),
+                )
+                task_ids.append(cursor.lastrowid)
+            cursor.executemany(
+                "INSERT INTO TaskColumnLink (task_id, column_id, position, moved_at) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    (task_id, column_id[0], position + i * POSITION_STEP, created_at)
+                    for i, task_id in enumerate(task_ids)
+                ),
+            )
+            for task_id, title in zip(task_ids, titles):
+                self._emit("add", "task", task_id, title, kanban_id)
+
+        return task_ids
+
+    def move_tasks(self, task_ids, column_name: str, kanban_id: int):
+        """
+        Move many tasks to one column in a single transaction.
+
+        :argument task_ids: An iterable of task IDs.
+        :argument column_name: The name of the destination column.
+        :argument kanban_id: The ID of the Kanban board owning the column.
+
+        :return: The number of tasks moved, or None if the column does not exist.
+        """
+        today = str(date.today())
+        with self.transaction() as cursor:
+            cursor.execute(
+                "SELECT id FROM KanbanColumn WHERE name = ? AND kanban_id = ?",
+                (column_name, kanban_id),
+            )
+            column_id = cursor.fetchone()
+
+            if not column_id:
+                print(f"Error: Kanban column '{column_name}' not found.")
+                return None
+
+            # The tasks go after the last task of the column, in the given order.
+            # Tasks of other boards are left where they are.
+            position = self._end_position(cursor, column_id[0])
+            cursor.executemany(
+                f"""
+                UPDATE TaskColumnLink SET {MOVE_LINK}
+                WHERE task_id = ?
+                AND column_id IN (SELECT id FROM KanbanColumn WHERE kanban_id = ?)
+            """,
+                (
+                    (column_id[0], position + i * POSITION_STEP, column_id[0], today)
+                    + (task_id, kanban_id)
+                    for i, task_id in enumerate(task_ids)
+                ),
+            )
+
+        return cursor.rowcount
+
+    def delete_tasks(self, task_ids):
+        """
+        Delete many tasks and their column links in a single transaction.
+
+        :argument task_ids: An iterable of task IDs.
+
+        :return: The number of tasks deleted.
+        """
+        task_ids = [(task_id,) for task_id in task_ids]
+        with self.transaction() as cursor:
+            cursor.executemany("DELETE FROM TaskColumnLink WHERE task_id = ?", task_ids)
+            cursor.executemany("DELETE FROM Task WHERE id = ?", task_ids)
+            for (task_id,) in task_ids:
+                self._emit("delete", "task", task_id)
+
+        return cursor.rowcount
+
+    def _end_position(self, cursor, column_id):
+        """Return the position after the last task of a column."""
+        cursor.execute(
+            "SELECT MAX(position) FROM TaskColumnLink WHERE column_id = ?",
+            (column_id,),
+        )
+        last = cursor.fetchone()[0]
+        return POSITION_STEP if last is None else last + POSITION_STEP
+
     def get_tasks(self, column_id=None):
         """Retrieve tasks from the database, optionally filtering by column.
 
         Returns a list of tuples, where each tuple contains the task ID and the task text.
+        Tasks of a column are in their position order.
         """
-        conn = sqlite3.connect(self.DATABASE_PATH)
+        conn = self.get_connection()
         cursor = conn.cursor()
 
         if column_id:
@@ -346,6 +975,7 @@ class Database:
                 INNER JOIN TaskColumnLink ON Task.id = TaskColumnLink.task_id
                 INNER JOIN KanbanColumn ON TaskColumnLink.column_id = KanbanColumn.id
                 WHERE KanbanColumn.id = ?
+                ORDER BY TaskColumnLink.position, TaskColumnLink.task_id
             """,
                 (column_id,),
             )
@@ -354,7 +984,6 @@ class Database:
             cursor.execute("SELECT id, title, created_at FROM Task")
 
         tasks = cursor.fetchall()
-        conn.close()
         return tasks
 
     def get_task_by_id(self, task_id):
@@ -362,12 +991,11 @@ class Database:
 
         Returns a tuple containing the task ID and task text, or None if the task is not found.
         """
-        conn = sqlite3.connect(self.DATABASE_PATH)
+        conn = self.get_connection()
         cursor = conn.cursor()
 
         cursor.execute("SELECT id, title FROM Task WHERE id = ?", (task_id,))
         task = cursor.fetchone()
-        conn.close()
         return task
 
     def modify_task(self, task_id, new_title=None, new_column_name=None):
@@ -382,103 +1010,319 @@ class Database:
         Returns:
             bool: True if the modification was successful, False otherwise.
         """
-        conn = sqlite3.connect(self.DATABASE_PATH)
-        cursor = conn.cursor()
-
         try:
-            if new_title:
-                # Update the task text
-                cursor.execute(
-                    "UPDATE Task SET title = ? WHERE id = ?", (new_title, task_id)
-                )
-
-            if new_column_name:
-                # Get the ID of the new column
-                cursor.execute(
-                    "SELECT id FROM KanbanColumn WHERE name = ?", (new_column_name,)
-                )
-                new_column_id = cursor.fetchone()[0]
-
-                # Update the task-column link
-                cursor.execute(
-                    "UPDATE TaskColumnLink SET column_id = ? WHERE task_id = ?",
-                    (new_column_id, task_id),
-                )
+            with self.transaction() as cursor:
+                if new_title:
+                    # Update the task text
+                    cursor.execute(
+                        "UPDATE Task SET title = ? WHERE id = ?", (new_title, task_id)
+                    )
+                    if cursor.rowcount > 0:
+                        self._emit("rename", "task", task_id, new_title)
+
+                if new_column_name:
+                    # Get the ID of the new column, on the board of the task
+                    cursor.execute(
+                        """
+                        SELECT id FROM KanbanColumn
+                        WHERE name = ? AND kanban_id = (
+                            SELECT KanbanColumn.kanban_id FROM TaskColumnLink
+                            INNER JOIN KanbanColumn
+                            ON KanbanColumn.id = TaskColumnLink.column_id
+                            WHERE TaskColumnLink.task_id = ?
+                        )
+                    """,
+                        (new_column_name, task_id),
+                    )
+                    row = cursor.fetchone()
+                    if row is None:
+                        raise ValueError(
+                            f"no column '{new_column_name}' on the board of task {task_id}"
+                        )
+                    new_column_id = row[0]
+
+                    # Update the task-column link, the task goes last
+                    cursor.execute(
+                        f"UPDATE TaskColumnLink SET {MOVE_LINK} WHERE task_id = ?",
+                        (
+                            new_column_id,
+                            self._end_position(cursor, new_column_id),
+                            new_column_id,
+                            str(date.today()),
+                            task_id,
+                        ),
+                    )
 
-            conn.commit()
             return True
         except Exception as e:
             print(f"Error modifying task: {e}")
             return False
-        finally:
-            conn.close()
 
     def delete_task(self, text):
         """Delete a task from the database based on its text."""
-        conn = sqlite3.connect(self.DATABASE_PATH)
-        cursor = conn.cursor()
+        with self.transaction() as cursor:
+            # Find the task ID based on text
+            cursor.execute("SELECT id FROM Task WHERE title = ?", (text,))
+            task_id = cursor.fetchone()
 
-        # Find the task ID based on text
-        cursor.execute("SELECT id FROM Task WHERE title = ?", (text,))
-        task_id = cursor.fetchone()
+            if not task_id:
+                print(f"Error: Task with text '{text}' not found.")
+                return
 
-        if not task_id:
-            print(f"Error: Task with text '{text}' not found.")
-            return
+            # Delete the link to the column (assuming you only want to remove from one column)
+            cursor.execute(
+                "DELETE FROM TaskColumnLink WHERE task_id = ?", (task_id[0],)
+            )
 
-        # Delete the link to the column (assuming you only want to remove from one column)
-        cursor.execute("DELETE FROM TaskColumnLink WHERE task_id = ?", (task_id[0],))
+            # Delete the task itself
+            cursor.execute("DELETE FROM Task WHERE id = ?", (task_id[0],))
+            self._emit("delete", "task", task_id[0])
 
-        # Delete the task itself
-        cursor.execute("DELETE FROM Task WHERE id = ?", (task_id[0],))
+    def move_task(self, task_id, column_id, position=None):
+        """
+        Move a task to another column, or to another place in its column.
 
-        conn.commit()
-        conn.close()
+        Only the moved row is written: placing a task between two others means giving
+        it a position between theirs, see position_between.
+
+        :argument task_id: The ID of the task to move.
+        :argument column_id: The ID of the destination column.
+        :argument position: The new position of the task, by default it goes after
+            the last task of the column.
+
+        :return: True if the task was moved, False if it does not exist.
+        """
+        with self.transaction() as cursor:
+            if position is None:
+                position = self._end_position(cursor, column_id)
+            cursor.execute(
+                f"UPDATE TaskColumnLink SET {MOVE_LINK} WHERE task_id = ?",
+                (column_id, position, column_id, str(date.today()), task_id),
+            )
+        return cursor.rowcount > 0
+
+    def rebalance_column(self, column_id):
+        """
+        Space the positions of a column's tasks evenly again, keeping their order.
+
+        The n-th task gets position n * POSITION_STEP. Needed only once repeated
+        drops at the same spot have made two positions too close to split.
+
+        :return: The number of tasks in the column.
+        """
+        with self.transaction() as cursor:
+            cursor.execute(
+                """
+                SELECT task_id FROM TaskColumnLink
+                WHERE column_id = ?
+                ORDER BY position, task_id
+            """,
+                (column_id,),
+            )
+            task_ids = [row[0] for row in cursor.fetchall()]
+            cursor.executemany(
+                "UPDATE TaskColumnLink SET position = ? WHERE task_id = ? AND column_id = ?",
+                (
+                    ((i + 1) * POSITION_STEP, task_id, column_id)
+                    for i, task_id in enumerate(task_ids)
+                ),
+            )
+        return len(task_ids)
+
+    def delete_task_by_id(self, task_id):
+        """
+        Delete a task and its column link by ID.
+
+        :argument task_id: The ID of the task to delete.
+
+        :return: True if the task was deleted, False if it does not exist.
+        """
+        with self.transaction() as cursor:
+            cursor.execute("DELETE FROM TaskColumnLink WHERE task_id = ?", (task_id,))
+            cursor.execute("DELETE FROM Task WHERE id = ?", (task_id,))
+            if cursor.rowcount > 0:
+                self._emit("delete", "task", task_id)
+        if cursor.rowcount == 0:
+            print(f"Error: Task with ID {task_id} not found.")
+            return False
+        return True
 
     def get_kanban_name(self, kanban_id):
         """Retrieve the name of a Kanban board from its ID."""
-        conn = sqlite3.connect(self.DATABASE_PATH)
+        conn = self.get_connection()
         cursor = conn.cursor()
 
         cursor.execute("SELECT name FROM Kanban WHERE id = ?", (kanban_id,))
         kanban_name = cursor.fetchone()
-        conn.close()
         if kanban_name:
             return kanban_name[0]
         else:
             return "Kanban"
 
+    def load_board(self, kanban_id, page_size=None):
+        """
+        Load a whole Kanban board, or the first page of each of its columns.
+
+        :argument kanban_id: The ID of the Kanban board to load.
+        :argument page_size: If given, only the first page_size tasks of each column
+            are returned, the rest can be fetched with get_tasks_page.
+
+        :return: A tuple (name, columns) where columns is a list of
+            (column_id, column_name, tasks, task_count) in column order, tasks is a
+            list of (task_id, title, created_at, position) tuples in position order
+            and task_count is the number of tasks in the column.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT name FROM Kanban WHERE id = ?", (kanban_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return "Kanban", []
+        # Per column, the page is read in order from the (column_id, position,
+        # task_id) index and stops after page_size rows. The count walks the
+        # column's index entries without reading Task, a few milliseconds for a
+        # column of 100k tasks, and no task of the board is ranked or sorted.
+        columns = []
+        for column_id, column_name in self.get_columns(kanban_id):
+            cursor.execute(
+                "SELECT COUNT(*) FROM TaskColumnLink WHERE column_id = ?", (column_id,)
+            )
+            total = cursor.fetchone()[0]
+            # A negative LIMIT is no limit in SQLite.
+            tasks = self.get_tasks_page(
+                column_id, limit=-1 if page_size is None else page_size
+            )
+            columns.append((column_id, column_name, tasks, total))
+        return row[0], columns
+
+    def get_tasks_page(self, column_id, after=None, limit=50):
+        """
+        Retrieve one page of a column's tasks, in position order.
+
+        Pages are keyset-paginated on (position, task_id): pass the last task of the
+        previous page as after, so fetching page N costs the same as fetching page 1.
+
+        :argument column_id: The ID of the column.
+        :argument after: The (position, task_id) of the last task already loaded, or
+            None for the first page.
+        :argument limit: The maximum number of tasks to return.
+
+        :return: A list of (task_id, title, created_at, position) tuples.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        position, task_id = after if after is not None else (float("-inf"), -1)
+        cursor.execute(
+            """
+            SELECT Task.id, Task.title, Task.created_at, TaskColumnLink.position
+            FROM TaskColumnLink
+            INNER JOIN Task ON Task.id = TaskColumnLink.task_id
+            WHERE TaskColumnLink.column_id = ?
+              AND (TaskColumnLink.position, TaskColumnLink.task_id) > (?, ?)
+            ORDER BY TaskColumnLink.position, TaskColumnLink.task_id
+            LIMIT ?
+        """,
+            (column_id, position, task_id, limit),
+        )
+        return cursor.fetchall()
+
     def get_all_notes(self):
         """
         Retrieve all notes from the database.
 
+        Every content is read and decompressed, use get_note_titles to list notes.
+
         return: A list of tuples, where each tuple contains the ID of the note, its title, and its content.
         """
-        conn = sqlite3.connect(self.DATABASE_PATH)
+        conn = self.get_connection()
         cursor = conn.cursor()
 
-        cursor.execute("SELECT id, title, content FROM Note")
-        notes = cursor.fetchall()
-        conn.close()
-        return notes
+        cursor.execute("SELECT id, title, content, compressed FROM Note")
+        return [
+            (id, title, unpack_note(content, compressed))
+            for id, title, content, compressed in cursor
+        ]
 
-    def add_note(self, title, content):
+    def get_note_titles(self):
+        """
+        List the notes without reading their contents, see get_note.
+
+        :return: A list of (id, title) tuples ordered by title.
+        """
+        cursor = self.get_connection().cursor()
+        cursor.execute("SELECT id, title FROM Note ORDER BY title, id")
+        return cursor.fetchall()
+
+    def add_note(self, title, content, geometry=None, pinned=False, is_open=False):
         """
         Add a new note to the database.
 
         :param title: The title of the note.
-        :param content: The content of the note.
+        :param content: The content of the note, compressed when it is large.
+        :param geometry: The Tk geometry of the note window, e.g. "200x200+10+10".
+        :param pinned: Whether the note window stays on top.
+        :param is_open: Whether the note window is shown on the next launch.
         :return: The ID of the new note.
         """
-        conn = sqlite3.connect(self.DATABASE_PATH)
-        cursor = conn.cursor()
+        stored, compressed = pack_note(content, self.note_compress_bytes)
+        with self.transaction() as cursor:
+            cursor.execute(
+                "INSERT INTO Note (title, content, compressed, geometry, pinned, "
+                "is_open) VALUES (?, ?, ?, ?, ?, ?)",
+                (title, stored, int(compressed), geometry, int(pinned), int(is_open)),
+            )
+            note_id = cursor.lastrowid
+            self._index_note(cursor, note_id, title, content)
+        return note_id
 
+    def get_open_notes(self):
+        """
+        Retrieve the notes whose window was open when the application closed.
+
+        The contents are not read, see get_note.
+
+        :return: A list of (id, title, geometry, pinned) tuples.
+        """
+        cursor = self.get_connection().cursor()
         cursor.execute(
-            "INSERT INTO Note (title, content) VALUES (?, ?)", (title, content)
+            "SELECT id, title, geometry, pinned FROM Note WHERE is_open = 1 ORDER BY id"
         )
-        conn.commit()
-        conn.close()
-        return cursor.lastrowid
+        return [
+            (id, title, geometry, bool(pinned))
+            for id, title, geometry, pinned in cursor
+        ]
+
+    def get_note_window(self, note_id):
+        """
+        Retrieve where a note window was and whether it was pinned.
+
+        :return: A (geometry, pinned) tuple, or None if the note does not exist.
+        """
+        cursor = self.get_connection().cursor()
+        cursor.execute("SELECT geometry, pinned FROM Note WHERE id = ?", (note_id,))
+        row = cursor.fetchone()
+        return None if row is None else (row[0], bool(row[1]))
+
+    def update_note_window(self, note_id, geometry, pinned):
+        """
+        Store where a note window is and whether it is pinned.
+
+        :param geometry: The Tk geometry of the window, e.g. "200x200+10+10".
+        """
+        with self.transaction() as cursor:
+            cursor.execute(
+                "UPDATE Note SET geometry = ?, pinned = ? WHERE id = ?",
+                (geometry, int(pinned), note_id),
+            )
+
+    def set_note_open(self, note_id, is_open):
+        """Mark a note window as open or closed, open ones are restored on launch."""
+        with self.transaction() as cursor:
+            cursor.execute(
+                "UPDATE Note SET is_open = ? WHERE id = ?", (int(is_open), note_id)
+            )
 
     def get_note(self, note_id):
         """
@@ -487,12 +1331,15 @@ class Database:
         :param note_id: The ID of the note to retrieve.
         :return: A tuple containing the ID, title, and content of the note.
         """
-        conn = sqlite3.connect(self.DATABASE_PATH)
+        conn = self.get_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT id, title, content FROM Note WHERE id = ?", (note_id,))
+        cursor.execute(
+            "SELECT id, title, content, compressed FROM Note WHERE id = ?", (note_id,)
+        )
         note = cursor.fetchone()
-        conn.close()
-        return note
+        if note is None:
+            return None
+        return note[0], note[1], unpack_note(note[2], note[3])
 
     def update_note(self, note_id, title, content):
         """
@@ -500,17 +1347,17 @@ class Database:
 
         :param note_id: The ID of the note to update.
         :param title: The new title of the note.
-        :param content: The new content of the note.
+        :param content: The new content of the note, compressed when it is large.
         """
-        conn = sqlite3.connect(self.DATABASE_PATH)
-        cursor = conn.cursor()
-
-        cursor.execute(
-            "UPDATE Note SET title = ?, content = ? WHERE id = ?",
-            (title, content, note_id),
-        )
-        conn.commit()
-        conn.close()
+        stored, compressed = pack_note(content, self.note_compress_bytes)
+        with self.transaction() as cursor:
+            if not self._unindex_note(cursor, note_id):
+                return
+            cursor.execute(
+                "UPDATE Note SET title = ?, content = ?, compressed = ? WHERE id = ?",
+                (title, stored, int(compressed), note_id),
+            )
+            self._index_note(cursor, note_id, title, content)
 
     def delete_note(self, note_id):
         """
@@ -518,9 +1365,265 @@ class Database:
 
         :param note_id: The ID of the note to delete.
         """
-        conn = sqlite3.connect(self.DATABASE_PATH)
-        cursor = conn.cursor()
+        with self.transaction() as cursor:
+            self._unindex_note(cursor, note_id)
+            cursor.execute("DELETE FROM Note WHERE id = ?", (note_id,))
 
-        cursor.execute("DELETE FROM Note WHERE id = ?", (note_id,))
-        conn.commit()
-        conn.close()
+    def _index_note(self, cursor, note_id, title, content):
+        cursor.execute(
+            "INSERT INTO NoteSearch (rowid, title, content) VALUES (?, ?, ?)",
+            (note_id, title, content),
+        )
+
+    def _unindex_note(self, cursor, note_id):
+        """Remove a note from NoteSearch, returns False if the note does not exist."""
+        # A contentless index can only forget the exact text it was given.
+        cursor.execute(
+            "SELECT title, content, compressed FROM Note WHERE id = ?", (note_id,)
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return False
+        cursor.execute(
+            "INSERT INTO NoteSearch (NoteSearch, rowid, title, content) "
+            "VALUES ('delete', ?, ?, ?)",
+            (note_id, row[0], unpack_note(row[1], row[2])),
+        )
+        return True
+
+    def rebuild_search_index(self):
+        """Index every task and note again, for rows written without this class."""
+        with self.transaction() as cursor:
+            _rebuild_search_index(cursor)
+
+    def search(self, query, limit=20, offset=0):
+        """
+        Full-text search over the task titles and the notes, best matches first.
+
+        Among the SEARCH_RANK_WINDOW most recent matches of each kind, results are
+        ordered by the bm25 score of their title (see rank_titles), then newest
+        first, so notes matching by their content only come after title matches.
+
+        :param query: The text typed by the user, see search_query.
+        :param limit: The maximum number of results.
+        :param offset: How many of the best results to skip, for paging.
+        :return: A list of (kind, id, title, snippet, kanban_id, kanban_name,
+            column_id, column_name) tuples, kind is "task" or "note". The board and
+            column are None for notes. Matches in snippet are between HIGHLIGHT marks.
+        """
+        match = search_query(query)
+        if match is None or limit <= 0:
+            return []
+        cursor = self.get_connection().cursor()
+        window = max(SEARCH_RANK_WINDOW, offset + limit)
+        candidates = []
+        # Tasks left in no column (by older versions deleting their board) are
+        # never hits, they would only take ranking slots.
+        for kind, table, source, join in (
+            (
+                "task",
+                "TaskSearch",
+                "Task",
+                "INNER JOIN TaskColumnLink ON TaskColumnLink.task_id = Task.id",
+            ),
+            ("note", "NoteSearch", "Note", ""),
+        ):
+            cursor.execute(
+                f"""
+                SELECT {source}.id, {source}.title
+                FROM {table} INNER JOIN {source} ON {source}.id = {table}.rowid
+                {join}
+                WHERE {table} MATCH ?
+                ORDER BY {table}.rowid DESC
+                LIMIT ?
+            """,
+                (match, window),
+            )
+            candidates += [(kind, id, title) for id, title in cursor]
+        scores = rank_titles([title for _, _, title in candidates], query)
+        order = sorted(range(len(candidates)), key=lambda i: -scores[i])
+        hits = [candidates[i] for i in order[offset : offset + limit]]
+
+        task_ids = [id for kind, id, _ in hits if kind == "task"]
+        columns = {}
+        if task_ids:
+            cursor.execute(
+                f"""
+                SELECT TaskColumnLink.task_id, Kanban.id, Kanban.name,
+                       KanbanColumn.id, KanbanColumn.name
+                FROM TaskColumnLink
+                INNER JOIN KanbanColumn ON KanbanColumn.id = TaskColumnLink.column_id
+                INNER JOIN Kanban ON Kanban.id = KanbanColumn.kanban_id
+                WHERE TaskColumnLink.task_id IN ({", ".join("?" * len(task_ids))})
+            """,
+                task_ids,
+            )
+            columns = {row[0]: row[1:] for row in cursor}
+
+        results = []
+        for kind, id, title in hits:
+            if kind == "task":
+                context = columns.get(id, (None, None, None, None))
+                results.append(("task", id, title, highlight(title, query)) + context)
+            else:
+                note = self.get_note(id)
+                snippet = note_snippet(note[2], query) if note else ""
+                results.append(
+                    ("note", id, title, snippet or title, None, None, None, None)
+                )
+        return results
+
+    def get_task_index(self, task_id):
+        """
+        Find where a task is shown.
+
+        :return: (column_id, index) where index counts the tasks above it in its
+            column, or None if the task is in no column.
+        """
+        cursor = self.get_connection().cursor()
+        cursor.execute(
+            "SELECT column_id, position FROM TaskColumnLink WHERE task_id = ?",
+            (task_id,),
+        )
+        link = cursor.fetchone()
+        if link is None:
+            return None
+        column_id, position = link
+        cursor.execute(
+            """
+            SELECT COUNT(*) FROM TaskColumnLink
+            WHERE column_id = ? AND (position, task_id) < (?, ?)
+        """,
+            (column_id, position, task_id),
+        )
+        return column_id, cursor.fetchone()[0]
+
+    def archive_tasks(self, column_name, older_than, limit=500, kanban_id=None):
+        """
+        Move the tasks of the columns called column_name that entered them before
+        older_than to the ArchivedTask table.
+
+        Tasks placed before migration 7 are aged from the day of the upgrade, see
+        migration 8. Archived tasks stop showing on the board and in the search
+        results until restore_task.
+
+        :argument older_than: A date.
+        :argument limit: The most tasks moved in this call, so a large backlog is
+            archived in several short transactions.
+        :argument kanban_id: Only archive from this board, None for every board
+            having a column called column_name.
+
+        :return: A Counter of the tasks archived per kanban_id.
+        """
+        board = "" if kanban_id is None else "AND KanbanColumn.kanban_id = ?"
+        parameters = (column_name,) if kanban_id is None else (column_name, kanban_id)
+        with self.transaction() as cursor:
+            cursor.execute(
+                f"""
+                SELECT Task.id, Task.title, Task.created_at, KanbanColumn.kanban_id,
+                       KanbanColumn.id, KanbanColumn.name
+                FROM KanbanColumn
+                INNER JOIN TaskColumnLink ON TaskColumnLink.column_id = KanbanColumn.id
+                INNER JOIN Task ON Task.id = TaskColumnLink.task_id
+                WHERE KanbanColumn.name = ? {board}
+                AND TaskColumnLink.moved_at < ?
+                LIMIT ?
+            """,
+                parameters + (str(older_than), limit),
+            )
+            rows = cursor.fetchall()
+            archived_at = str(date.today())
+            cursor.executemany(
+                """
+                INSERT OR REPLACE INTO ArchivedTask
+                (id, title, created_at, archived_at, kanban_id, column_id, column_name)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+                (row[:3] + (archived_at,) + row[3:] for row in rows),
+            )
+            task_ids = [(row[0],) for row in rows]
+            cursor.executemany("DELETE FROM TaskColumnLink WHERE task_id = ?", task_ids)
+            cursor.executemany("DELETE FROM Task WHERE id = ?", task_ids)
+            for (task_id,) in task_ids:
+                self._emit("delete", "task", task_id)
+        return Counter(row[3] for row in rows)
+
+    def count_archived_tasks(self, kanban_id):
+        cursor = self.get_connection().cursor()
+        cursor.execute(
+            "SELECT COUNT(*) FROM ArchivedTask WHERE kanban_id = ?", (kanban_id,)
+        )
+        return cursor.fetchone()[0]
+
+    def get_archived_tasks(self, kanban_id, before=None, limit=50):
+        """
+        Return one page of the archived tasks of a board, newest first.
+
+        :argument before: The ID of the last task of the previous page, None for the
+            first page.
+
+        :return: A list of (task_id, title, created_at, archived_at, column_name).
+        """
+        cursor = self.get_connection().cursor()
+        cursor.execute(
+            """
+            SELECT id, title, created_at, archived_at, column_name
+            FROM ArchivedTask
+            WHERE kanban_id = ? AND id < ?
+            ORDER BY id DESC
+            LIMIT ?
+        """,
+            (kanban_id, before if before is not None else float("inf"), limit),
+        )
+        return cursor.fetchall()
+
+    def restore_task(self, task_id):
+        """
+        Put an archived task back at the end of its column, or of the first column
+        of its board if that column was deleted since.
+
+        :return: (kanban_id, column_id) of the task, or None if it cannot be restored.
+        """
+        with self.transaction() as cursor:
+            cursor.execute(
+                """
+                SELECT title, created_at, kanban_id, column_id
+                FROM ArchivedTask WHERE id = ?
+            """,
+                (task_id,),
+            )
+            task = cursor.fetchone()
+            if task is None:
+                print(f"Error: Archived task with ID {task_id} not found.")
+                return None
+            title, created_at, kanban_id, column_id = task
+            cursor.execute(
+                """
+                SELECT id FROM KanbanColumn WHERE kanban_id = ?
+                ORDER BY id = ? DESC, id LIMIT 1
+            """,
+                (kanban_id, column_id),
+            )
+            column = cursor.fetchone()
+            if column is None:
+                print(f"Error: The board of archived task {task_id} has no column.")
+                return None
+            column_id = column[0]
+            cursor.execute(
+                "INSERT INTO Task (id, title, created_at) VALUES (?, ?, ?)",
+                (task_id, title, created_at),
+            )
+            # Restored today, so it is not archived again right away.
+            cursor.execute(
+                "INSERT INTO TaskColumnLink (task_id, column_id, position, moved_at) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    task_id,
+                    column_id,
+                    self._end_position(cursor, column_id),
+                    str(date.today()),
+                ),
+            )
+            cursor.execute("DELETE FROM ArchivedTask WHERE id = ?", (task_id,))
+            self._emit("add", "task", task_id, title, kanban_id)
+        return kanban_id, column_id
@@ -1,34 +1,96 @@
-from CTkMenuBar import CustomDropdownMenu
-import pywinstyles
+import sys
+import threading
+import time
+
 from customtkinter import ThemeManager
 
 import database
-from animation import fade_in, fade_out
+from archiver import Archiver
+from board_store import BoardStore
+from quick_index import QuickIndex
+from writer import DatabaseWriter
+from animation import AnimationScheduler, fade_in
 from setting import *
+from src.resources import get_bold_font, get_font
+from src.ui.ctk_archive import ArchiveWindow
 from src.ui.ctk_column import KanbanColumn
 from src.ui.ctk_dialog import TaskDialog
+from src.ui.ctk_geometry import ColumnGeometry
+from src.ui.ctk_notes import NoteManager
+from src.ui.ctk_profiler import LoopProfiler
+from src.ui.ctk_search import SearchBox
+from src.ui.ctk_switcher import QuickSwitcher
 from src.ui.ctk_task import DraggableTask
-from src.ui.src.pystickynote import PyStickyNote
+from src.ui.ctk_widget_pool import WidgetPool, count_widgets
 
 
 class App(ctk.CTk):
-    def __init__(self):
+    def __init__(self, database_path=None, on_ready=None, trace_path=None):
+        """
+        :argument database_path: Open this database instead of the configured one.
+        :argument on_ready: Called without arguments once startup has finished and
+            the board is fully interactive, used by benchmarks/bench_startup.py.
+        :argument trace_path: Profile the main loop and write the trace there on
+            exit, like profile_ui in settings.ini does.
+        """
         super().__init__()
+        # perf_counter() timestamps of the startup steps, see finish_startup.
+        self.startup_times = {"start": time.perf_counter()}
+        self.on_ready = on_ready
         ctk.deactivate_automatic_dpi_awareness()  # Its messed up with the drag and drop
         self.title("PyKanBan")
         self.geometry("800x600")
         self.resizable(True, True)
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
-        self.iconbitmap(LOGO_PATH)
-        self.FONT = ctk.CTkFont(family="Poppins", size=16)
-        self.BOLD_FONT = ctk.CTkFont(family="Poppins", size=16, weight="bold")
-        self.db = database.Database()
+        if sys.platform.startswith("win"):
+            self.iconbitmap(LOGO_PATH)  # .ico files are only supported on Windows
+        self.FONT = get_font()
+        self.BOLD_FONT = get_bold_font()
+        self.db = database.Database(database_path)
         self.db.initialize_database()
+        self.startup_times["database"] = time.perf_counter()
+        # Not self.config, every Tk widget already has a config method.
+        self.settings = self.db.config
+        self.writer = DatabaseWriter(self.db)
+        self.store = BoardStore(
+            self.db,
+            writer=self.writer,
+            memory_budget=self.settings.get_int("board_cache_bytes"),
+            page_size=self.settings.get_int("page_size"),
+        )
+        self.animations = AnimationScheduler(self)
+        self.notes = NoteManager(self)
+        self.archiver = Archiver(
+            self.db,
+            self.writer,
+            self.settings.get("archive_column"),
+            self.settings.get_int("archive_after_days"),
+            self.settings.get_int("archive_batch"),
+        )
+        # Filled in the background once the board is shown, see finish_startup.
+        self.quick_index = QuickIndex()
+        self.quick_index.watch(self.db)
+        self.profiler = None
+        if trace_path or self.settings.get_bool("profile_ui"):
+            self.enable_profiler(trace_path)
+        # Columns, and the task cards inside them, are reused across board switches.
+        self.column_pool = WidgetPool(lambda: KanbanColumn(self, "", self, self.db))
+        self.columns = []
+        self.column_geometry = ColumnGeometry(
+            self, border_color=ThemeManager.theme["CTkButton"]["fg_color"]
+        )
         self.bind("<Motion>", self.on_motion)
+        self.bind("<Control-k>", lambda event: self.open_switcher())
+        self.bind("<Control-K>", lambda event: self.open_switcher())
+        self.after(self.settings.get_int("writer_poll_ms"), self.poll_writer)
 
         try:
+            # Only the column headers are built before the window paints, the cards
+            # and the menu are filled in from the event loop by finish_startup.
             self.create_menu_bar()
-            self.create_kanban(self.db.get_current_kanban())
+            self.create_kanban(self.db.get_current_kanban(), fade=False, load=False)
+            self.startup_times["skeleton"] = time.perf_counter()
+            self.after_idle(self.finish_startup, list(self.columns))
         except Exception as e:
             if "command: application has been destroyed" in str(e):
                 print("Kanban creation cancelled by the user")
@@ -37,13 +99,32 @@ class App(ctk.CTk):
                     f"Error: While creating the kanban, please retry or contact me on github with the error message : \n {str(e)}"
                 )
 
+    def enable_profiler(self, trace_path=None):
+        """
+        Watch the main loop for stalls, see LoopProfiler. The report is printed and
+        the trace written to trace_path (default: ui_trace_path) when the app closes.
+
+        Call it before the board is shown, Tk keeps the commands given to widgets.
+        """
+        self.profiler = LoopProfiler(
+            self,
+            heartbeat_ms=self.settings.get_int("ui_heartbeat_ms"),
+            long_frame_ms=self.settings.get_float("long_frame_ms"),
+        ).start()
+        self.trace_path = trace_path or self.settings.get("ui_trace_path")
+        for method, name in (
+            ("handle_drop", "drop"),
+            ("switch_kanban", "board switch"),
+            ("delete_kanban", "delete board"),
+            ("create_note", "note open"),
+        ):
+            self.profiler.instrument(self, method, name)
+        self.profiler.instrument(KanbanColumn, "create_task", "add task")
+        self.profiler.instrument(DraggableTask, "delete", "delete task")
+        return self.profiler
+
     def on_motion(self, event):
-        for column in self.columns:
-            column.configure(border_width=0)
-        if self.is_in_column():
-            self.is_in_column().configure(
-                border_width=2, border_color=ThemeManager.theme["CTkButton"]["fg_color"]
-            )
+        self.column_geometry.hover(self.column_geometry.column_at(event.x_root))
 
     def rename_kanban(self, kanban_id):
         task_dialog = TaskDialog(
@@ -52,65 +133,98 @@ class App(ctk.CTk):
         task_dialog.update()
         self.wait_window(task_dialog)
         if task_dialog.task_title:
-            self.db.modify_kanban(kanban_id, task_dialog.task_title)
+            self.store.rename_kanban(kanban_id, task_dialog.task_title)
             self.title(f"Kanban - {task_dialog.task_title}")
-            self.create_submenu()
 
     def delete_kanban(self, kanban_id):
-        self.db.delete_kanban(kanban_id)
+        self.store.delete_kanban(kanban_id)
         self.destroy_columns()
-        if self.db.get_kanbans():
-            self.create_kanban(self.db.get_kanbans()[0][0])
+        kanbans = self.store.get_kanbans()
+        if kanbans:
+            self.create_kanban(kanbans[0][0])
         else:
             self.create_new_kanban()
-        self.create_submenu()
 
-    def create_kanban(self, kanban_id):
+    def finish_startup(self, columns):
+        """Load the tasks of one column per idle call, then build the menu."""
+        if columns:
+            column = columns.pop(0)
+            if column in self.columns:
+                column.task_frame.resume()
+            self.after_idle(self.finish_startup, columns)
+            return
+        self.build_dropdown()
+        self.startup_times["interactive"] = time.perf_counter()
+        # Notes left open last time come back once the board can be used.
+        self.notes.restore()
+        threading.Thread(
+            target=self.quick_index.load,
+            args=(self.db,),
+            name="quick-index",
+            daemon=True,
+        ).start()
+        self.archive_tasks()
+        if self.on_ready is not None:
+            self.on_ready()
+
+    def create_kanban(self, kanban_id, fade=True, load=True):
+        """
+        Show a Kanban board in the window.
+
+        :argument fade: Fade the columns in.
+        :argument load: Fill the columns with their tasks, otherwise only the headers
+            are shown until column.task_frame.resume() is called.
+        """
         # Create the columns and tasks
         self.columns = []
-        self.tasks = []
-        list_of_columns = self.db.get_columns(kanban_id)
-        for i, column_name in enumerate(list_of_columns):
-            self.columns.append(KanbanColumn(self, column_name[1], self, self.db))
-            for tasks in self.db.get_tasks(column_name[0]):
-                task = DraggableTask(
-                    master=self.columns[i].task_frame,
-                    text=tasks[1],
-                    id=tasks[0],
-                    app=self,
-                    db=self.db,
-                )
-                task.pack(fill="x", padx=5, pady=2)
-                self.tasks.append(task)
-                pywinstyles.set_opacity(task.winfo_id(), value=0.0)
+        self.kanban_id = kanban_id
+        board = self.store.get_board(kanban_id)
+        kanban_name = board.name
+        # Fading hundreds of widgets costs more than it is worth on large boards.
+        self.animations.enabled = self.settings.get_bool("animations") and (
+            sum(column.total for column in board.columns)
+            <= self.settings.get_int("animation_max_tasks")
+        )
+        # Columns only create cards for the tasks they show, see VirtualTaskList.
+        for board_column in board.columns:
+            column = self.column_pool.acquire()
+            column.set_column(board_column.name, board_column.id, load=load)
+            self.columns.append(column)
 
         # Set the grid layout for the columns
         for i, column in enumerate(self.columns):
             column.grid(row=1, column=i, padx=4, pady=4, sticky="nsew")
-            pywinstyles.set_opacity(column.winfo_id(), value=0.0)
             self.grid_columnconfigure(i, weight=1)
         self.grid_rowconfigure(1, weight=1)
+        self.column_geometry.set_columns(self.columns)
 
-        # Fade in the columns and tasks
-        for column in self.columns:
-            fade_in(self, column.winfo_id())
-        for task in self.tasks:
-            fade_in(self, task.winfo_id())
+        # Fade in the columns, all of them run on the same frames
+        if fade:
+            for column in self.columns:
+                fade_in(self, column)
 
-        # Set the kanban ID and update the title
-        self.kanban_id = kanban_id
-        self.title(f"Kanban - {self.db.get_kanban_name(kanban_id)}")
-        self.file_button.configure(text=self.db.get_kanban_name(kanban_id))
-        self.db.update_current_kanban(kanban_id)
-        self.create_submenu()
+        # Update the title
+        self.title(f"Kanban - {kanban_name}")
+        self.file_button.configure(text=kanban_name)
+        self.store.set_current_kanban(kanban_id)
 
     def destroy_columns(self):
         print(self.columns)
         if self.columns is not None:
-            for column in self.columns:
-                fade_out(self, column.winfo_id())
-                column.destroy()
-                self.columns = []
+            for i, column in enumerate(self.columns):
+                self.animations.cancel(column)
+                self.column_pool.release(column)  # Hidden and kept for the next board
+                self.grid_columnconfigure(i, weight=0)
+            self.columns = []
+            self.column_geometry.set_columns(self.columns)
+
+    def widget_stats(self):
+        """Return live widget counters, to check that nothing leaks over time."""
+        return {
+            "widgets": count_widgets(self),
+            "task_cards": DraggableTask.live,
+            "columns": self.column_pool.stats(),
+        }
 
     def switch_kanban(self, kanban_id):
         self.destroy_columns()
@@ -122,62 +236,93 @@ class App(ctk.CTk):
         )
         self.wait_window(task_dialog)
         if task_dialog.task_title:
-            kanban_id = self.db.create_kanban(task_dialog.task_title)
-            self.db.create_column("To Do", kanban_id)
-            self.db.create_column("In Progress", kanban_id)
-            self.db.create_column("Done", kanban_id)
+            kanban_id = self.store.create_kanban(task_dialog.task_title)
+            if kanban_id is None:
+                return
             self.destroy_columns()
             self.create_kanban(kanban_id)
 
-    def is_in_column(self):
-        x = self.winfo_pointerx() - self.winfo_rootx()
-        y = self.winfo_pointery() - self.winfo_rooty()
-        for column in self.columns:
-            if column.winfo_x() <= x <= column.winfo_x() + column.winfo_width():
-                return column
-        return False
+    def is_in_column(self, x_root=None):
+        """Return the column under x_root, or the pointer, False if there is none."""
+        return self.column_geometry.column_at(x_root) or False
 
     def handle_drop(self, task, event):
-        x = self.winfo_pointerx() - self.winfo_rootx()
-        y = self.winfo_pointery() - self.winfo_rooty()
-
-        if self.is_in_column():
-            column = self.is_in_column()
+        column = self.is_in_column(event.x_root)
+        # Cards never leave their list, a drop outside a column does nothing.
+        if column:
             print("IN A COLUMN", column.title)
-            fade_out(self, task.winfo_id())
-            task.place_forget()  # Remove it from the current place
-            task.pack_forget()  # Remove it from the current pack geometry manager
-            task = DraggableTask(
-                column.task_frame, task.text, task.id, self, self.db
-            )  # Create a new task
-            task.pack(fill="x", padx=5, pady=2)  # Pack the task into the new column
-            fade_in(self, task.winfo_id())
-            task.edit(column.title)
-        else:
-            # If not dropped in any column, return to original position
-            task.place_forget()
-            task.pack(fill="x", padx=5, pady=2)
+            source = task.task_list
+            index = column.task_frame.index_at(event.y_root)
+            # Move the task in the store and database, at the drop spot
+            task.edit(column.column_id, index)
+            if source is not None and source is not column.task_frame:
+                source.refresh()
+            column.task_frame.refresh()
+
+    def poll_writer(self):
+        """Report background write failures and resync the board from the database."""
+        failures = self.writer.poll_failures()
+        if failures:
+            print(f"Error: {len(failures)} change(s) could not be saved, reloading.")
+            self.store.invalidate()
+            self.switch_kanban(self.kanban_id)
+        # Boards that lost tasks to the archiver are read again when next shown.
+        for kanban_id in self.archiver.poll():
+            self.store.invalidate(kanban_id)
+            if kanban_id == self.kanban_id:
+                self.refresh_columns()
+        self.after(self.settings.get_int("writer_poll_ms"), self.poll_writer)
+
+    def refresh_columns(self):
+        for column in self.columns:
+            column.task_frame.refresh()
+
+    def archive_tasks(self):
+        """Archive the old tasks in the background, then again every so often."""
+        self.archiver.start()
+        self.after(
+            self.settings.get_int("archive_interval_s") * 1000, self.archive_tasks
+        )
+
+    def show_archive(self):
+        kanban_id = self.kanban_id
+        ArchiveWindow(
+            self,
+            f"Archive - {self.store.get_kanban_name(kanban_id)}",
+            get_page=lambda before, limit: self.db.get_archived_tasks(
+                kanban_id, before, limit
+            ),
+            count=self.db.count_archived_tasks(kanban_id),
+            on_restore=lambda task_id: self.restore_task(kanban_id, task_id),
+            font=self.FONT,
+        )
+
+    def restore_task(self, kanban_id, task_id):
+        if not self.store.restore_task(kanban_id, task_id):
+            return False
+        if kanban_id == self.kanban_id:
+            self.refresh_columns()
+        return True
 
     def on_closing(self):
+        if self.profiler is not None:
+            self.profiler.stop()
+            print(self.profiler.summary())
+            if self.trace_path:
+                self.profiler.write_trace(self.trace_path)
+                print(f"Event-loop trace written to {self.trace_path}")
+        self.notes.flush()
+        self.writer.close()
+        self.db.close()
         self.destroy()
 
-    def create_submenu(self):
-        for option in self.submenu._options_list:
-            option.destroy()
-        for kanban in self.db.get_kanbans():
-            self.submenu.add_option(
-                option=kanban[1], command=lambda e=kanban[0]: self.switch_kanban(e)
-            )
-
     def create_note(self):
-        PyStickyNote(self)
+        self.notes.create()
 
     def create_menu_bar(self):
         self.file_button = ctk.CTkButton(self, text="Kanban", font=self.FONT)
         self.file_button.grid(row=0, column=0, padx=4, pady=4, sticky="nsew")
-        self.dropdown = CustomDropdownMenu(widget=self.file_button)
-        self.dropdown.add_option(option="New KanBan", command=self.create_new_kanban)
-        self.submenu = self.dropdown.add_submenu(submenu_name="Open KanBan")
+        self.dropdown = None
         self.add_note = ctk.CTkButton(
             self,
             text="Add Note",
@@ -185,13 +330,80 @@ class App(ctk.CTk):
             font=self.FONT,
         )
         self.add_note.grid(row=0, column=1, padx=4, pady=4, sticky="nsew")
-        self.create_submenu()
+        self.search_box = SearchBox(
+            self,
+            search=lambda text, limit: self.db.search(text, limit),
+            on_select=self.open_search_result,
+            font=self.FONT,
+        )
+        self.search_box.grid(row=0, column=2, padx=4, pady=4, sticky="nsew")
+        self.switcher = QuickSwitcher(
+            self,
+            search=self.quick_index.search,
+            on_select=self.open_switcher_entry,
+            board_names=lambda: dict(self.store.get_kanbans()),
+            font=self.FONT,
+        )
+
+    def open_search_result(self, result):
+        """Show a Database.search result, switching boards if needed."""
+        kind, item_id, kanban_id = result[0], result[1], result[4]
+        if kind == "note":
+            self.notes.show(item_id)
+        elif kanban_id is not None:
+            self.show_task(kanban_id, item_id)
+
+    def open_switcher(self):
+        self.search_box.clear()
+        self.switcher.open()
+
+    def open_switcher_entry(self, entry):
+        """Show a QuickIndex.search entry, switching boards if needed."""
+        kind, item_id, _, kanban_id = entry
+        if kind == "task":
+            self.show_task(kanban_id, item_id)
+            return
+        if kanban_id != self.kanban_id:
+            self.switch_kanban(kanban_id)
+        if kind == "column":
+            self.show_column(item_id, 0)
+
+    def show_task(self, kanban_id, task_id):
+        """Switch to a board and scroll one of its tasks into view."""
+        self.store.flush()  # The task may have been moved a moment ago
+        location = self.db.get_task_index(task_id)
+        if location is None:
+            return
+        if kanban_id != self.kanban_id:
+            self.switch_kanban(kanban_id)
+        self.show_column(*location)
+
+    def show_column(self, column_id, index):
+        """Scroll the task at index of a column of the current board into view."""
+        for column in self.columns:
+            if column.column_id == column_id:
+                self.update_idletasks()  # A new board has no size yet
+                column.task_frame.see(index)
+                self.column_geometry.hover(column)
+
+    def build_dropdown(self):
+        """Build the Kanban menu, it is not needed before the board is shown."""
+        from CTkMenuBar import CustomDropdownMenu
+
+        self.dropdown = CustomDropdownMenu(widget=self.file_button)
+        self.dropdown.add_option(option="New KanBan", command=self.create_new_kanban)
+        # A flat list of every board does not scale, the switcher finds them by name.
+        self.dropdown.add_option(
+            option="Open KanBan...  (Ctrl+K)", command=self.open_switcher
+        )
 
         self.dropdown.add_option(
             option="Rename current Kanban",
             command=lambda: self.rename_kanban(self.kanban_id),
         )
 
+        self.dropdown.add_option(option="Archived tasks", command=self.show_archive)
+
         self.dropdown.add_option(
             option="Delete current Kanban",
             command=lambda: self.delete_kanban(self.kanban_id),
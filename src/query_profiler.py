@@ -0,0 +1,311 @@
+import atexit
+import sqlite3
+import sys
+import threading
+import time
+from bisect import bisect_left
+
+DEFAULT_SLOW_MS = 50
+# Upper bounds, in milliseconds, of the latency histogram buckets.
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000)
+EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "REPLACE")
+
+
+class Statement:
+    """One execution of a SQL statement, fetching its rows included."""
+
+    __slots__ = (
+        "method",
+        "sql",
+        "parameters",
+        "expanded",
+        "duration",
+        "rows",
+        "logged",
+    )
+
+    def __init__(self, method, sql, parameters):
+        self.method = method
+        self.sql = sql
+        self.parameters = parameters
+        self.expanded = None
+        self.duration = 0.0
+        self.rows = 0
+        self.logged = False
+
+
+class MethodStats:
+    """Latency histogram of the statements run by one Database method."""
+
+    __slots__ = ("calls", "rows", "total", "max", "buckets")
+
+    def __init__(self):
+        self.calls = 0
+        self.rows = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, seconds, rows):
+        self.calls += 1
+        self.rows += rows
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.buckets[bisect_left(BUCKETS_MS, seconds * 1000)] += 1
+
+
+class QueryProfiler:
+    """
+    Records every SQL statement run through a Database, see Database.enable_profiling.
+
+    Each statement is timed from execute() until its last row is fetched and charged
+    to the Database method that ran it. sqlite3's trace callback adds the statement
+    with its parameters bound, and the commits. Statements slower than slow_ms are
+    printed with their EXPLAIN QUERY PLAN. Everything is off until a profiler is
+    given to a Database, so normal runs pay nothing.
+    """
+
+    def __init__(self, slow_ms: float = DEFAULT_SLOW_MS, explain=True, keep=0):
+        """
+        :argument slow_ms: Statements taking longer are logged, None disables the log.
+        :argument explain: Log the EXPLAIN QUERY PLAN of slow statements.
+        :argument keep: How many of the last statements to keep in self.statements.
+        """
+        self.slow_ms = slow_ms
+        self.explain = explain
+        self.keep = keep
+        self.statements = []
+        self.slow = []
+        self.methods = {}
+        self.methods_codes = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def watch(self, cls, exclude=()):
+        """Charge statements to the public methods of cls, e.g. Database."""
+        for name, function in vars(cls).items():
+            code = getattr(function, "__code__", None)
+            if code is not None and not name.startswith("_") and name not in exclude:
+                self.methods_codes[code] = name
+
+    def calling_method(self):
+        frame = sys._getframe(2)
+        while frame is not None:
+            name = self.methods_codes.get(frame.f_code)
+            if name is not None:
+                return name
+            frame = frame.f_back
+        return "<other>"
+
+    # Called by ProfilingConnection and ProfilingCursor
+
+    def start(self, sql, parameters=None):
+        statement = Statement(self.calling_method(), sql, parameters)
+        self._local.current = statement
+        return statement
+
+    def trace(self, expanded):
+        """sqlite3 trace callback, receives each statement with its values bound."""
+        statement = getattr(self._local, "current", None)
+        if statement is not None and statement.expanded is None:
+            statement.expanded = expanded
+
+    def add_time(self, statement, seconds, rows=0, connection=None):
+        statement.duration += seconds
+        statement.rows += rows
+        if (
+            self.slow_ms is not None
+            and not statement.logged
+            and statement.duration * 1000 >= self.slow_ms
+        ):
+            statement.logged = True
+            self.log_slow(statement, connection)
+
+    def finish(self, statement):
+        """Add a statement to the histograms, once it will not be fetched any more."""
+        with self._lock:
+            stats = self.methods.get(statement.method)
+            if stats is None:
+                stats = self.methods[statement.method] = MethodStats()
+            stats.add(statement.duration, statement.rows)
+            if self.keep:
+                self.statements.append(statement)
+                del self.statements[: -self.keep]
+
+    def log_slow(self, statement, connection):
+        plan = []
+        if self.explain and connection is not None:
+            plan = self.query_plan(connection, statement)
+        with self._lock:
+            self.slow.append(statement)
+        print(
+            f"Slow query: {statement.duration * 1000:.1f} ms in {statement.method}: "
+            f"{statement.expanded or statement.sql}".strip()
+        )
+        for line in plan:
+            print(f"    {line}")
+
+    def query_plan(self, connection, statement):
+        sql = statement.sql.strip()
+        if not sql.upper().startswith(EXPLAINABLE):
+            return []
+        parameters = statement.parameters
+        if isinstance(parameters, list):
+            parameters = parameters[0] if parameters else ()
+        self._local.current = None  # The EXPLAIN itself is not recorded
+        try:
+            rows = sqlite3.Cursor(connection).execute(
+                f"EXPLAIN QUERY PLAN {sql}", parameters or ()
+            )
+            return [row[3] for row in rows]
+        except sqlite3.Error as e:
+            return [f"(no plan: {e})"]
+
+    def reset(self):
+        with self._lock:
+            self.statements.clear()
+            self.slow.clear()
+            self.methods.clear()
+
+    def summary(self):
+        """Return a text table of the time spent per Database method."""
+        with self._lock:
+            methods = sorted(
+                self.methods.items(), key=lambda item: item[1].total, reverse=True
+            )
+            slow = len(self.slow)
+        bounds = [f"<{b:g}" for b in BUCKETS_MS] + [f">={BUCKETS_MS[-1]:g}"]
+        lines = [
+            f"{'method':<24}{'queries':>8}{'rows':>9}{'total ms':>11}"
+            f"{'mean ms':>9}{'max ms':>9}  histogram (ms)"
+        ]
+        for name, stats in methods:
+            histogram = " ".join(
+                f"{bound}:{count}"
+                for bound, count in zip(bounds, stats.buckets)
+                if count
+            )
+            lines.append(
+                f"{name:<24}{stats.calls:>8}{stats.rows:>9}"
+                f"{stats.total * 1000:>11.1f}{stats.total / stats.calls * 1000:>9.2f}"
+                f"{stats.max * 1000:>9.2f}  {histogram}"
+            )
+        lines.append(f"{slow} slow quer{'y' if slow == 1 else 'ies'}")
+        return "\n".join(lines)
+
+    def print_summary_at_exit(self):
+        atexit.register(lambda: print(self.summary()))
+
+
+class ProfilingCursor(sqlite3.Cursor):
+    """A cursor timing its statements and counting the rows they return."""
+
+    profiler = None
+    statement = None
+
+    def _run(self, method, sql, parameters):
+        if self.statement is not None:
+            self.profiler.finish(self.statement)
+        statement = self.statement = self.profiler.start(sql, parameters)
+        start = time.perf_counter()
+        try:
+            return method(sql, parameters)
+        finally:
+            rows = self.rowcount if self.rowcount > 0 else 0
+            self.profiler.add_time(
+                statement, time.perf_counter() - start, rows, self.connection
+            )
+            if self.description is None:
+                # Nothing to fetch, the statement is complete.
+                self.profiler.finish(statement)
+                self.statement = None
+
+    def execute(self, sql, parameters=()):
+        return self._run(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        # Materialized so the first row can be used to explain a slow statement.
+        return self._run(super().executemany, sql, list(seq_of_parameters))
+
+    def _fetch(self, method, *args):
+        start = time.perf_counter()
+        result = method(*args)
+        statement = self.statement
+        if statement is not None:
+            if result is None or isinstance(result, tuple):
+                rows = 0 if result is None else 1
+            else:
+                rows = len(result)
+            self.profiler.add_time(
+                statement, time.perf_counter() - start, rows, self.connection
+            )
+            if result is None or (not isinstance(result, tuple) and not result):
+                self.profiler.finish(statement)
+                self.statement = None
+        return result
+
+    def fetchone(self):
+        return self._fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._fetch(super().fetchmany, size or self.arraysize)
+
+    def fetchall(self):
+        result = self._fetch(super().fetchall)
+        if self.statement is not None:
+            self.profiler.finish(self.statement)
+            self.statement = None
+        return result
+
+    def __del__(self):
+        # Statements whose rows were not all fetched end with their cursor.
+        if self.statement is not None and self.profiler is not None:
+            self.profiler.finish(self.statement)
+            self.statement = None
+
+    def __next__(self):
+        try:
+            return self._fetch(super().__next__)
+        except StopIteration:
+            if self.statement is not None:
+                self.profiler.finish(self.statement)
+                self.statement = None
+            raise
+
+
+class ProfilingConnection(sqlite3.Connection):
+    """
+    Connection factory for sqlite3.connect, its cursors are ProfilingCursors.
+
+    Connection.execute and commit are wrapped too, sqlite3 runs them in C without
+    going through cursor().
+    """
+
+    profiler = None
+
+    def cursor(self, factory=ProfilingCursor):
+        cursor = super().cursor(factory)
+        if isinstance(cursor, ProfilingCursor):
+            cursor.profiler = self.profiler
+        return cursor
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def _timed(self, method, sql):
+        statement = self.profiler.start(sql)
+        start = time.perf_counter()
+        try:
+            return method()
+        finally:
+            self.profiler.add_time(statement, time.perf_counter() - start)
+            self.profiler.finish(statement)
+
+    def commit(self):
+        return self._timed(super().commit, "COMMIT")
+
+    def rollback(self):
+        return self._timed(super().rollback, "ROLLBACK")
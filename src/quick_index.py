@@ -0,0 +1,235 @@
+import math
+import re
+import sqlite3
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from functools import lru_cache
+
+from database import fold
+
+# An entry must contain this share of the trigrams of the query to be a result, so
+# a typo or two still finds it.
+MIN_SIMILARITY = 0.5
+# When the rarest trigrams of a query are in more entries of a kind than about
+# this, only the newest ones are ranked, so common words stay as fast as rare ones.
+CANDIDATES = 2000
+# Boards come before columns, columns before tasks, when they match as well.
+KIND_BONUS = {"board": 0.3, "column": 0.2, "task": 0.0}
+
+
+@lru_cache(maxsize=16384)
+def word_grams(word, end=True):
+    """
+    Return the trigrams of a folded word, plus its first letter so one typed letter
+    finds something.
+
+    :argument end: False if the word is still being typed.
+    """
+    padded = f" {word} " if end else f" {word}"
+    return (padded[:2],) + tuple(padded[i : i + 3] for i in range(len(padded) - 2))
+
+
+def words(text):
+    return re.findall(r"\w+", fold(text))
+
+
+def grams(text, prefix=False):
+    """
+    Return the set of trigrams of text, see word_grams.
+
+    :argument prefix: The last word is being typed, its end is not a word end.
+    """
+    result = set()
+    found = words(text)
+    for i, word in enumerate(found):
+        result.update(word_grams(word, not prefix or i < len(found) - 1))
+    return result
+
+
+class QuickIndex:
+    """
+    In-memory trigram index of the board, column and task names, for the quick
+    switcher.
+
+    Entries are numbered in the order they are added and, for each kind, every
+    trigram keeps the numbers of the entries containing it in an array, ascending,
+    which takes a fraction of the memory of a set. Renaming or removing an entry
+    only forgets its number, the arrays are compacted once half of them are stale.
+    Methods can be called from any thread, see watch.
+    """
+
+    def __init__(self):
+        self.entries = []  # (kind, item_id, name, kanban_id), None once removed
+        self.ids = {}  # {(kind, item_id): entry number}
+        self.postings = {kind: {} for kind in KIND_BONUS}  # {kind: {trigram: array}}
+        self.removed = 0
+        self._lock = threading.RLock()
+        self._events = None  # Changes received while load() runs
+
+    def __len__(self):
+        return len(self.ids)
+
+    # Building
+
+    def load(self, db, batch=5000):
+        """
+        Index every board, column and task of db, call watch(db) first.
+
+        Meant for a background thread: the lock is taken batch entries at a time,
+        so searches meanwhile are answered from what is indexed so far.
+        """
+        with self._lock:
+            self._events = []
+        try:
+            cursor = db.get_connection().cursor()
+            cursor.execute("SELECT id, name, id FROM Kanban")
+            entries = [("board",) + row for row in cursor.fetchall()]
+            cursor.execute("SELECT id, name, kanban_id FROM KanbanColumn")
+            entries += [("column",) + row for row in cursor.fetchall()]
+            cursor.execute(
+                """
+                SELECT Task.id, Task.title, KanbanColumn.kanban_id
+                FROM Task
+                INNER JOIN TaskColumnLink ON TaskColumnLink.task_id = Task.id
+                INNER JOIN KanbanColumn ON KanbanColumn.id = TaskColumnLink.column_id
+                ORDER BY Task.id
+            """
+            )
+            while entries:
+                with self._lock:
+                    for entry in entries:
+                        self._add(*entry)
+                entries = [("task",) + row for row in cursor.fetchmany(batch)]
+        except sqlite3.Error as e:
+            # The database was closed while loading, the app is exiting.
+            print(f"Error loading the quick switcher index: {e}")
+        finally:
+            with self._lock:
+                # Changes committed while reading are replayed on top.
+                events, self._events = self._events, None
+                for event in events:
+                    self.on_change(*event)
+
+    def watch(self, db):
+        """Keep the index up to date with the changes made through db."""
+        db.subscribe(self.on_change)
+
+    def on_change(self, action, kind, item_id, name=None, kanban_id=None):
+        """Database change event, see Database.subscribe."""
+        with self._lock:
+            if self._events is not None:
+                self._events.append((action, kind, item_id, name, kanban_id))
+            elif action == "add":
+                self._add(kind, item_id, name, kanban_id)
+            elif action == "rename":
+                number = self.ids.get((kind, item_id))
+                if number is not None:
+                    self._add(kind, item_id, name, self.entries[number][3])
+            elif action == "delete" and kind == "board":
+                self._remove_board(item_id)
+            elif action == "delete":
+                self._remove((kind, item_id))
+
+    def _add(self, kind, item_id, name, kanban_id):
+        self._remove((kind, item_id))
+        number = len(self.entries)
+        self.entries.append((kind, item_id, name, kanban_id))
+        self.ids[(kind, item_id)] = number
+        postings = self.postings[kind]
+        for gram in grams(name):
+            numbers = postings.get(gram)
+            if numbers is None:
+                numbers = postings[gram] = array("I")
+            numbers.append(number)
+
+    def _remove(self, key):
+        number = self.ids.pop(key, None)
+        if number is None:
+            return
+        self.entries[number] = None
+        self.removed += 1
+        if self.removed > 1000 and self.removed * 2 > len(self.entries):
+            self._compact()
+
+    def _remove_board(self, kanban_id):
+        """Remove a board with its columns and tasks."""
+        for entry in self.entries:
+            if entry is not None and entry[3] == kanban_id:
+                self._remove(entry[:2])
+
+    def _compact(self):
+        entries = [entry for entry in self.entries if entry is not None]
+        self.entries = []
+        self.ids = {}
+        self.postings = {kind: {} for kind in KIND_BONUS}
+        self.removed = 0
+        for entry in entries:
+            self._add(*entry)
+
+    # Queries
+
+    def search(self, query, limit=10):
+        """
+        Return the limit entries closest to query, best first.
+
+        Entries are ranked by the share of the query trigrams they contain, plus a
+        bonus for containing the query as typed (more at the start) and for boards
+        and columns, then newest first.
+
+        :return: A list of (kind, item_id, name, kanban_id) tuples.
+        """
+        query_grams = grams(query, prefix=True)
+        if not query_grams:
+            return []
+        typed = " ".join(words(query))
+        need = max(1, math.ceil(len(query_grams) * MIN_SIMILARITY))
+        ranked = []
+        with self._lock:
+            for kind, postings in self.postings.items():
+                lists = sorted(
+                    (postings[gram] for gram in query_grams if gram in postings),
+                    key=len,
+                )
+                if len(lists) < need:
+                    continue
+                # An entry holding need of the trigrams holds one of any
+                # len(lists) - need + 1 of them, so the rarest ones give every
+                # candidate, newest first. Older entries are left out.
+                rarest = lists[: len(lists) - need + 1]
+                candidates = set()
+                for numbers in rarest:
+                    candidates.update(numbers[-(CANDIDATES // len(rarest)) :])
+                # Reading every array back to the oldest candidates would cost more
+                # than the rest, the oldest tenth are looked up one by one instead.
+                oldest = sorted(candidates)[: len(candidates) // 10 + 1]
+                floor = oldest.pop()
+                candidates.difference_update(oldest)
+                counts = Counter()
+                for numbers in lists:
+                    start = bisect_left(numbers, floor)
+                    counts.update(candidates.intersection(numbers[start:]))
+                    for number in oldest:
+                        i = bisect_left(numbers, number, 0, start)
+                        if i < start and numbers[i] == number:
+                            counts[number] += 1
+                best = sorted(
+                    (
+                        (count, number)
+                        for number, count in counts.items()
+                        if count >= need and self.entries[number] is not None
+                    ),
+                    reverse=True,
+                )[: limit * 10]
+                for count, number in best:
+                    entry = self.entries[number]
+                    text = " ".join(words(entry[2]))
+                    score = count / len(query_grams) + KIND_BONUS[kind]
+                    if text.startswith(typed):
+                        score += 0.5
+                    elif typed in text:
+                        score += 0.3
+                    ranked.append((score, number, entry))
+        ranked.sort(reverse=True)
+        return [entry for _, _, entry in ranked[:limit]]
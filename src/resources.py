@@ -0,0 +1,58 @@
+import customtkinter as ctk
+from PIL import Image
+
+from src.setting import resource
+
+DEFAULT_FONT_FAMILY = "Poppins"
+DEFAULT_FONT_SIZE = 16
+DEFAULT_ICON_SIZE = (24, 24)
+
+_fonts = {}
+_images = {}
+_icons = {}
+
+
+def get_font(
+    size: int = DEFAULT_FONT_SIZE,
+    weight: str = "normal",
+    family: str = DEFAULT_FONT_FAMILY,
+) -> ctk.CTkFont:
+    """
+    Return the shared CTkFont for a family, size and weight, creating it on first use.
+
+    Widgets must not configure the returned font, every widget using it would change.
+    """
+    key = (family, size, weight)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = ctk.CTkFont(family=family, size=size, weight=weight)
+    return font
+
+
+def get_bold_font(size: int = DEFAULT_FONT_SIZE) -> ctk.CTkFont:
+    return get_font(size, weight="bold")
+
+
+def get_icon(name: str, size: tuple[int, int] = DEFAULT_ICON_SIZE) -> ctk.CTkImage:
+    """
+    Return the shared CTkImage of assets/<name>.png, loading the file on first use.
+
+    The PNG is decoded once whatever the number of sizes asked for, and CTkImage keeps
+    its own scaled copy per DPI scaling, so each icon is only resized once per screen.
+
+    :argument name: The file name of the icon without the extension, e.g. "edit_task".
+    :argument size: The displayed size of the icon.
+    """
+    key = (name, size)
+    icon = _icons.get(key)
+    if icon is None:
+        image = _images.get(name)
+        if image is None:
+            image = _images[name] = Image.open(resource(f"assets/{name}.png"))
+        icon = _icons[key] = ctk.CTkImage(image, size=size)
+    return icon
+
+
+def stats():
+    """Return how many fonts, decoded images and icons have been created."""
+    return {"fonts": len(_fonts), "images": len(_images), "icons": len(_icons)}
@@ -2,7 +2,6 @@ import os
 import sys
 
 import customtkinter as ctk
-from PIL import Image
 
 
 def resource(relative_path: str) -> str:
@@ -21,7 +20,9 @@ def resource(relative_path: str) -> str:
 
 LOGO_PATH = resource("assets/icon.ico")
 
-EDIT_IMG = ctk.CTkImage(Image.open(resource("assets/edit_task.png")), size=(24, 24))
-DELETE_IMG = ctk.CTkImage(Image.open(resource("assets/delete_task.png")), size=(24, 24))
-ADD_IMG = ctk.CTkImage(Image.open(resource("assets/add_task.png")), size=(24, 24))
-MORE_IMG = ctk.CTkImage(Image.open(resource("assets/more_task.png")), size=(24, 24))
+# Tunables (page size, animations, drag rate...) live in settings.ini, see config.py.
+TASK_ROW_HEIGHT = 96  # Height of a task card in a column, spacing included
+TASK_TITLE_WIDTH = 150  # Task titles wrap at this many pixels
+TASK_TITLE_MAX_LINES = 3  # Lines of a title fitting in a row, longer ones are cut
+
+# Icons and fonts are created on first use and shared, see src/resources.py.
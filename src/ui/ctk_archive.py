@@ -0,0 +1,77 @@
+from src.setting import *
+
+PAGE_SIZE = 50
+
+
+class ArchiveWindow(ctk.CTkToplevel):
+    """
+    Lists the archived tasks of a board, newest first, with a button to put each one
+    back. Tasks are read a page at a time, "Show more" loads the next one.
+    """
+
+    def __init__(self, parent, title, get_page, count, on_restore, font=None):
+        """
+        :argument get_page: get_page(before, limit) returns Database.get_archived_tasks
+            rows.
+        :argument count: The number of archived tasks.
+        :argument on_restore: Called with a task ID, returns True once restored.
+        """
+        super().__init__(parent)
+        self.title(title)
+        self.geometry("520x420")
+        self.get_page = get_page
+        self.on_restore = on_restore
+        self.font = font
+        self.count = count
+        self.last_id = None
+        self.rows = 0
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+
+        self.label = ctk.CTkLabel(self, font=font)
+        self.label.grid(row=0, column=0, padx=10, pady=10, sticky="w")
+        self.task_list = ctk.CTkScrollableFrame(self)
+        self.task_list.grid(row=1, column=0, padx=10, pady=0, sticky="nsew")
+        self.task_list.grid_columnconfigure(0, weight=1)
+        self.more_button = ctk.CTkButton(
+            self, text="Show more", command=self.load_page, font=font
+        )
+        self.more_button.grid(row=2, column=0, padx=10, pady=10)
+
+        self.update_count()
+        self.load_page()
+
+    def update_count(self):
+        self.label.configure(text=f"{self.count} archived task(s)")
+
+    def load_page(self):
+        tasks = self.get_page(self.last_id, PAGE_SIZE)
+        for task_id, title, created_at, archived_at, column_name in tasks:
+            label = ctk.CTkLabel(
+                self.task_list,
+                text=f"{title}\n{column_name}, archived on {archived_at}",
+                anchor="w",
+                justify="left",
+                font=self.font,
+            )
+            label.grid(row=self.rows, column=0, padx=4, pady=2, sticky="ew")
+            button = ctk.CTkButton(self.task_list, text="Restore", width=80)
+            button.configure(
+                command=lambda task_id=task_id, widgets=(label, button): self.restore(
+                    task_id, widgets
+                )
+            )
+            button.grid(row=self.rows, column=1, padx=4, pady=2)
+            self.rows += 1
+        if tasks:
+            self.last_id = tasks[-1][0]
+        if len(tasks) < PAGE_SIZE:
+            self.more_button.grid_remove()
+
+    def restore(self, task_id, widgets):
+        if not self.on_restore(task_id):
+            return
+        for widget in widgets:
+            widget.destroy()
+        self.count -= 1
+        self.update_count()
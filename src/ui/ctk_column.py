@@ -1,49 +1,79 @@
 from customtkinter import ThemeManager
 
-from src.animation import fade_in
+from src.resources import get_bold_font, get_font, get_icon
 from src.setting import *
 from src.ui.ctk_dialog import TaskDialog
 from src.ui.ctk_task import DraggableTask
+from src.ui.ctk_task_list import VirtualTaskList
 
 
 class KanbanColumn(ctk.CTkFrame):
-    def __init__(self, master, title, app, db):
+    def __init__(self, master, title, app, db, column_id=None):
         super().__init__(master, corner_radius=10)
         self.app = app
         self.title = title
+        self.column_id = column_id
         self.db = db
 
-        FONT = ctk.CTkFont(family="Poppins", size=16)
-        BOLD_FONT = ctk.CTkFont(family="Poppins", size=16, weight="bold")
-
-        self.title_label = ctk.CTkLabel(self, text=title, font=BOLD_FONT)
+        self.title_label = ctk.CTkLabel(self, text=title, font=get_bold_font())
         self.title_label.pack(pady=10)
 
-        self.task_frame = ctk.CTkScrollableFrame(self)
+        self.task_frame = VirtualTaskList(
+            self,
+            get_tasks=self.get_tasks,
+            count_tasks=self.count_tasks,
+            create_card=self.create_card,
+        )
         self.task_frame.pack(fill="both", expand=True, padx=4, pady=4)
 
         self.add_task_button = ctk.CTkButton(
-            self, text="Add Task", image=ADD_IMG, command=self.add_task, font=FONT
+            self,
+            text="Add Task",
+            image=get_icon("add_task"),
+            command=self.add_task,
+            font=get_font(),
         )
         self.add_task_button.pack(pady=10)
 
+    def set_column(self, title, column_id, load=True):
+        """
+        Show another column in this widget, used when columns are recycled.
+
+        :argument load: Show the tasks right away, otherwise the task list stays empty
+            until task_frame.resume() is called.
+        """
+        self.title = title
+        self.column_id = column_id
+        self.title_label.configure(text=title)
+        self.task_frame.offset = 0
+        self.task_frame.hide_preview()
+        if load:
+            self.task_frame.resume()
+        else:
+            self.task_frame.suspend()
+
+    def get_tasks(self, start, limit):
+        return self.app.store.get_tasks(
+            self.app.kanban_id, self.column_id, start, limit
+        )
+
+    def count_tasks(self):
+        column = self.app.store.get_board(self.app.kanban_id).column(self.column_id)
+        return column.total if column is not None else 0
+
+    def create_card(self, master):
+        return DraggableTask(master=master, text="", id=None, app=self.app, db=self.db)
+
     def add_task(self):
         task_dialog = TaskDialog(self, "Add Task", "Enter task description:", "Add")
         task_dialog.update()
         self.wait_window(task_dialog)
         if task_dialog.task_title:
-            id = self.db.add_task(
-                title=task_dialog.task_title,
-                column_name=self.title,
-                kanban_id=self.app.kanban_id,
-            )
-            if id:
-                task = DraggableTask(
-                    master=self.task_frame,
-                    text=task_dialog.task_title,
-                    id=id,
-                    app=self.app,
-                    db=self.db,
-                )
-                task.pack(fill="x", padx=5, pady=2)
-                fade_in(self, task.winfo_id())
+            self.create_task(task_dialog.task_title)
+
+    def create_task(self, title):
+        """Add a task to the column and scroll to it, returns its ID or None."""
+        id = self.app.store.add_task(self.app.kanban_id, self.column_id, title)
+        if id:
+            self.task_frame.see(self.count_tasks() - 1)
+        return id
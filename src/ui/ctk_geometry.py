@@ -0,0 +1,95 @@
+from bisect import bisect_right
+
+
+class ColumnGeometry:
+    """
+    Cached bounds of the Kanban columns, to find the column under the pointer.
+
+    The bounds are read from Tk once and kept until the window or one of the columns
+    is moved or resized (a <Configure> event), so hit-testing on every mouse motion
+    is a binary search over the left edges instead of two Tk calls per column.
+    The column with the hover border is remembered, only a change of column touches
+    the borders.
+    """
+
+    def __init__(self, root, border_color=None):
+        """
+        :argument root: The window holding the columns, pointer positions are read
+            relative to it.
+        :argument border_color: The border color of the hovered column.
+        """
+        self.root = root
+        self.border_color = border_color
+        self.columns = []
+        self.hovered = None
+        self.rebuilds = 0
+        self._lefts = None
+        self._bounds = None
+        self._origin = (0, 0)
+        # Configure events of every widget inside root reach this binding.
+        root.bind("<Configure>", self._on_configure, add="+")
+
+    def set_columns(self, columns):
+        """Track a new list of columns, e.g. after switching boards."""
+        if self.hovered is not None and self.hovered not in columns:
+            self._set_border(self.hovered, False)
+            self.hovered = None
+        self.columns = list(columns)
+        self.invalidate()
+
+    def invalidate(self):
+        self._lefts = None
+        self._bounds = None
+
+    def _on_configure(self, event):
+        if event.widget is self.root or event.widget in self.columns:
+            self.invalidate()
+
+    def _build(self):
+        self.rebuilds += 1
+        self._origin = (self.root.winfo_rootx(), self.root.winfo_rooty())
+        bounds = []
+        for column in self.columns:
+            if column.winfo_ismapped():
+                x = column.winfo_x()
+                bounds.append((x, x + column.winfo_width(), column))
+        bounds.sort(key=lambda bound: bound[0])
+        self._bounds = bounds
+        self._lefts = [bound[0] for bound in bounds]
+
+    def column_at(self, x_root=None):
+        """
+        Return the column under a screen x coordinate, or None.
+
+        :argument x_root: Screen x coordinate, usually event.x_root. Defaults to the
+            current pointer position.
+        """
+        if self._lefts is None:
+            self._build()
+        if x_root is None:
+            x_root = self.root.winfo_pointerx()
+        x = x_root - self._origin[0]
+        i = bisect_right(self._lefts, x) - 1
+        if i >= 0 and x <= self._bounds[i][1]:
+            return self._bounds[i][2]
+        return None
+
+    def hover(self, column):
+        """Move the hover border to column, None removes it."""
+        if column is self.hovered:
+            return
+        if self.hovered is not None:
+            self._set_border(self.hovered, False)
+        if column is not None:
+            self._set_border(column, True)
+        self.hovered = column
+
+    def _set_border(self, column, hovered):
+        try:
+            if hovered:
+                column.configure(border_width=2, border_color=self.border_color)
+            else:
+                column.configure(border_width=0)
+        except Exception:
+            # The column was destroyed in the meantime.
+            pass
@@ -0,0 +1,123 @@
+DEFAULT_GEOMETRY = "200x200"
+NOTE_TITLE_LENGTH = 50
+
+
+def note_title(content: str) -> str:
+    """Return the first non-empty line of a note, shortened, to use as its title."""
+    for line in content.splitlines():
+        line = line.strip()
+        if line:
+            return line[:NOTE_TITLE_LENGTH]
+    return "Note"
+
+
+class NoteManager:
+    """
+    Opens the sticky notes and keeps them in the Note table.
+
+    A note saves itself note_autosave_ms after the user stops typing, moving or
+    pinning it, and only if something changed (see PyStickyNote). The writes go
+    through the DatabaseWriter, so typing in a large note never waits on disk.
+    Notes left open are shown again on the next launch, one per idle callback.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.db = app.db
+        self.writer = app.writer
+        self.notes = {}  # {note_id: PyStickyNote}
+
+    def create(self):
+        """Open a new, empty note."""
+        note_id = self.db.add_note("Note", "", is_open=True)
+        return self.open(note_id, "Note", "")
+
+    def open(self, note_id, title, content, geometry=None, pinned=False):
+        """Show a note window, or bring it to the front if it is already open."""
+        # Imported on first use, sticky notes pull in hPyT.
+        from src.ui.src.pystickynote import PyStickyNote
+
+        note = self.notes.get(note_id)
+        if note is not None and note.winfo_exists():
+            note.lift()
+            return note
+        note = PyStickyNote(
+            self.app,
+            title=title,
+            content=content,
+            geometry=geometry or DEFAULT_GEOMETRY,
+            pinned=pinned,
+            on_save=lambda content: self.save(note_id, content),
+            on_window_change=lambda geometry, pinned: self.save_window(
+                note_id, geometry, pinned
+            ),
+            on_close=lambda: self.close(note_id),
+            autosave_ms=self.app.settings.get_int("note_autosave_ms"),
+        )
+        self.notes[note_id] = note
+        return note
+
+    def show(self, note_id):
+        """Open a stored note, where its window was last time."""
+        if note_id in self.notes and self.notes[note_id].winfo_exists():
+            self.notes[note_id].lift()
+            return self.notes[note_id]
+        note = self.db.get_note(note_id)
+        if note is None:
+            return None
+        geometry, pinned = self.db.get_note_window(note_id) or (None, False)
+        self.writer.submit(
+            ("note", note_id, "open"), self.db.set_note_open, note_id, True
+        )
+        return self.open(note_id, note[1], note[2], geometry, pinned)
+
+    def save(self, note_id, content):
+        title = note_title(content)
+        note = self.notes.get(note_id)
+        if note is not None:
+            note.title(title)
+        self.writer.submit(
+            ("note", note_id), self.db.update_note, note_id, title, content
+        )
+
+    def save_window(self, note_id, geometry, pinned):
+        self.writer.submit(
+            ("note", note_id, "window"),
+            self.db.update_note_window,
+            note_id,
+            geometry,
+            pinned,
+        )
+
+    def close(self, note_id):
+        note = self.notes.pop(note_id, None)
+        if note is not None and not note.get_content().strip():
+            # Nothing worth keeping in an empty note.
+            self.writer.cancel(("note", note_id))
+            self.writer.cancel(("note", note_id, "window"))
+            self.writer.submit(("note", note_id, "open"), self.db.delete_note, note_id)
+        else:
+            self.writer.submit(
+                ("note", note_id, "open"), self.db.set_note_open, note_id, False
+            )
+
+    def restore(self, on_done=None):
+        """Reopen the notes left open last time, one per idle callback."""
+        self._restore_next(self.db.get_open_notes(), on_done)
+
+    def _restore_next(self, notes, on_done):
+        if not notes:
+            if on_done is not None:
+                on_done()
+            return
+        note_id, title, geometry, pinned = notes.pop(0)
+        note = self.db.get_note(note_id)
+        if note is not None:
+            self.open(note_id, title, note[2], geometry, pinned)
+        self.app.after_idle(self._restore_next, notes, on_done)
+
+    def flush(self):
+        """Hand the pending saves of every open note to the writer, before closing."""
+        for note in list(self.notes.values()):
+            if note.winfo_exists():
+                note.flush()
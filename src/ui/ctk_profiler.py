@@ -0,0 +1,271 @@
+import functools
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+
+DEFAULT_HEARTBEAT_MS = 16
+DEFAULT_LONG_FRAME_MS = 50
+# Heartbeat lags kept for the median and the trace, about 10 minutes at 60 per second.
+MAX_LAGS = 36_000
+
+
+def widget_paths(widget):
+    """Return the Tk path names of widget and every widget below it."""
+    paths = {str(widget)}
+    for child in widget.winfo_children():
+        paths |= widget_paths(child)
+    return paths
+
+
+class Operation:
+    """One run of an instrumented handler, e.g. a drop or a board switch."""
+
+    __slots__ = ("name", "start", "duration", "created", "destroyed")
+
+    def __init__(self, name, start):
+        self.name = name
+        self.start = start
+        self.duration = 0.0
+        self.created = 0
+        self.destroyed = 0
+
+
+class LoopProfiler:
+    """
+    Measures how long the Tk main loop stays blocked, and by what.
+
+    A heartbeat is scheduled with after() every heartbeat_ms, the delay between when
+    it was due and when it ran is the event-loop lag. A lag above long_frame_ms is a
+    long frame, charged to the instrumented operations that ran since the previous
+    heartbeat (see instrument), or to "<unknown>" (layout, fades...) if none did.
+
+    Operations also record how many widgets they created and destroyed. Everything
+    can be written as a Chrome trace file, to open in chrome://tracing or Perfetto.
+    Only Tk is used, so it runs the same under a virtual X server.
+
+    Only the last MAX_LAGS heartbeats are kept, the count and the longest lag cover
+    the whole run. stop() puts back the methods replaced by instrument.
+    """
+
+    def __init__(
+        self,
+        root,
+        heartbeat_ms: int = DEFAULT_HEARTBEAT_MS,
+        long_frame_ms: float = DEFAULT_LONG_FRAME_MS,
+        count_widgets: bool = True,
+    ):
+        """
+        :argument root: The application window.
+        :argument count_widgets: Count the widgets created and destroyed by every
+            operation, it walks the widget tree twice per operation.
+        """
+        self.root = root
+        self.heartbeat_ms = heartbeat_ms
+        self.long_frame_ms = long_frame_ms
+        self.count_widgets = count_widgets
+        self.operations = []
+        self.long_frames = []  # (start, lag, [operation names])
+        self.lags = deque(maxlen=MAX_LAGS)  # (time, lag) of the latest heartbeats
+        self.heartbeats = 0
+        self.max_lag = 0.0
+        self.origin = time.perf_counter()
+        self._patches = []  # (target, method_name, replaced attribute or None)
+        self._recent = []
+        self._depth = 0
+        self._due = None
+        self._after_id = None
+
+    # Heartbeat
+
+    @property
+    def running(self):
+        return self._after_id is not None
+
+    def start(self):
+        if self._after_id is None:
+            self._schedule()
+        return self
+
+    def stop(self):
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass  # The window is already gone
+            self._after_id = None
+        while self._patches:
+            target, method_name, replaced = self._patches.pop()
+            if replaced is None:
+                delattr(target, method_name)
+            else:
+                setattr(target, method_name, replaced)
+
+    def _schedule(self):
+        self._due = time.perf_counter() + self.heartbeat_ms / 1000
+        self._after_id = self.root.after(self.heartbeat_ms, self._beat)
+
+    def _beat(self):
+        now = time.perf_counter()
+        lag = max(0.0, now - self._due)
+        self.lags.append((now, lag))
+        self.heartbeats += 1
+        self.max_lag = max(self.max_lag, lag)
+        if lag * 1000 >= self.long_frame_ms:
+            names = [operation.name for operation in self._recent] or ["<unknown>"]
+            self.long_frames.append((self._due, lag, names))
+        self._recent = []
+        self._schedule()
+
+    # Operations
+
+    @contextmanager
+    def operation(self, name):
+        """Time a block of code as an operation, nested operations are merged."""
+        if self._depth:
+            yield None
+            return
+        before = widget_paths(self.root) if self.count_widgets else None
+        operation = Operation(name, time.perf_counter())
+        self._depth += 1
+        try:
+            yield operation
+        finally:
+            self._depth -= 1
+            operation.duration = time.perf_counter() - operation.start
+            if before is not None:
+                after = widget_paths(self.root)
+                operation.created = len(after - before)
+                operation.destroyed = len(before - after)
+            self.operations.append(operation)
+            self._recent.append(operation)
+
+    def instrument(self, target, method_name, name=None):
+        """
+        Replace target.method_name by a version running inside operation(name).
+
+        target may be an instance or a class, patch classes before their widgets
+        are created when the method is given to Tk as a command. A method wrapped by
+        another profiler is unwrapped first, so wrappers never stack. Widgets created
+        meanwhile keep the wrapper as their command, it only times while running.
+        """
+        replaced = vars(target).get(method_name)
+        if replaced is None:
+            function = getattr(target, method_name)
+        else:
+            function = getattr(replaced, "_profiled", replaced)
+        name = name or method_name
+        profiler = self
+
+        if isinstance(target, type):
+
+            @functools.wraps(function)
+            def wrapper(instance, *args, **kwargs):
+                if not profiler.running:
+                    return function(instance, *args, **kwargs)
+                with profiler.operation(name):
+                    return function(instance, *args, **kwargs)
+
+        else:
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not profiler.running:
+                    return function(*args, **kwargs)
+                with profiler.operation(name):
+                    return function(*args, **kwargs)
+
+        wrapper._profiled = function
+        self._patches.append((target, method_name, replaced))
+        setattr(target, method_name, wrapper)
+
+    # Reports
+
+    def summary(self):
+        """Return a text report of the lag and of the slowest operations."""
+        lags = sorted(lag for _, lag in self.lags)
+        lines = []
+        if lags:
+            lines.append(
+                f"Event loop: {self.heartbeats} heartbeats, "
+                f"median lag {lags[len(lags) // 2] * 1000:.1f} ms, "
+                f"max {self.max_lag * 1000:.1f} ms, "
+                f"{len(self.long_frames)} long frame(s) over {self.long_frame_ms:g} ms"
+            )
+        by_name = {}
+        for operation in self.operations:
+            by_name.setdefault(operation.name, []).append(operation)
+        lines.append(
+            f"{'operation':<16}{'runs':>6}{'mean ms':>10}{'max ms':>10}"
+            f"{'created':>9}{'destroyed':>11}"
+        )
+        for name, operations in sorted(
+            by_name.items(), key=lambda item: -sum(o.duration for o in item[1])
+        ):
+            durations = [o.duration * 1000 for o in operations]
+            lines.append(
+                f"{name:<16}{len(operations):>6}"
+                f"{sum(durations) / len(durations):>10.1f}{max(durations):>10.1f}"
+                f"{sum(o.created for o in operations):>9}"
+                f"{sum(o.destroyed for o in operations):>11}"
+            )
+        blamed = {}
+        for _, lag, names in self.long_frames:
+            for name in names:
+                blamed[name] = blamed.get(name, 0) + 1
+        if blamed:
+            lines.append(
+                "Long frames: "
+                + ", ".join(f"{name} x{count}" for name, count in blamed.items())
+            )
+        return "\n".join(lines)
+
+    def write_trace(self, path):
+        """Write the recorded events as a Chrome trace (JSON) file."""
+
+        def us(seconds):
+            return round((seconds - self.origin) * 1_000_000)
+
+        pid = os.getpid()
+        events = [
+            {
+                "name": operation.name,
+                "cat": "operation",
+                "ph": "X",
+                "ts": us(operation.start),
+                "dur": round(operation.duration * 1_000_000),
+                "pid": pid,
+                "tid": 1,
+                "args": {
+                    "widgets_created": operation.created,
+                    "widgets_destroyed": operation.destroyed,
+                },
+            }
+            for operation in self.operations
+        ]
+        events += [
+            {
+                "name": "long frame",
+                "cat": "lag",
+                "ph": "X",
+                "ts": us(start),
+                "dur": round(lag * 1_000_000),
+                "pid": pid,
+                "tid": 2,
+                "args": {"operations": names},
+            }
+            for start, lag, names in self.long_frames
+        ]
+        events += [
+            {
+                "name": "lag",
+                "ph": "C",
+                "ts": us(moment),
+                "pid": pid,
+                "args": {"ms": round(lag * 1000, 3)},
+            }
+            for moment, lag in self.lags
+        ]
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
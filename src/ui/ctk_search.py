@@ -0,0 +1,118 @@
+from src.setting import *
+
+DEFAULT_DELAY_MS = 150
+DEFAULT_MAX_RESULTS = 8
+RESULTS_WIDTH = 420
+
+
+def result_text(result):
+    """One line describing a Database.search result."""
+    kind, _, title, snippet, _, kanban_name, _, column_name = result
+    if kind == "note":
+        return f"Note: {snippet}"
+    if kanban_name is None:
+        return snippet
+    return f"{snippet}    ({kanban_name} / {column_name})"
+
+
+class SearchBox(ctk.CTkEntry):
+    """
+    A search field for the menu bar.
+
+    Results of search(text, limit) are listed below the field delay_ms after the
+    user stops typing. Enter picks the first result, a click picks any of them, and
+    on_select(result) is called with it. The result list is a frame placed over the
+    window, its buttons are reused from one search to the next.
+    """
+
+    def __init__(
+        self,
+        master,
+        search,
+        on_select,
+        delay_ms: int = DEFAULT_DELAY_MS,
+        max_results: int = DEFAULT_MAX_RESULTS,
+        **kwargs,
+    ):
+        """
+        :argument search: search(text, limit) returns Database.search results.
+        :argument on_select: Called with the chosen result.
+        """
+        super().__init__(master, placeholder_text="Search", **kwargs)
+        self.search = search
+        self.on_select = on_select
+        self.delay_ms = delay_ms
+        self.max_results = max_results
+        self.results = []
+        self.panel = None
+        self.buttons = []
+        self._after = None
+
+        self.bind("<KeyRelease>", self.on_key)
+        self.bind("<Return>", self.select_first)
+        self.bind("<Escape>", lambda event: self.clear())
+
+    def on_key(self, event):
+        if event.keysym in ("Return", "Escape"):
+            return
+        if self._after is not None:
+            self.after_cancel(self._after)
+        self._after = self.after(self.delay_ms, self.update_results)
+
+    def update_results(self):
+        self._after = None
+        text = self.get().strip()
+        self.results = self.search(text, self.max_results) if text else []
+        self.show_results()
+
+    def show_results(self):
+        if not self.results:
+            self.hide_results()
+            return
+        root = self.winfo_toplevel()
+        if self.panel is None:
+            self.panel = ctk.CTkFrame(root, border_width=1)
+            self.panel.grid_columnconfigure(0, weight=1)
+        while len(self.buttons) < len(self.results):
+            button = ctk.CTkButton(
+                self.panel, anchor="w", fg_color="transparent", text=""
+            )
+            button.grid(row=len(self.buttons), column=0, padx=2, pady=1, sticky="ew")
+            self.buttons.append(button)
+        for i, button in enumerate(self.buttons):
+            if i < len(self.results):
+                button.configure(
+                    text=result_text(self.results[i]),
+                    command=lambda result=self.results[i]: self.select(result),
+                )
+                button.grid()
+            else:
+                button.grid_remove()
+        self.panel.place(
+            x=self.winfo_rootx() - root.winfo_rootx(),
+            y=self.winfo_rooty() - root.winfo_rooty() + self.winfo_height(),
+            width=max(self.winfo_width(), RESULTS_WIDTH),
+        )
+        self.panel.lift()
+
+    def hide_results(self):
+        if self.panel is not None:
+            self.panel.place_forget()
+
+    def select_first(self, event=None):
+        if self._after is not None:
+            # Enter pressed before the results were refreshed.
+            self.after_cancel(self._after)
+            self.update_results()
+        if self.results:
+            self.select(self.results[0])
+
+    def select(self, result):
+        self.clear()
+        self.on_select(result)
+
+    def clear(self):
+        self.delete(0, "end")
+        self.results = []
+        self.hide_results()
+        self.winfo_toplevel().focus()
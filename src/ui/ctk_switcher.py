@@ -0,0 +1,127 @@
+from src.setting import *
+
+DEFAULT_MAX_RESULTS = 10
+SWITCHER_WIDTH = 480
+SELECTED_COLOR = ("gray75", "gray30")
+
+
+def entry_text(entry, board_names):
+    """
+    One line describing a QuickIndex.search entry.
+
+    :argument board_names: {kanban_id: name}, to tell where columns and tasks are.
+    """
+    kind, _, name, kanban_id = entry
+    if kind == "board":
+        return f"Board: {name}"
+    board = board_names.get(kanban_id, "?")
+    if kind == "column":
+        return f"Column: {name}    ({board})"
+    return f"{name}    ({board})"
+
+
+class QuickSwitcher(ctk.CTkFrame):
+    """
+    A box to jump to a board, column or task by typing part of its name, opened
+    with Ctrl+K.
+
+    Results of search(text, limit) are listed on every key press, the QuickIndex
+    answers in a few milliseconds. Up and Down move the selection, Enter or a click
+    picks it and on_select(entry) is called with it, Escape closes the box. The box
+    is placed over the top of the window and its buttons are reused from one search
+    to the next.
+    """
+
+    def __init__(
+        self,
+        master,
+        search,
+        on_select,
+        board_names,
+        max_results: int = DEFAULT_MAX_RESULTS,
+        font=None,
+    ):
+        """
+        :argument search: search(text, limit) returns QuickIndex.search entries.
+        :argument on_select: Called with the chosen entry.
+        :argument board_names: Returns {kanban_id: name}, see entry_text.
+        """
+        super().__init__(master, border_width=1)
+        self.search = search
+        self.on_select = on_select
+        self.board_names = board_names
+        self.max_results = max_results
+        self.font = font
+        self.results = []
+        self.selected = 0
+        self.buttons = []
+
+        self.grid_columnconfigure(0, weight=1)
+        self.entry = ctk.CTkEntry(
+            self, placeholder_text="Go to board, column or task", font=font
+        )
+        self.entry.grid(row=0, column=0, padx=6, pady=6, sticky="ew")
+        self.entry.bind("<KeyRelease>", self.on_key)
+        self.entry.bind("<Up>", lambda event: self.move(-1))
+        self.entry.bind("<Down>", lambda event: self.move(1))
+        self.entry.bind("<Return>", self.select_current)
+        self.entry.bind("<Escape>", lambda event: self.close())
+
+    def open(self):
+        self.entry.delete(0, "end")
+        self.update_results()
+        self.place(relx=0.5, y=40, anchor="n", width=SWITCHER_WIDTH)
+        self.lift()
+        self.entry.focus_set()
+
+    def close(self):
+        self.place_forget()
+        self.winfo_toplevel().focus()
+
+    def on_key(self, event):
+        if event.keysym in ("Up", "Down", "Return", "Escape"):
+            return
+        self.update_results()
+
+    def update_results(self):
+        text = self.entry.get().strip()
+        self.results = self.search(text, self.max_results) if text else []
+        self.selected = 0
+        self.show_results()
+
+    def show_results(self):
+        while len(self.buttons) < len(self.results):
+            button = ctk.CTkButton(
+                self, anchor="w", fg_color="transparent", text="", font=self.font
+            )
+            button.grid(
+                row=len(self.buttons) + 1, column=0, padx=6, pady=1, sticky="ew"
+            )
+            self.buttons.append(button)
+        board_names = self.board_names() if self.results else {}
+        for i, button in enumerate(self.buttons):
+            if i < len(self.results):
+                button.configure(
+                    text=entry_text(self.results[i], board_names),
+                    command=lambda entry=self.results[i]: self.select(entry),
+                    fg_color=SELECTED_COLOR if i == self.selected else "transparent",
+                )
+                button.grid()
+            else:
+                button.grid_remove()
+
+    def move(self, step):
+        if not self.results:
+            return "break"
+        self.buttons[self.selected].configure(fg_color="transparent")
+        self.selected = (self.selected + step) % len(self.results)
+        self.buttons[self.selected].configure(fg_color=SELECTED_COLOR)
+        return "break"
+
+    def select_current(self, event=None):
+        if self.results:
+            self.select(self.results[self.selected])
+
+    def select(self, entry):
+        self.close()
+        self.on_select(entry)
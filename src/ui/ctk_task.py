@@ -1,18 +1,142 @@
-import pywinstyles
+import time
 
 from src import database
-from src.animation import fade_out
+from src.animation import fade_out, set_opacity
+from src.resources import get_font, get_icon
 from src.setting import *
 from src.ui.ctk_dialog import TaskDialog
 
 
+def wrap_lines(text, font, width=TASK_TITLE_WIDTH):
+    """Split text in the lines a label wrapping at width pixels shows it on."""
+    lines = []
+    line = ""
+    for word in text.split():
+        candidate = f"{line} {word}" if line else word
+        if line and font.measure(candidate) > width:
+            lines.append(line)
+            candidate = word
+        # A word wider than the label is broken where it overflows, like Tk does.
+        while len(candidate) > 1 and font.measure(candidate) > width:
+            cut = len(candidate) - 1
+            while cut > 1 and font.measure(candidate[:cut]) > width:
+                cut -= 1
+            lines.append(candidate[:cut])
+            candidate = candidate[cut:]
+        line = candidate
+    lines.append(line)
+    return lines
+
+
+def elide_title(text, font, max_lines=TASK_TITLE_MAX_LINES):
+    """
+    Return a task title cut with an ellipsis after max_lines wrapped lines, so it
+    fits in a TASK_ROW_HEIGHT row instead of being clipped without a sign.
+    """
+    if font.measure(text) <= TASK_TITLE_WIDTH:
+        return text
+    lines = wrap_lines(text, font)
+    if len(lines) <= max_lines:
+        return text
+    last = lines[max_lines - 1]
+    while last and font.measure(last + "…") > TASK_TITLE_WIDTH:
+        last = last[:-1]
+    return "\n".join(lines[: max_lines - 1] + [last.rstrip() + "…"])
+
+
+class DragGhost(ctk.CTkFrame):
+    """
+    The see-through copy of a task that follows the mouse during a drag.
+
+    The application keeps a single ghost (see get_drag_ghost) which is moved and
+    re-labelled for every drag instead of being rebuilt.
+    """
+
+    def __init__(self, master, font):
+        super().__init__(master, border_width=2)
+        self.grid_columnconfigure(2, weight=1)
+        self.grid_rowconfigure(2, weight=1)
+        self.font = font
+        self.label = ctk.CTkLabel(
+            self,
+            text="",
+            wraplength=TASK_TITLE_WIDTH,
+            anchor="e",
+            justify="left",
+            font=font,
+        )
+        self.label.grid(row=0, column=0, rowspan=5, padx=16, pady=8, sticky="nsw")
+        self.edit_button = ctk.CTkButton(
+            self, text="", image=get_icon("edit_task"), width=48
+        )
+        self.edit_button.grid(
+            row=1, column=1, padx=8, pady=(8, 4), sticky="e", columnspan=2
+        )
+        self.delete_button = ctk.CTkButton(
+            self, text="", image=get_icon("delete_task"), width=48
+        )
+        self.delete_button.grid(
+            row=2, column=1, padx=8, pady=(4, 8), sticky="e", columnspan=2
+        )
+        set_opacity(self, 0.5)
+
+    def show(self, text, width, height, x, y):
+        self.label.configure(text=elide_title(text, self.font))
+        self.configure(width=width, height=height)
+        self.place(x=x, y=y)
+        self.lift()
+
+    def move(self, x, y):
+        self.place_configure(x=x, y=y)
+
+    def hide(self):
+        self.place_forget()
+
+
+class DragStats:
+    """Counters of one drag, printed after the drop when drag_stats is set."""
+
+    def __init__(self):
+        self.events = 0
+        self.coalesced = 0
+        self.ticks = 0
+        self.tick_time = 0.0
+        self.max_tick = 0.0
+
+    def add_tick(self, seconds):
+        self.ticks += 1
+        self.tick_time += seconds
+        self.max_tick = max(self.max_tick, seconds)
+
+    def __str__(self):
+        average = self.tick_time / self.ticks * 1000 if self.ticks else 0
+        return (
+            f"Drag: {self.events} motion events, {self.coalesced} coalesced, "
+            f"{self.ticks} ticks, {average:.2f} ms average, "
+            f"{self.max_tick * 1000:.2f} ms max per tick"
+        )
+
+
+def get_drag_ghost(app, font):
+    """Return the application's DragGhost, creating it on first use."""
+    ghost = getattr(app, "drag_ghost", None)
+    if ghost is None:
+        ghost = app.drag_ghost = DragGhost(app, font)
+    return ghost
+
+
 class DraggableTask(ctk.CTkFrame):
     """
     A task that can be dragged and dropped into a Kanban column.
     """
 
+    # Number of DraggableTask widgets currently alive, to check that cards are
+    # recycled rather than leaked.
+    live = 0
+
     def __init__(self, master, text, id, app, db):
         super().__init__(master, border_width=2)
+        DraggableTask.live += 1
         self.grid_columnconfigure(2, weight=1)
         self.grid_rowconfigure(2, weight=1)
         self.app = app
@@ -20,34 +144,46 @@ class DraggableTask(ctk.CTkFrame):
         self.id = id
         self.db = db
 
-        self.FONT = ctk.CTkFont(family="Poppins", size=16)
-        self.BOLD_FONT = ctk.CTkFont(family="Poppins", size=16, weight="bold")
-
         self.label = ctk.CTkLabel(
-            self, text=text, wraplength=150, anchor="e", justify="left", font=self.FONT
+            self,
+            text=elide_title(text, get_font()),
+            wraplength=TASK_TITLE_WIDTH,
+            anchor="e",
+            justify="left",
+            font=get_font(),
         )
         self.label.grid(row=0, column=0, rowspan=5, padx=16, pady=8, sticky="nsw")
 
         self.edit_button = ctk.CTkButton(
-            self, text="", image=EDIT_IMG, command=self.edit_task, width=48
+            self, text="", image=get_icon("edit_task"), command=self.edit_task, width=48
         )
         self.edit_button.grid(
             row=1, column=1, padx=8, pady=(8, 4), sticky="e", columnspan=2
         )
 
         self.delete_button = ctk.CTkButton(
-            self, text="", image=DELETE_IMG, command=self.delete, width=48
+            self, text="", image=get_icon("delete_task"), command=self.delete, width=48
         )
         self.delete_button.grid(
             row=2, column=1, padx=8, pady=(4, 8), sticky="e", columnspan=2
         )
 
-        self.dummy_task = None
+        self.task_list = None
         self.last_column = None
+        self._drop_index = None
+        self.dummy = None
+        self.drag_stats = None
+        self._pointer = None
+        self._drag_after = None
+        self._last_tick = 0.0
 
         self.setup_bindings(self.label)
         self.setup_bindings(self)
 
+    def destroy(self):
+        DraggableTask.live -= 1
+        super().destroy()
+
     def setup_bindings(self, widget):
         widget.bind("<ButtonPress-1>", self.start_drag)
         widget.bind("<ButtonRelease-1>", self.stop_drag)
@@ -63,21 +199,30 @@ class DraggableTask(ctk.CTkFrame):
         task_dialog.update()
         self.wait_window(task_dialog)
         if task_dialog.task_title:
-            self.db.modify_task(task_id=self.id, new_title=task_dialog.task_title)
-            self.label.configure(text=task_dialog.task_title)
+            self.app.store.rename_task(
+                self.app.kanban_id, self.id, task_dialog.task_title
+            )
+            self.label.configure(text=elide_title(task_dialog.task_title, get_font()))
             self.text = task_dialog.task_title
 
-    def edit(self, current_column):
-        self.db.modify_task(
-            task_id=self.id,
-            new_title=self.text,
-            new_column_name=current_column,
-        )
+    def set_task(self, id, text):
+        """Show another task in this card, used when the card is recycled."""
+        if id == self.id and text == self.text:
+            return
+        self.id = id
+        self.text = text
+        self.label.configure(text=elide_title(text, get_font()))
+
+    def edit(self, column_id, index=None):
+        """Move the task to a column, at index among its tasks or at the end."""
+        self.app.store.move_task(self.app.kanban_id, self.id, column_id, index)
 
     def delete(self):
-        self.db.delete_task(self.text)
-        fade_out(self, self.winfo_id())
-        self.destroy()
+        self.app.store.delete_task(self.app.kanban_id, self.id)
+        if self.task_list is not None:
+            self.task_list.refresh()
+        else:
+            fade_out(self, self, on_done=self.destroy)
 
     def get_position(self):
         pointer_x = self.winfo_pointerx()
@@ -95,87 +240,81 @@ class DraggableTask(ctk.CTkFrame):
     def start_drag(self, event):
         self.drag_start_x = event.x
         self.drag_start_y = event.y
+        # The window does not move during a drag, read its position only once.
+        self.app_origin = (self.app.winfo_rootx(), self.app.winfo_rooty())
+        self.drag_stats = DragStats()
 
         self.initial_master = self.master
         self.lift()
 
-        # Create a dummy task to follow the mouse during dragging
-
-        self.dummy = ctk.CTkFrame(
-            self.app,
+        # Show the shared ghost task to follow the mouse during dragging
+        self.dummy = get_drag_ghost(self.app, get_font())
+        self.dummy.show(
+            self.text,
             width=self.winfo_width(),
             height=self.winfo_height(),
-            border_width=2,
-        )
-        self.dummy.grid_columnconfigure(2, weight=1)
-        self.dummy.grid_rowconfigure(2, weight=1)
-        self.label = ctk.CTkLabel(
-            self.dummy,
-            text=self.text,
-            wraplength=150,
-            anchor="e",
-            justify="left",
-            font=self.FONT,
-        )
-        self.label.grid(row=0, column=0, rowspan=5, padx=16, pady=8, sticky="nsw")
-        self.edit_button = ctk.CTkButton(self.dummy, text="", image=EDIT_IMG, width=48)
-        self.edit_button.grid(
-            row=1, column=1, padx=8, pady=(8, 4), sticky="e", columnspan=2
-        )
-        self.delete_button = ctk.CTkButton(
-            self.dummy, text="", image=DELETE_IMG, width=48
-        )
-        self.delete_button.grid(
-            row=2, column=1, padx=8, pady=(4, 8), sticky="e", columnspan=2
-        )
-        pywinstyles.set_opacity(self.dummy.winfo_id(), value=0.5)
-        self.dummy.place(
             x=self.get_position()[0] - self.drag_start_x,
             y=self.get_position()[1] - self.drag_start_y,
         )
 
-    def get_current_column(self):
-        x = self.app.winfo_pointerx() - self.app.winfo_rootx()
-        y = self.app.winfo_pointery() - self.app.winfo_rooty()
-        for column in self.app.columns:
-            if column.winfo_x() <= x <= column.winfo_x() + column.winfo_width():
-                if self.dummy_task is None:
-                    self.dummy_task = DraggableTask(
-                        master=column.task_frame,
-                        text=self.text,
-                        id=self.id,
-                        app=self,
-                        db=self.db,
-                    )  # Create a new task
-                    self.dummy_task.pack(
-                        fill="x", padx=5, pady=2
-                    )  # Pack the task into the new column
-                    pywinstyles.set_opacity(self.dummy_task.winfo_id(), value=0.7)
-                elif self.dummy_task is not None and self.last_column != column.title:
-                    self.dummy_task.destroy()
-                    self.dummy_task = None
-                elif self.dummy_task is not None and self.last_column == column.title:
-                    pass
-                else:
-                    self.dummy_task.destroy()
-                    self.dummy_task = None
-                self.last_column = column.title
-                self.update()
+    def get_current_column(self, x_root=None, y_root=None):
+        column = self.app.column_geometry.column_at(x_root)
+        if column is not None:
+            if self.last_column is not column and self.last_column is not None:
+                self.last_column.task_frame.hide_preview()
+            if y_root is not None:
+                index = column.task_frame.index_at(y_root)
+                if self.last_column is not column or self._drop_index != index:
+                    # Show where the task would land, its own column included
+                    column.task_frame.show_preview(self.text, index)
+                    set_opacity(column.task_frame.preview, 0.7)
+                    self._drop_index = index
+            self.last_column = column
+        return column
 
     def on_drag(self, event):
-        self.dummy.place(
-            x=self.get_position()[0] - self.drag_start_x,
-            y=self.get_position()[1] - self.drag_start_y,
+        # Only remember where the pointer is, the dummy follows it at most drag_fps
+        # times per second however fast the mouse sends motion events.
+        if self.dummy is None:
+            return
+        self._pointer = (event.x_root, event.y_root)
+        self.drag_stats.events += 1
+        if self._drag_after is not None:
+            self.drag_stats.coalesced += 1
+            return
+        interval = 1 / max(1, self.app.settings.get_int("drag_fps"))
+        delay = max(0.0, self._last_tick + interval - time.perf_counter())
+        self._drag_after = self.after(round(delay * 1000), self.drag_tick)
+
+    def drag_tick(self):
+        self._drag_after = None
+        if self.dummy is None or self._pointer is None:
+            return
+        start = time.perf_counter()
+        x_root, y_root = self._pointer
+        self.dummy.move(
+            x=x_root - self.app_origin[0] - self.drag_start_x,
+            y=y_root - self.app_origin[1] - self.drag_start_y,
         )  # Move the dummy to follow the cursor
-        self.get_current_column()
+        self.get_current_column(x_root, y_root)
+        self._last_tick = time.perf_counter()
+        self.drag_stats.add_tick(self._last_tick - start)
 
     def stop_drag(self, event):
         # After stopping the drag, handle the drop and remove the dummy
+        if self._drag_after is not None:
+            self.after_cancel(self._drag_after)
+            self._drag_after = None
+        self._pointer = None
+        if self.drag_stats is not None and self.app.settings.get_bool("drag_stats"):
+            print(self.drag_stats)
         try:
-            self.dummy.destroy()
+            self.dummy.hide()
             self.dummy = None
-            self.dummy_task.destroy()
-            self.dummy_task = None
+            if self.last_column is not None:
+                self.last_column.task_frame.hide_preview()
+                self.last_column = None
+                self._drop_index = None
             self.app.handle_drop(self, event)
         except Exception as e:
             print(f"Error: {e}")
@@ -0,0 +1,181 @@
+import sys
+
+from src.setting import *
+
+
+class VirtualTaskList(ctk.CTkFrame):
+    """
+    A scrollable list of task cards that only creates widgets for the visible rows.
+
+    Rows have a fixed height, so the list knows which tasks are on screen from the
+    scroll offset alone. The cards of the visible rows are kept and re-filled with
+    other tasks as the user scrolls, and the tasks themselves are requested page by
+    page through get_tasks(start, limit), so a column with 5,000 tasks costs the same
+    to open as one with 20.
+    """
+
+    def __init__(
+        self,
+        master,
+        get_tasks,
+        count_tasks,
+        create_card,
+        row_height: int = TASK_ROW_HEIGHT,
+        overscan: int = 1,
+        **kwargs,
+    ):
+        """
+        :argument get_tasks: get_tasks(start, limit) returns tuples starting with
+            task_id and title.
+        :argument count_tasks: count_tasks() returns the number of tasks in the list.
+        :argument create_card: create_card(master) returns a new, empty task card.
+        :argument row_height: The height of one row in pixels, padding included.
+        :argument overscan: How many extra rows to keep ready above and below.
+        """
+        super().__init__(master, **kwargs)
+        self.get_tasks = get_tasks
+        self.count_tasks = count_tasks
+        self.create_card = create_card
+        self.row_height = row_height
+        self.overscan = overscan
+        self.offset = 0
+        self.cards = []
+        self.preview = None
+        self.preview_index = None
+        self.suspended = False
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+        self.viewport = ctk.CTkFrame(self, fg_color="transparent")
+        self.viewport.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.yview)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self.viewport.bind("<Configure>", lambda event: self.refresh())
+        self.bind_scroll(self.viewport)
+
+    def bind_scroll(self, widget):
+        """Scroll the list with the mouse wheel while the pointer is over widget."""
+        if sys.platform.startswith("linux"):
+            widget.bind(
+                "<Button-4>", lambda event: self.scroll_pixels(-self.row_height)
+            )
+            widget.bind("<Button-5>", lambda event: self.scroll_pixels(self.row_height))
+        else:
+            widget.bind(
+                "<MouseWheel>",
+                lambda event: self.scroll_pixels(-event.delta // 120 * self.row_height),
+            )
+
+    def content_height(self):
+        return self.count_tasks() * self.row_height
+
+    def scroll_pixels(self, pixels):
+        self.offset += pixels
+        self.refresh()
+
+    def yview(self, *args):
+        """Scrollbar command, accepts the same arguments as a Tk yview."""
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * self.content_height())
+        elif args[0] == "scroll":
+            step = self.row_height
+            if args[2] == "pages":
+                step = max(self.row_height, self.viewport.winfo_height())
+            self.offset += int(args[1]) * step
+        self.refresh()
+
+    def see(self, index):
+        """Scroll so the task at index is visible."""
+        height = self.viewport.winfo_height()
+        top = index * self.row_height
+        if top < self.offset:
+            self.offset = top
+        elif top + self.row_height > self.offset + height:
+            self.offset = top + self.row_height - height
+        self.refresh()
+
+    def suspend(self):
+        """Hide the cards and stop loading tasks until resume() is called."""
+        self.suspended = True
+        for card in self.cards:
+            card.place_forget()
+
+    def resume(self):
+        self.suspended = False
+        self.refresh()
+
+    def refresh(self):
+        """Re-fill the visible cards, call it after the underlying tasks changed."""
+        if self.suspended:
+            return
+        height = max(self.viewport.winfo_height(), self.row_height)
+        total = self.count_tasks()
+        content = total * self.row_height
+        self.offset = max(0, min(self.offset, content - height))
+
+        first = max(0, self.offset // self.row_height - self.overscan)
+        count = height // self.row_height + 2 + 2 * self.overscan
+        tasks = self.get_tasks(first, count) if total else []
+
+        while len(self.cards) < len(tasks):
+            card = self.create_card(self.viewport)
+            card.task_list = self
+            self.bind_scroll(card)
+            self.bind_scroll(card.label)
+            self.cards.append(card)
+
+        for i, card in enumerate(self.cards):
+            if i < len(tasks):
+                card.set_task(tasks[i][0], tasks[i][1])
+                card.place(
+                    x=0,
+                    y=(first + i) * self.row_height - self.offset,
+                    relwidth=1,
+                    height=self.row_height - 4,
+                )
+            else:
+                # Spare cards are hidden, not destroyed, they will be needed again.
+                card.place_forget()
+
+        if self.preview is not None and self.preview.winfo_ismapped():
+            self._place_preview()
+
+        if content <= height:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.offset / content, (self.offset + height) / content)
+
+    def index_at(self, y_root):
+        """Return the index a task dropped at y_root would get, between 0 and count."""
+        y = y_root - self.viewport.winfo_rooty() + self.offset
+        index = (y + self.row_height // 2) // self.row_height
+        return max(0, min(index, self.count_tasks()))
+
+    def show_preview(self, text, index=None):
+        """Show a see-through card where a dropped task would land, at the end by default."""
+        if self.preview is None:
+            self.preview = self.create_card(self.viewport)
+            self.preview.task_list = self
+        self.preview.set_task(None, text)
+        self.preview_index = index
+        self._place_preview()
+
+    def hide_preview(self):
+        if self.preview is not None:
+            self.preview.place_forget()
+
+    def _place_preview(self):
+        height = self.viewport.winfo_height()
+        if self.preview_index is None:
+            y = self.content_height() - self.offset
+        else:
+            # Between the two rows around the index, over half of each.
+            y = (
+                self.preview_index * self.row_height
+                - self.offset
+                - self.row_height // 2
+            )
+        y = min(y, height - self.row_height)
+        self.preview.place(x=0, y=max(0, y), relwidth=1, height=self.row_height - 4)
+        self.preview.lift()
@@ -0,0 +1,39 @@
+class WidgetPool:
+    """
+    Keep released widgets hidden for later reuse instead of destroying them.
+
+    Tk cannot move a widget to another parent, so a pool only holds widgets of the
+    same master; acquire() hands out a hidden widget when one is free and only calls
+    the factory otherwise. The caller reconfigures the widget it gets back.
+    """
+
+    def __init__(self, factory):
+        """
+        :argument factory: Called without arguments to build a new widget.
+        """
+        self.factory = factory
+        self.free = []
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self):
+        if self.free:
+            self.reused += 1
+            return self.free.pop()
+        self.created += 1
+        return self.factory()
+
+    def release(self, widget):
+        """Hide a widget and keep it for the next acquire()."""
+        widget.grid_forget()
+        widget.pack_forget()
+        widget.place_forget()
+        self.free.append(widget)
+
+    def stats(self):
+        return {"created": self.created, "reused": self.reused, "free": len(self.free)}
+
+
+def count_widgets(widget):
+    """Return the number of live Tk widgets below widget, itself included."""
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
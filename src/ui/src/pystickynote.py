@@ -1,27 +1,14 @@
-import os
-import sys
+import hashlib
 
 import customtkinter as ctk
 from hPyT import maximize_minimize_button
 from PIL import Image
 
+from src.resources import get_icon
 
-def resource(relative_path: str) -> str:
-    """
-    Returns the path to the specified resource file.
-    If the application is running as a bundle, the path is relative to the bundle.
-    Otherwise, the path is relative to the current working directory.
 
-    :argument relative_path: The path to the resource file, relative to the bundle or current working directory.
-
-    :return: The absolute path to the resource file.
-    """
-    base_path = getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__)))
-    return os.path.join(base_path, relative_path)
-
-
-PIN_IMG = ctk.CTkImage(Image.open(resource("assets/keep.png")))
-PIN_OFF_IMG = ctk.CTkImage(Image.open(resource("assets/keep_off.png")))
+# CTkImage's default size, which the pin icons were shown at.
+PIN_ICON_SIZE = (20, 20)
 
 
 class PyStickyNote(ctk.CTkToplevel):
@@ -35,7 +22,18 @@ class PyStickyNote(ctk.CTkToplevel):
         no_maximize_minimize_button: bool = False,
         font: tuple[str, int] = ("Poppins", 20, "bold"),
         pinned: bool = False,
+        on_save=None,
+        on_window_change=None,
+        on_close=None,
+        autosave_ms: int = 1000,
     ):
+        """
+        :argument on_save: on_save(content) is called autosave_ms after the user stops
+            typing, only if the content differs from the last saved one.
+        :argument on_window_change: on_window_change(geometry, pinned) is called
+            autosave_ms after the note was last moved, resized, pinned or unpinned.
+        :argument on_close: Called when the user closes the note, after on_save.
+        """
         super().__init__()
         self.title(title)
         self.geometry(geometry)
@@ -44,6 +42,13 @@ class PyStickyNote(ctk.CTkToplevel):
         self.grid_rowconfigure(1, weight=1)
         self.font = font
         self.pinned = pinned
+        self.on_save = on_save
+        self.on_window_change = on_window_change
+        self.on_close = on_close
+        self.autosave_ms = autosave_ms
+        self._save_after = None
+        self._window_after = None
+        self._window_state = None
 
         if icon is not None:
             self.iconbitmap(icon)
@@ -57,7 +62,7 @@ class PyStickyNote(ctk.CTkToplevel):
         self.pin_button = ctk.CTkButton(
             self.tool_bar,
             text="",
-            image=PIN_IMG,
+            image=get_icon("keep_off" if pinned else "keep", PIN_ICON_SIZE),
             width=30,
             height=30,
             command=self.toggle_pin,
@@ -67,20 +72,92 @@ class PyStickyNote(ctk.CTkToplevel):
         self.content = ctk.CTkTextbox(self, corner_radius=0, font=self.font)
         self.content.grid(row=1, column=0, padx=0, pady=0, sticky="nsew")
         self.content.insert("end", content)
+        self._saved_hash = self.content_hash(content)
+        self.content.edit_modified(False)
+        self.content.bind("<<Modified>>", self.on_modified)
 
         self.update_pinned()
+        self.protocol("WM_DELETE_WINDOW", self.close)
 
         self.update()
+        self._window_state = (self.geometry(), self.pinned)
+        self.bind("<Configure>", self.on_configure)
         self.focus()
 
+    @staticmethod
+    def content_hash(content: str) -> bytes:
+        return hashlib.blake2b(content.encode(), digest_size=16).digest()
+
+    def get_content(self) -> str:
+        return self.content.get("1.0", "end-1c")
+
+    def on_modified(self, event=None):
+        # <<Modified>> only fires again once the flag is reset.
+        self.content.edit_modified(False)
+        if self.on_save is None:
+            return
+        if self._save_after is not None:
+            self.after_cancel(self._save_after)
+        self._save_after = self.after(self.autosave_ms, self.save)
+
+    def save(self):
+        """Call on_save now if the content changed since the last save."""
+        if self._save_after is not None:
+            self.after_cancel(self._save_after)
+            self._save_after = None
+        if self.on_save is None:
+            return False
+        content = self.get_content()
+        digest = self.content_hash(content)
+        if digest == self._saved_hash:
+            return False
+        self._saved_hash = digest
+        self.on_save(content)
+        return True
+
+    def on_configure(self, event):
+        if event.widget is self:
+            self.schedule_window_save()
+
+    def schedule_window_save(self):
+        if self.on_window_change is None:
+            return
+        if self._window_after is not None:
+            self.after_cancel(self._window_after)
+        self._window_after = self.after(self.autosave_ms, self.save_window)
+
+    def save_window(self):
+        """Call on_window_change now if the geometry or the pin changed."""
+        if self._window_after is not None:
+            self.after_cancel(self._window_after)
+            self._window_after = None
+        state = (self.geometry(), self.pinned)
+        if self.on_window_change is None or state == self._window_state:
+            return False
+        self._window_state = state
+        self.on_window_change(*state)
+        return True
+
+    def flush(self):
+        """Run the pending saves right away."""
+        self.save()
+        self.save_window()
+
+    def close(self):
+        self.flush()
+        if self.on_close is not None:
+            self.on_close()
+        self.destroy()
+
     def update_pinned(self):
         self.attributes("-topmost", self.pinned)
 
     def toggle_pin(self):
         if self.pinned:
-            self.pin_button.configure(image=PIN_IMG)
+            self.pin_button.configure(image=get_icon("keep", PIN_ICON_SIZE))
             self.pinned = False
         else:
-            self.pin_button.configure(image=PIN_OFF_IMG)
+            self.pin_button.configure(image=get_icon("keep_off", PIN_ICON_SIZE))
             self.pinned = True
         self.update_pinned()
+        self.schedule_window_save()
@@ -0,0 +1,185 @@
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_BATCH_DELAY = 0.05  # Seconds to wait for more writes before committing
+DEFAULT_MAX_BATCH = 500
+
+
+class DatabaseWriter:
+    """
+    Run Database writes on a dedicated thread so the Tk main loop never waits on disk.
+
+    Writes are submitted with a key naming the row they touch. A write whose key is
+    already pending replaces the older one, so dragging a card across three columns
+    quickly only stores the last move. Pending writes are committed together in one
+    transaction. Failures, including writes returning False (the Database methods
+    that catch their own errors do), are queued and picked up by the UI with
+    poll_failures(), usually from an after() callback.
+    """
+
+    def __init__(
+        self,
+        db,
+        batch_delay: float = DEFAULT_BATCH_DELAY,
+        max_batch: int = DEFAULT_MAX_BATCH,
+    ):
+        self.db = db
+        self.batch_delay = batch_delay
+        self.max_batch = max_batch
+        self.failures = queue.Queue()
+        self.submitted = 0
+        self.coalesced = 0
+        self.committed = 0
+
+        self._pending = OrderedDict()
+        self._condition = threading.Condition()
+        self._busy = False
+        self._closed = False
+        self._flushing = 0
+        self._thread = threading.Thread(
+            target=self._run, name="DatabaseWriter", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, key, function, *args, on_done=None, **kwargs):
+        """
+        Queue function(*args, **kwargs) to run on the writer thread.
+
+        :argument key: A hashable naming the row being written, for example
+            ("task", task_id, "column"). None means the write is never coalesced.
+        :argument function: Usually a bound Database method.
+        :argument on_done: Called on the writer thread with (result, None) once the
+            write is committed, or (None, exception) if it failed. Not called when
+            the write is replaced or cancelled.
+        """
+        if key is None:
+            key = object()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("DatabaseWriter is closed")
+            if self._pending.pop(key, None) is not None:
+                self.coalesced += 1
+            self._pending[key] = (function, args, kwargs, on_done)
+            self.submitted += 1
+            self._condition.notify_all()
+
+    def cancel(self, key):
+        """Drop a pending write, returns True if one was waiting."""
+        with self._condition:
+            return self._pending.pop(key, None) is not None
+
+    def pending(self):
+        with self._condition:
+            return len(self._pending) + (1 if self._busy else 0)
+
+    def flush(self, timeout=None):
+        """Block until every write submitted so far has been committed."""
+        with self._condition:
+            self._flushing += 1
+            self._condition.notify_all()
+            try:
+                return self._condition.wait_for(
+                    lambda: not self._pending and not self._busy, timeout
+                )
+            finally:
+                self._flushing -= 1
+
+    def close(self, timeout=None):
+        """Commit the pending writes, then stop the thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def poll_failures(self):
+        """Return the (key, exception) pairs of the writes that failed since last call."""
+        failures = []
+        while True:
+            try:
+                failures.append(self.failures.get_nowait())
+            except queue.Empty:
+                return failures
+
+    def _take_batch(self):
+        with self._condition:
+            self._condition.wait_for(lambda: self._pending or self._closed)
+            if not self._pending:
+                return None
+            # Give the UI a moment to send more writes that can be coalesced.
+            deadline = time.monotonic() + self.batch_delay
+            while (
+                not self._closed
+                and not self._flushing
+                and len(self._pending) < self.max_batch
+            ):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            batch = []
+            while self._pending and len(batch) < self.max_batch:
+                batch.append(self._pending.popitem(last=False))
+            self._busy = True
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            try:
+                self._commit(batch)
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+
+    def _commit(self, batch):
+        try:
+            with self.db.transaction():
+                results = [
+                    function(*args, **kwargs)
+                    for _, (function, args, kwargs, _) in batch
+                ]
+        except Exception:
+            pass
+        else:
+            # A write returning False changed nothing, the others can stay.
+            for (key, write), result in zip(batch, results):
+                self._done(key, write, result)
+            return
+
+        # Something in the batch failed and the whole transaction was rolled back,
+        # replay the writes one by one so only the faulty ones are lost.
+        for key, write in batch:
+            function, args, kwargs, _ = write
+            try:
+                with self.db.transaction():
+                    result = function(*args, **kwargs)
+            except Exception as e:
+                self._failed(key, write, e)
+            else:
+                self._done(key, write, result)
+
+    def _done(self, key, write, result):
+        function, _, _, on_done = write
+        if result is False:
+            self._failed(key, write, RuntimeError(f"{function.__name__} failed"))
+            return
+        self.committed += 1
+        self._notify(key, on_done, result, None)
+
+    def _failed(self, key, write, error):
+        print(f"Error: Background write {key} failed: {error}")
+        self.failures.put((key, error))
+        self._notify(key, write[3], None, error)
+
+    def _notify(self, key, on_done, result, error):
+        if on_done is None:
+            return
+        try:
+            on_done(result, error)
+        except Exception as e:
+            print(f"Error in the callback of background write {key}: {e}")
@@ -0,0 +1,104 @@
+"""
+Migrations applied to the database shipped in src/database, which predates schema
+versioning, and the query plans of the lookups their indexes were added for.
+
+Usage: python -m pytest tests
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import sqlite3
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC)
+
+from database import MIGRATIONS, Database  # noqa: E402
+
+# (query, parameters, index it must be answered from)
+LOOKUPS = [
+    (
+        """SELECT task_id FROM TaskColumnLink WHERE column_id = ?
+           ORDER BY position, task_id""",
+        (1,),
+        "idx_TaskColumnLink_position",
+    ),
+    (
+        "SELECT id, name FROM KanbanColumn WHERE kanban_id = ? ORDER BY name",
+        (1,),
+        "idx_KanbanColumn_kanban",
+    ),
+    ("SELECT id FROM Task WHERE title = ?", ("Task",), "idx_Task_title"),
+]
+
+
+@pytest.fixture
+def shipped(tmp_path):
+    """A copy of the shipped database, not migrated yet."""
+    path = tmp_path / "PyKanBan.db"
+    shutil.copy(os.path.join(SRC, "database", "PyKanBan.db"), path)
+    return str(path)
+
+
+def open_database(path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        database = Database(path)
+        database.migrate()
+    return database
+
+
+@pytest.fixture
+def db(shipped):
+    database = open_database(shipped)
+    yield database
+    database.close()
+
+
+def test_migrate_to_latest(db):
+    conn = db.get_connection()
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS)
+    assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+
+
+def test_migrate_twice(db):
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert db.migrate() == len(MIGRATIONS)
+
+
+@pytest.mark.parametrize("query, parameters, index", LOOKUPS)
+def test_lookup_uses_index(db, query, parameters, index):
+    plan = db.get_connection().execute(f"EXPLAIN QUERY PLAN {query}", parameters)
+    details = " ".join(row[-1] for row in plan.fetchall())
+    assert index in details
+    assert "USING INDEX" in details or "USING COVERING INDEX" in details
+    assert "USE TEMP B-TREE" not in details
+
+
+def test_upgrade_does_not_archive_old_tasks(shipped):
+    # A card created long ago, moved to Done just before the upgrade.
+    conn = sqlite3.connect(shipped)
+    with conn:
+        task_id = conn.execute(
+            "INSERT INTO Task (title, created_at) VALUES ('Old card', '2000-01-01')"
+        ).lastrowid
+        conn.execute(
+            """INSERT INTO TaskColumnLink (task_id, column_id)
+               SELECT ?, id FROM KanbanColumn WHERE name = 'Done'""",
+            (task_id,),
+        )
+    conn.close()
+
+    db = open_database(shipped)
+    try:
+        older_than = date.today() - timedelta(days=30)
+        assert not db.archive_tasks("Done", older_than)
+        assert db.count_archived_tasks(1) == 0
+        # They age from the upgrade on.
+        assert db.archive_tasks("Done", date.today() + timedelta(days=1))
+    finally:
+        db.close()